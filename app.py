@@ -1,7 +1,13 @@
 import streamlit as st
 import pandas as pd
 import requests
-from src import watchlist, portfolio_tracker, stock_analysis, new_insights, profile
+from src import new_insights
+from src.alerts_notification import format_alert
+from src.currency import format_money
+from src.symbols import default_index, normalize
+
+# Market-data modules (yfinance, pyarrow, altair) are imported by the
+# pages that use them, so sessions that never open those pages skip them.
 
 BACKEND_URL = "http://127.0.0.1:8000/api"
 
@@ -121,58 +127,130 @@ section[data-testid="stSidebar"] > div {
 </style>
 """, unsafe_allow_html=True)
 
-# ---------------- BACKEND HELPERS ----------------
-def fetch_portfolio_from_backend():
-    r = st.session_state.session.get(f"{BACKEND_URL}/portfolio/")
-    return r.json() if r.status_code == 200 else []
+# ---------------- CACHED READS ----------------
+# Backend GETs are cached per user for a few seconds so reruns (every
+# widget interaction) don't refetch; writes below clear what they change.
+# The session starts with "_" so Streamlit doesn't hash it.
+BACKEND_TTL = 15
+MARKET_DATA_TTL = 300
+
+SUMMARY_URL = f"{BACKEND_URL}/portfolio/summary/"
+HISTORY_URL = f"{BACKEND_URL}/portfolio/history/"
+CURRENCY_OPTIONS = ["INR", "USD", "EUR", "GBP"]
+WATCHLIST_URL = f"{BACKEND_URL}/watchlist/"
+TRANSACTIONS_URL = f"{BACKEND_URL}/transactions/"
+SCREENER_URL = f"{BACKEND_URL}/screener/"
+ALERTS_URL = f"{BACKEND_URL}/alerts/"
+
+class BackendError(Exception):
+    pass
+
+@st.cache_data(ttl=BACKEND_TTL, show_spinner=False)
+def cached_get(username, url, _session):
+    r = _session.get(url)
+    if r.status_code != 200:
+        raise BackendError(r.status_code)  # errors are not cached
+    return r.json()
+
+def backend_get(url, default):
+    try:
+        return cached_get(st.session_state.get("username"), url, st.session_state.session)
+    except BackendError:
+        return default
+
+def invalidate(*urls):
+    for url in urls:
+        cached_get.clear(st.session_state.get("username"), url, None)
+
+@st.cache_data(ttl=MARKET_DATA_TTL, show_spinner=False)
+def cached_stock_data(symbol):
+    from src import stock_analysis
+    return stock_analysis.get_stock_data(symbol)
+
+def symbol_input(label, key):
+    # Type to filter by symbol or company name; unlisted symbols can still be entered
+    names = default_index().names
+    choice = st.selectbox(
+        label, list(names), index=None, key=key, accept_new_options=True,
+        format_func=lambda s: f"{s} · {names[s]}" if s in names else s,
+        placeholder="Symbol or company name",
+    )
+    return normalize(choice) if choice else ""
 
+# ---------------- BACKEND HELPERS ----------------
 def fetch_watchlist_from_backend():
-    r = st.session_state.session.get(f"{BACKEND_URL}/watchlist/")
-    return r.json() if r.status_code == 200 else []
+    return backend_get(WATCHLIST_URL, [])
 
-def fetch_transactions():
-    r = st.session_state.session.get(f"{BACKEND_URL}/transactions/")
-    return r.json() if r.status_code == 200 else []
+def fetch_transactions(page_url=None):
+    # One cursor page; page_url is the "next" link of the previous page
+    return backend_get(page_url or TRANSACTIONS_URL, {"results": [], "next": None})
+
+def loaded_page_urls():
+    # "Load more" pages fetched so far; cached like the first page
+    return st.session_state.get("tx_pages", [])
+
+def reset_transaction_pages():
+    st.session_state.pop("tx_rows", None)
+    st.session_state.pop("tx_next", None)
+    st.session_state.pop("tx_pages", None)
 
 def submit_transaction(symbol, ttype, qty):
-    return st.session_state.session.post(
+    r = st.session_state.session.post(
         f"{BACKEND_URL}/transaction/",
         json={"stock_symbol": symbol, "transaction_type": ttype, "quantity": qty}
     )
+    invalidate(*valuation_urls(), TRANSACTIONS_URL, *loaded_page_urls())
+    return r
 
 def add_watchlist_backend(stock):
-    return st.session_state.session.post(
-        f"{BACKEND_URL}/watchlist/",
+    r = st.session_state.session.post(
+        WATCHLIST_URL,
         json={"stock_symbol": stock}
     )
+    invalidate(WATCHLIST_URL)
+    return r
 
 def remove_watchlist_backend(stock):
-    return st.session_state.session.delete(
-        f"{BACKEND_URL}/watchlist/",
+    r = st.session_state.session.delete(
+        WATCHLIST_URL,
         json={"stock_symbol": stock}
     )
+    invalidate(WATCHLIST_URL)
+    return r
+
+def valuation_urls():
+    # Summary and history are fetched per base currency
+    return [f"{url}?currency={c}" for url in (SUMMARY_URL, HISTORY_URL) for c in CURRENCY_OPTIONS]
 
-def calculate_portfolio_summary(data):
-    invested = value = 0
-    for r in data:
-        q = r.get("total_quantity", 0)
-        avg = r.get("avg_buy_price", 0)
-        cur = r.get("current_price", avg)
-        invested += q * avg
-        value += q * cur
-    return {
-        "total_invested": invested,
-        "market_value": value,
-        "pnl": value - invested,
-        "holdings": len(data)
-    }
+def fetch_portfolio_summary(currency):
+    # Totals, P&L and per-holding rows, computed (and cached) by the backend
+    return backend_get(f"{SUMMARY_URL}?currency={currency}", None)
+
+def fetch_portfolio_history(currency):
+    return backend_get(f"{HISTORY_URL}?currency={currency}", None)
+
+def fetch_screener(period):
+    return backend_get(f"{SCREENER_URL}?period={period}", None)
+
+def fetch_alerts():
+    return backend_get(ALERTS_URL, [])
+
+def create_alert_backend(payload):
+    r = st.session_state.session.post(ALERTS_URL, json=payload)
+    invalidate(ALERTS_URL)
+    return r
+
+def cancel_alert_backend(alert_id):
+    r = st.session_state.session.delete(ALERTS_URL, json={"id": alert_id})
+    invalidate(ALERTS_URL)
+    return r
 
 # ---------------- SIDEBAR ----------------
 st.sidebar.title("📊 Investment Tracker")
 
 page = st.sidebar.radio(
     "Navigate",
-    ["📊 Watchlist", "📂 Portfolio", "📈 Stock Analysis", "📰 News", "📨 Contact Us"]
+    ["📊 Watchlist", "📂 Portfolio", "📈 Stock Analysis", "🔎 Screener", "🔔 Alerts", "📰 News", "📨 Contact Us"]
 )
 
 # Visual separator
@@ -182,8 +260,10 @@ st.sidebar.markdown('<div class="sidebar-divider"></div>', unsafe_allow_html=Tru
 st.sidebar.markdown('<div class="logout-btn">', unsafe_allow_html=True)
 if st.sidebar.button("🚪 Logout"):
     st.session_state.session.post(f"{BACKEND_URL}/logout/")
+    invalidate(*valuation_urls(), WATCHLIST_URL, TRANSACTIONS_URL, *loaded_page_urls(), ALERTS_URL)
     st.session_state.logged_in = False
     st.session_state.username = None
+    reset_transaction_pages()
     st.rerun()
 st.sidebar.markdown('</div>', unsafe_allow_html=True)
 
@@ -211,7 +291,7 @@ if page == "📊 Watchlist":
                 remove_watchlist_backend(i["stock_symbol"])
                 st.rerun()
 
-    stock = st.text_input("Add Stock Symbol")
+    stock = symbol_input("Add Stock Symbol", "watchlist-symbol")
     if st.button("➕ Add Stock"):
         add_watchlist_backend(stock)
         st.rerun()
@@ -219,50 +299,150 @@ if page == "📊 Watchlist":
 # ---------------- PORTFOLIO ----------------
 elif page == "📂 Portfolio":
     st.header("📂 Portfolio Tracker")
-    pdata = fetch_portfolio_from_backend()
+    currency = st.selectbox("Currency", CURRENCY_OPTIONS, key="currency")
+    s = fetch_portfolio_summary(currency)
+    pdata = s["positions"] if s else []
 
     if pdata:
-        s = calculate_portfolio_summary(pdata)
         c1,c2,c3,c4 = st.columns(4)
-        c1.metric("💰 Total Invested", f"₹ {s['total_invested']:,.2f}")
-        c2.metric("📈 Market Value", f"₹ {s['market_value']:,.2f}")
-        c3.metric("📊 P&L", f"₹ {s['pnl']:,.2f}")
+        c1.metric("💰 Total Invested", format_money(s["total_invested"], currency))
+        c2.metric("📈 Market Value", format_money(s["market_value"], currency))
+        c3.metric("📊 P&L", format_money(s["pnl"], currency))
         c4.metric("🧾 Holdings", s["holdings"])
+        c5,c6 = st.columns(2)
+        c5.metric("✅ Realized P&L", format_money(s["realized_pnl"], currency))
+        c6.metric("⏳ Unrealized P&L", format_money(s["unrealized_pnl"], currency))
+        st.caption(f"Prices in each stock's own currency, totals in {currency}")
+        if s.get("missing_prices"):
+            st.warning(f"No price right now for {', '.join(s['missing_prices'])}; valued at cost")
         st.divider()
 
-    sym = st.text_input("Stock Symbol")
+    sym = symbol_input("Stock Symbol", "order-symbol")
     qty = st.number_input("Quantity", min_value=1, step=1)
 
     b1,b2 = st.columns(2)
     if b1.button("🟢 BUY"):
         submit_transaction(sym,"BUY",qty)
+        reset_transaction_pages()
         st.rerun()
     if b2.button("🔴 SELL"):
         submit_transaction(sym,"SELL",qty)
+        reset_transaction_pages()
         st.rerun()
 
     st.subheader("📊 Current Portfolio")
     st.dataframe(pd.DataFrame(pdata), hide_index=True)
 
+    h = fetch_portfolio_history(currency) if pdata else None
+    if h and h["dates"]:
+        st.subheader("📈 Portfolio Value")
+        c1,c2 = st.columns(2)
+        c1.metric("⏱ Time-weighted Return", f"{h['twr_total']:.2%}")
+        c2.metric("💵 Money-weighted Return (annual)", "—" if h["mwr"] is None else f"{h['mwr']:.2%}")
+        st.line_chart(pd.DataFrame(
+            {"Market Value": h["market_value"], "Cost Basis": h["cost_basis"]},
+            index=pd.to_datetime(h["dates"]),
+        ))
+        if h.get("missing_rates"):
+            st.caption(f"No {currency} exchange rate for {', '.join(h['missing_rates'])}; left out of the chart")
+
     st.subheader("📜 Transaction History")
-    tx = fetch_transactions()
-    if tx:
-        st.dataframe(pd.DataFrame(tx), hide_index=True)
+    # Pages are fetched lazily and kept across reruns
+    if "tx_rows" not in st.session_state:
+        first = fetch_transactions()
+        st.session_state.tx_rows = first["results"]
+        st.session_state.tx_next = first["next"]
+        st.session_state.tx_pages = []
+
+    if st.session_state.tx_rows:
+        st.dataframe(pd.DataFrame(st.session_state.tx_rows), hide_index=True)
+        if st.session_state.tx_next and st.button("Load more"):
+            st.session_state.tx_pages.append(st.session_state.tx_next)
+            tx_page = fetch_transactions(st.session_state.tx_next)
+            st.session_state.tx_rows += tx_page["results"]
+            st.session_state.tx_next = tx_page["next"]
+            st.rerun()
     else:
         st.info("No transactions yet")
 
 # ---------------- STOCK ANALYSIS ----------------
 elif page == "📈 Stock Analysis":
+    from src import indicators, stock_analysis
+
     st.header("📈 Stock Analysis")
-    sym = st.text_input("Stock Symbol")
+    sym = symbol_input("Stock Symbol", "analysis-symbol")
     if st.button("Analyze"):
-        d = stock_analysis.get_stock_data(sym)
+        d = cached_stock_data(sym)
         if not d.empty:
             st.dataframe(d.tail())
-            st.image(stock_analysis.plot_stock_chart(d, sym))
+            st.altair_chart(stock_analysis.plot_stock_chart(d, sym), width="stretch")
+
+            st.subheader("📐 Indicators")
+            ind = indicators.compute_indicators(d)
+            st.dataframe(ind.tail().T)
+            st.line_chart(ind["RSI 14"].dropna())
         else:
             st.warning("No data found")
 
+# ---------------- SCREENER ----------------
+elif page == "🔎 Screener":
+    st.header("🔎 Screener")
+    st.caption("Everything you hold or watch, side by side")
+    period = st.selectbox("Period", ["6mo", "1y", "2y", "5y"], index=1)
+    result = fetch_screener(period)
+
+    if not result or not result["rows"]:
+        st.info("Add stocks to your watchlist or portfolio to screen them")
+    else:
+        st.caption(f"As of {result['as_of']}")
+        rows = pd.DataFrame(result["rows"]).set_index("symbol").sort_values("momentum_rank")
+        st.dataframe(rows)
+
+        st.subheader("🔗 Return Correlation")
+        st.dataframe(pd.DataFrame(
+            result["correlation"], index=result["symbols"], columns=result["symbols"]
+        ))
+
+# ---------------- ALERTS ----------------
+elif page == "🔔 Alerts":
+    st.header("🔔 Price Alerts")
+    alerts = fetch_alerts()
+    active = [a for a in alerts if a["active"]]
+    triggered = [a for a in alerts if a["triggered_at"]]
+
+    st.subheader("Active")
+    if not active:
+        st.info("No active alerts")
+    for a in active:
+        c1, c2 = st.columns([9,1])
+        c1.write(format_alert(a))
+        if c2.button("❌", key=f"alert-{a['id']}"):
+            cancel_alert_backend(a["id"])
+            st.rerun()
+
+    st.subheader("New Alert")
+    sym = symbol_input("Stock Symbol", "alert-symbol")
+    kind = st.radio("Trigger", ["Price above", "Price below", "% move"], horizontal=True)
+    if kind == "% move":
+        pct = st.number_input("Move (%)", value=5.0, step=0.5)
+        payload = {"stock_symbol": sym, "percent": pct}
+    else:
+        target = st.number_input("Target price", min_value=0.01, value=100.0)
+        direction = "ABOVE" if kind == "Price above" else "BELOW"
+        payload = {"stock_symbol": sym, "direction": direction, "target_price": target}
+
+    if st.button("➕ Add Alert"):
+        r = create_alert_backend(payload)
+        if r.status_code == 201:
+            st.rerun()
+        else:
+            st.error(r.json().get("error", "Could not create alert"))
+
+    if triggered:
+        st.subheader("Triggered")
+        for a in triggered:
+            st.markdown(f"- {format_alert(a)}")
+
 # ---------------- NEWS ----------------
 elif page == "📰 News":
     st.header("📰 Market News")
@@ -0,0 +1,93 @@
+"""
+Alert matching benchmark: sorted per-symbol AlertBook vs scanning a list.
+
+Places --alerts random ABOVE/BELOW thresholds around a random-walk price
+for each symbol and feeds --ticks price updates through both. Run from
+the repo root:
+
+    python benchmarks/alerts.py --alerts 100000 --symbols 500 --ticks 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.alerts_notification import ABOVE, BELOW, AlertBook  # noqa: E402
+
+
+def make_alerts(count, symbols, rng):
+    alerts = []
+    for alert_id in range(count):
+        symbol = rng.choice(symbols)
+        direction = rng.choice((ABOVE, BELOW))
+        offset = rng.uniform(0.01, 0.5)
+        target = 100 * (1 + offset if direction == ABOVE else 1 - offset)
+        alerts.append((alert_id, symbol, direction, target))
+    return alerts
+
+
+def make_ticks(count, symbols, rng):
+    prices = dict.fromkeys(symbols, 100.0)
+    ticks = []
+    for _ in range(count):
+        symbol = rng.choice(symbols)
+        prices[symbol] *= 1 + rng.gauss(0, 0.02)
+        ticks.append((symbol, prices[symbol]))
+    return ticks
+
+
+def run_book(alerts, ticks):
+    book = AlertBook()
+    for alert in alerts:
+        book.add(*alert)
+    fired = 0
+    started = time.perf_counter()
+    for symbol, price in ticks:
+        fired += len(book.update(symbol, price))
+    return time.perf_counter() - started, fired
+
+
+def run_scan(alerts, ticks):
+    active = list(alerts)
+    fired = 0
+    started = time.perf_counter()
+    for symbol, price in ticks:
+        keep = []
+        for alert in active:
+            _, s, direction, target = alert
+            if s == symbol and (price >= target if direction == ABOVE else price <= target):
+                fired += 1
+            else:
+                keep.append(alert)
+        active = keep
+    return time.perf_counter() - started, fired
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alerts", type=int, default=100_000)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=50_000)
+    parser.add_argument("--scan-ticks", type=int, default=200,
+                        help="Ticks for the (slow) linear scan baseline.")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    symbols = [f"SYM{i:04d}" for i in range(args.symbols)]
+    alerts = make_alerts(args.alerts, symbols, rng)
+    ticks = make_ticks(args.ticks, symbols, rng)
+
+    book_time, fired = run_book(alerts, ticks)
+    scan_ticks = ticks[:args.scan_ticks]
+    scan_time, _ = run_scan(alerts, scan_ticks)
+
+    print(f"{args.alerts:,} alerts on {args.symbols} symbols, {fired:,} fired")
+    print(f"{'alert book':<12}{book_time / len(ticks) * 1e6:>10.2f} us/tick")
+    print(f"{'linear scan':<12}{scan_time / len(scan_ticks) * 1e6:>10.2f} us/tick")
+
+
+if __name__ == "__main__":
+    main()
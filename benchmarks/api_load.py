@@ -0,0 +1,89 @@
+"""
+Load benchmark: sync (WSGI) vs async (ASGI) tracker API views.
+
+Start both servers with the benchmark settings, which price symbols
+offline with 200 ms of simulated upstream latency:
+
+    cd investment_backend
+    export DJANGO_SETTINGS_MODULE=backend.settings_bench
+    python manage.py migrate
+    gunicorn backend.wsgi -w 4 -b 127.0.0.1:8001
+    uvicorn backend.asgi:application --workers 1 --port 8002
+
+Then run from the repo root:
+
+    python benchmarks/api_load.py --wsgi http://127.0.0.1:8001/api \\
+        --asgi http://127.0.0.1:8002/api --requests 400 --concurrency 50
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+USERNAME = "bench"
+PASSWORD = "bench-password-123"
+
+
+def login(base_url, holdings):
+    session = requests.Session()
+    session.post(
+        f"{base_url}/register/",
+        json={"username": USERNAME, "email": "bench@example.com", "password": PASSWORD},
+    )
+    r = session.post(f"{base_url}/login/", json={"username": USERNAME, "password": PASSWORD})
+    r.raise_for_status()
+
+    current = session.get(f"{base_url}/portfolio/").json()
+    if len(current) < holdings:
+        for i in range(holdings):
+            session.post(
+                f"{base_url}/transaction/",
+                json={"stock_symbol": f"BENCH{i:02d}.NS", "transaction_type": "BUY", "quantity": 1},
+            )
+    return session
+
+
+def run(session, url, requests_total, concurrency):
+    def one(_):
+        started = time.perf_counter()
+        r = session.get(url)
+        return time.perf_counter() - started, r.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests_total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(t for t, _ in results)
+    errors = sum(1 for _, code in results if code != 200)
+    return {
+        "req/s": requests_total / elapsed,
+        "p50 ms": statistics.median(latencies) * 1000,
+        "p95 ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--wsgi", default="http://127.0.0.1:8001/api")
+    parser.add_argument("--asgi", default="http://127.0.0.1:8002/api")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--holdings", type=int, default=20)
+    args = parser.parse_args()
+
+    targets = [
+        ("WSGI portfolio/", args.wsgi, "portfolio/"),
+        ("ASGI async/portfolio/", args.asgi, "async/portfolio/"),
+    ]
+    for label, base_url, path in targets:
+        session = login(base_url, args.holdings)
+        stats = run(session, f"{base_url}/{path}", args.requests, args.concurrency)
+        print(f"{label:<24}" + "  ".join(f"{k}={v:,.1f}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
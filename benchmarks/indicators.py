@@ -0,0 +1,85 @@
+"""
+Indicator benchmark: one batched call over a wide panel vs a per-symbol loop.
+
+Uses synthetic random-walk OHLCV data (no network), by default 500
+symbols x 20 years of trading days. Run from the repo root:
+
+    python benchmarks/indicators.py --symbols 500 --years 20
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import indicators  # noqa: E402
+
+TRADING_DAYS = 252
+
+
+def synthetic_frames(symbols, days, seed=42):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+
+    returns = rng.normal(0.0003, 0.015, size=(days, symbols))
+    close = 100 * np.exp(np.cumsum(returns, axis=0))
+    spread = np.abs(rng.normal(0, 0.01, size=(days, symbols)))
+    high = close * (1 + spread)
+    low = close * (1 - spread)
+    open_ = np.roll(close, 1, axis=0)
+    open_[0] = close[0]
+    volume = rng.integers(10_000, 1_000_000, size=(days, symbols))
+
+    return {
+        f"SYM{i:04d}": pd.DataFrame(
+            {
+                "Open": open_[:, i], "High": high[:, i], "Low": low[:, i],
+                "Close": close[:, i], "Volume": volume[:, i],
+            },
+            index=index,
+        )
+        for i in range(symbols)
+    }
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    days = args.years * TRADING_DAYS
+    frames = synthetic_frames(args.symbols, days)
+    print(f"{args.symbols} symbols x {days:,} days ({args.symbols * days:,} bars)")
+
+    loop_time, per_symbol = timed(
+        lambda: {s: indicators.compute_indicators(df) for s, df in frames.items()},
+        args.repeat,
+    )
+    batch_time, batch = timed(lambda: indicators.compute_batch(frames), args.repeat)
+
+    # Same numbers either way
+    probe = next(iter(frames))
+    for name, panel in batch.items():
+        np.testing.assert_allclose(panel[probe].to_numpy(), per_symbol[probe][name].to_numpy())
+
+    print(f"{'per-symbol loop':<20}{loop_time * 1000:>10.1f} ms")
+    print(f"{'batched panel':<20}{batch_time * 1000:>10.1f} ms  ({loop_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
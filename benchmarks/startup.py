@@ -0,0 +1,125 @@
+"""
+Cold-start benchmark for the Streamlit app and the Django workers.
+
+Each target is imported in a fresh interpreter under ``python -X importtime``;
+the median over --repeat runs is printed along with the slowest imports,
+and appended to benchmarks/startup_history.csv so regressions show up
+over time. Only a clean tree is recorded, so every row names a commit
+anyone can check out. Run from the repo root:
+
+    python benchmarks/startup.py --repeat 5
+"""
+import argparse
+import ast
+import csv
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "investment_backend")
+HISTORY_FILE = os.path.join(ROOT, "benchmarks", "startup_history.csv")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def app_imports():
+    """The top-level import statements of app.py, i.e. what every session pays."""
+    with open(os.path.join(ROOT, "app.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(n) for n in nodes)
+
+
+TARGETS = {
+    # (code, working directory)
+    "streamlit app": (app_imports(), ROOT),
+    "django worker": (
+        "import os, django\n"
+        "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')\n"
+        "django.setup()\n"
+        "import backend.urls",
+        BACKEND,
+    ),
+}
+
+
+def measure(code, cwd):
+    """(wall seconds, {module: (self us, cumulative us)}) for one cold import."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return wall, modules
+
+
+def git_commit():
+    proc = subprocess.run(
+        ["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True
+    )
+    return proc.stdout.strip() or "unknown"
+
+
+def record(rows):
+    new_file = not os.path.exists(HISTORY_FILE)
+    with open(HISTORY_FILE, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["timestamp", "commit", "target", "wall_ms", "import_ms", "modules"])
+        writer.writerows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per target.")
+    parser.add_argument("--no-record", action="store_true", help="Don't append to the history file.")
+    args = parser.parse_args()
+
+    stamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    commit = git_commit()
+    rows = []
+
+    for name, (code, cwd) in TARGETS.items():
+        walls, totals, last = [], [], {}
+        for _ in range(args.repeat):
+            wall, modules = measure(code, cwd)
+            walls.append(wall)
+            totals.append(sum(own for own, _ in modules.values()))
+            last = modules
+
+        wall_ms = statistics.median(walls) * 1000
+        import_ms = statistics.median(totals) / 1000
+        print(f"\n{name}: {wall_ms:.0f} ms wall, {import_ms:.0f} ms importing {len(last)} modules")
+        slowest = sorted(last.items(), key=lambda kv: kv[1][1], reverse=True)
+        for module, (_, cumulative) in slowest[:args.top]:
+            print(f"  {cumulative / 1000:>8.1f} ms  {module}")
+
+        rows.append([stamp, commit, name, round(wall_ms, 1), round(import_ms, 1), len(last)])
+
+    if args.no_record:
+        return
+    if commit.endswith("-dirty"):
+        # Nobody could reproduce a measurement of uncommitted code
+        print("\nNot recorded: the tree has uncommitted changes")
+        return
+    record(rows)
+    print(f"\nAppended to {os.path.relpath(HISTORY_FILE, ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Settings for load benchmarks (see benchmarks/api_load.py).
+
+Prices come from the synthetic random-walk provider with simulated
+upstream latency, and quote caching is disabled, so every request pays
+the "network" cost without touching the network. The Streamlit app can
+be pointed at the same data with MARKET_DATA_PROVIDER=random.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ['*']
+
+QUOTE_PROVIDER = 'random'
+MARKET_DATA_OPTIONS = {'latency': 0.2}
+
+QUOTE_CACHE_TTL = 0
+QUOTE_MAX_AGE = 0
@@ -1,6 +1,9 @@
 from django.contrib import admin
-from .models import Watchlist, Transaction, Portfolio
+from .models import Watchlist, Transaction, Portfolio, Quote, PriceAlert, TaxLot
 
 admin.site.register(Watchlist)
 admin.site.register(Transaction)
 admin.site.register(Portfolio)
+admin.site.register(Quote)
+admin.site.register(PriceAlert)
+admin.site.register(TaxLot)
@@ -0,0 +1,117 @@
+"""
+Price alerts.
+
+Active alerts live in an in-memory AlertBook (src/alerts_notification.py)
+indexed per symbol, so each price tick only touches the alerts it
+crosses. The book is filled from the PriceAlert table and topped up with
+newly created alerts before every evaluation; fired alerts are marked
+triggered in the database.
+
+Alerts cancelled from another process stay in this process's book until
+their price is crossed; evaluate() only updates rows that are still
+active, so they never fire.
+"""
+import threading
+
+from django.db import transaction
+from django.utils import timezone
+
+from src.alerts_notification import AlertBook
+from src.symbols import normalize
+
+from .models import PriceAlert
+from .quotes import PriceUnavailable, fetch_price
+
+UPDATE_CHUNK = 500
+
+book = AlertBook()
+_sync_lock = threading.Lock()
+_synced_id = 0  # highest PriceAlert id loaded into the book
+
+
+class AlertError(Exception):
+    pass
+
+
+def create_alert(user, stock_symbol, direction=None, target_price=None, percent=None):
+    """
+    Create an alert for a price threshold (direction + target_price) or a
+    % move from the current price (percent, e.g. 5 or -3).
+    """
+    stock_symbol = normalize(stock_symbol)
+    reference_price = None
+
+    if percent is not None:
+        if percent == 0:
+            raise AlertError("Percent move must not be zero")
+        try:
+            reference_price = fetch_price(stock_symbol)
+        except PriceUnavailable as e:
+            raise AlertError(str(e)) from e
+        target_price = reference_price * (1 + percent / 100)
+        direction = PriceAlert.ABOVE if percent > 0 else PriceAlert.BELOW
+    elif direction not in (PriceAlert.ABOVE, PriceAlert.BELOW) or target_price is None:
+        raise AlertError("Give a direction and target_price, or a percent move")
+
+    if target_price <= 0:
+        raise AlertError("Target price must be positive")
+
+    return PriceAlert.objects.create(
+        user=user,
+        stock_symbol=stock_symbol,
+        direction=direction,
+        target_price=target_price,
+        percent=percent,
+        reference_price=reference_price,
+    )
+
+
+def cancel_alert(user, alert_id):
+    cancelled = PriceAlert.objects.filter(user=user, pk=alert_id, active=True).update(active=False)
+    book.remove(alert_id)
+    return bool(cancelled)
+
+
+def sync(full=False):
+    """
+    Load alerts created since the last sync into the book (every active
+    alert, from scratch, when ``full``). Returns how many were added.
+    """
+    global _synced_id
+    with _sync_lock:
+        if full:
+            book.clear()
+            _synced_id = 0
+
+        rows = (
+            PriceAlert.objects.filter(active=True, id__gt=_synced_id)
+            .order_by("id")
+            .values_list("id", "stock_symbol", "direction", "target_price")
+        )
+        added = 0
+        for alert_id, symbol, direction, target in rows.iterator(chunk_size=5000):
+            book.add(alert_id, symbol, direction, target)
+            _synced_id = alert_id
+            added += 1
+        return added
+
+
+def evaluate(prices, at=None):
+    """
+    Feed a {symbol: price} tick through the book and mark every alert it
+    crossed as triggered. Returns the number of alerts triggered.
+    """
+    sync()
+    fired = book.update_many(prices)
+    if not fired:
+        return 0
+
+    at = at or timezone.now()
+    triggered = 0
+    with transaction.atomic():
+        for symbol, ids in fired.items():
+            for i in range(0, len(ids), UPDATE_CHUNK):
+                triggered += PriceAlert.objects.filter(
+                    pk__in=ids[i:i + UPDATE_CHUNK], active=True
+                ).update(active=False, triggered_at=at, triggered_price=prices[symbol])
+    return triggered
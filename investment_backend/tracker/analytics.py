@@ -0,0 +1,183 @@
+"""
+Portfolio summary for the dashboard, computed server-side.
+
+Position math is vectorized with NumPy over the user's holdings. The
+result is cached per user and keyed by the last projected transaction
+and the prices used, so it is reused until the next trade or price tick.
+
+Totals are in a base currency: market value at current FX rates, cost
+basis and realized P&L at the rate of each trade's day. Those two need a
+replay of the whole log and are cached separately, keyed by the last
+transaction only.
+
+The screener compares everything a user holds or watches side by side.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+from src.currency import convert, major
+
+from .fx import base_currency, currencies_of, fetch_rates, rates_at
+from .models import Portfolio, PortfolioCheckpoint, Watchlist
+from .projections import load_transactions, replay
+from .quotes import fetch_prices, history_store
+
+SUMMARY_TIMEOUT = 300
+REALIZED_TIMEOUT = 24 * 60 * 60
+SCREENER_TIMEOUT = 15 * 60
+
+
+def last_transaction_id(user):
+    return (
+        PortfolioCheckpoint.objects.filter(user=user)
+        .values_list("last_transaction_id", flat=True)
+        .first()
+    ) or 0
+
+
+def booked(user, last_id, base):
+    """
+    {"cost": {symbol: open cost basis}, "realized": {symbol: realized P&L}}
+    in ``base``, with every trade converted at the FX rate of its day;
+    NaN for symbols in a currency without any FX rate.
+    """
+    import pandas as pd
+
+    key = f"booked:{user.pk}:{last_id}:{base}"
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    df = load_transactions(user=user, id__lte=last_id)
+    result = {"cost": {}, "realized": {}}
+    if not df.empty:
+        currencies = currencies_of(df["stock_symbol"])
+        if any(major(c) != (base, 1) for c in currencies):
+            days = pd.to_datetime(df["created_at"], utc=True).dt.tz_localize(None).dt.normalize()
+            df["price"] = df["price"] * rates_at(currencies, days, base)
+
+        by_symbol = replay(df).groupby("stock_symbol")
+        result = {
+            "cost": by_symbol["cost"].last().to_dict(),
+            "realized": by_symbol["realized_pnl"].sum().to_dict(),
+        }
+        # No FX rate for the symbol's currency: its amounts are unknown
+        for symbol in df.loc[df["price"].isna(), "stock_symbol"].unique():
+            result["cost"][symbol] = result["realized"][symbol] = float("nan")
+    cache.set(key, result, REALIZED_TIMEOUT)
+    return result
+
+
+def portfolio_summary(user, currency=None):
+    """
+    Raises ValueError for an unsupported ``currency``.
+
+    Holdings that can't be priced right now (unknown symbol, slow provider
+    or missing FX rate) are carried at cost, flagged with
+    ``price_available`` and listed in ``missing_prices``. Holdings in a
+    currency with no FX rate at all have no cost either: their amounts
+    are null and left out of the totals.
+    """
+    import numpy as np
+
+    base = base_currency(currency)
+
+    holdings = list(
+        Portfolio.objects.filter(user=user)
+        .order_by("stock_symbol")
+        .values_list("stock_symbol", "total_quantity", "avg_buy_price")
+    )
+    symbols = [h[0] for h in holdings]
+    currencies = currencies_of(symbols)
+    prices = fetch_prices(symbols)
+    rates = fetch_rates(currencies, base)
+    last_id = last_transaction_id(user)
+
+    price_stamp = hashlib.md5(
+        repr((sorted(prices.items()), sorted(rates.items()))).encode()
+    ).hexdigest()
+    key = f"portfolio_summary:{user.pk}:{last_id}:{base}:{price_stamp}"
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    books = booked(user, last_id, base)
+    realized = books["realized"]
+
+    quantity = np.array([h[1] for h in holdings], dtype=float)
+    avg = np.array([h[2] for h in holdings], dtype=float)
+    price = np.array([prices.get(s, np.nan) for s in symbols], dtype=float)
+
+    # Cost at the FX rates paid, value at today's, both in the base currency
+    invested = np.array([books["cost"].get(s, 0.0) for s in symbols], dtype=float)
+    value = convert(quantity * price, currencies, rates)
+    available = ~np.isnan(value)
+    value = np.where(available, value, invested)
+    unrealized = value - invested
+    total_value = np.nansum(value)
+    weight = value / total_value if total_value else np.zeros_like(value)
+    position_realized = np.array([realized.get(s, 0.0) for s in symbols], dtype=float)
+
+    total_invested = float(np.nansum(invested))
+    total_realized = float(np.nansum(list(realized.values())))
+    summary = {
+        "currency": base,
+        "total_invested": round(total_invested, 2),
+        "market_value": round(float(total_value), 2),
+        "pnl": round(float(total_value) - total_invested, 2),
+        "unrealized_pnl": round(float(np.nansum(unrealized)), 2),
+        "realized_pnl": round(total_realized, 2),
+        "holdings": len(holdings),
+        "missing_prices": [s for i, s in enumerate(symbols) if not available[i]],
+        "positions": [
+            {
+                "stock_symbol": symbol,
+                "currency": currencies[i],
+                "total_quantity": int(quantity[i]),
+                "avg_buy_price": round(float(avg[i]), 2),
+                "current_price": round(float(price[i]), 2) if available[i] else None,
+                "price_available": bool(available[i]),
+                "invested": _round(invested[i]),
+                "market_value": _round(value[i]),
+                "unrealized_pnl": _round(unrealized[i]),
+                "realized_pnl": _round(position_realized[i]),
+                "weight": _round(weight[i], 4),
+            }
+            for i, symbol in enumerate(symbols)
+        ],
+    }
+    cache.set(key, summary, SUMMARY_TIMEOUT)
+    return summary
+
+
+def _round(value, digits=2):
+    """Rounded float, or None for NaN (an amount that couldn't be converted)."""
+    return None if value != value else round(float(value), digits)
+
+
+def user_symbols(user):
+    held = Portfolio.objects.filter(user=user).values_list("stock_symbol", flat=True)
+    watched = Watchlist.objects.filter(user=user).values_list("stock_symbol", flat=True)
+    return sorted(set(held) | set(watched))
+
+
+def screener(user, period="1y"):
+    """Raises ValueError for a period the history store doesn't know."""
+    # Loaded on first use: the screener pulls in pandas, pyarrow and yfinance
+    from src.history_store import PERIOD_DAYS
+    from src.screener import run_screen
+
+    if period not in PERIOD_DAYS and period not in ("ytd", "max"):
+        raise ValueError(f"Invalid period {period!r}")
+
+    symbols = user_symbols(user)
+    # Results only depend on the symbol set, so users watching the same
+    # names share one entry
+    digest = hashlib.md5(",".join(symbols).encode()).hexdigest()
+    key = f"screener:{period}:{digest}"
+    result = cache.get(key)
+    if result is None:
+        result = run_screen(symbols, period, history_store())
+        cache.set(key, result, SCREENER_TIMEOUT)
+    return result
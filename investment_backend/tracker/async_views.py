@@ -0,0 +1,146 @@
+"""
+Async variants of the tracker API for the ASGI app (``backend.asgi``).
+
+They return the same payloads as the DRF views in ``views.py`` but use
+the async ORM and never block the event loop on price lookups, so one
+worker can serve many users waiting on upstream quotes.
+"""
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from .models import Portfolio, Transaction, Watchlist
+from .orders import OrderError, apply_order
+from .quotes import UnknownSymbol, afetch_prices, price_error
+from .serializers import TransactionSerializer, WatchlistSerializer
+
+
+# ---------------- HELPERS ----------------
+def login_required_json(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=403,
+            )
+        return await view(request, user, *args, **kwargs)
+
+    return wrapper
+
+
+def parse_body(request):
+    if not request.body:
+        return {}
+    if request.content_type == "application/json":
+        return json.loads(request.body)
+    return request.POST.dict()
+
+
+# ---------------- PORTFOLIO ----------------
+@require_http_methods(["GET"])
+@login_required_json
+async def portfolio_list(request, user):
+    portfolio = [p async for p in Portfolio.objects.filter(user=user)]
+    prices = await afetch_prices(p.stock_symbol for p in portfolio)
+
+    data = [
+        {
+            "stock_symbol": p.stock_symbol,
+            "total_quantity": p.total_quantity,
+            "avg_buy_price": p.avg_buy_price,
+            "current_price": round(float(prices[p.stock_symbol]), 2) if p.stock_symbol in prices else None,
+            "price_available": p.stock_symbol in prices,
+        }
+        for p in portfolio
+    ]
+    return JsonResponse(data, safe=False)
+
+
+# ---------------- WATCHLIST ----------------
+@csrf_exempt
+@require_http_methods(["GET", "POST", "DELETE"])
+@login_required_json
+async def watchlist_list(request, user):
+    if request.method == "GET":
+        data = [
+            w async for w in Watchlist.objects.filter(user=user).values("stock_symbol")
+        ]
+        return JsonResponse(data, safe=False)
+
+    try:
+        serializer = WatchlistSerializer(data=parse_body(request))
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    stock_symbol = serializer.validated_data["stock_symbol"]
+
+    if request.method == "POST":
+        obj, created = await Watchlist.objects.aget_or_create(
+            user=user,
+            stock_symbol=stock_symbol
+        )
+
+        if not created:
+            return JsonResponse({"error": "Stock already exists"}, status=400)
+
+        return JsonResponse({"message": "Stock added"}, status=201)
+
+    deleted, _ = await Watchlist.objects.filter(
+        user=user, stock_symbol=stock_symbol
+    ).adelete()
+    if not deleted:
+        return JsonResponse({"error": "Stock not in watchlist"}, status=404)
+    return JsonResponse({"message": "Stock removed"}, status=200)
+
+
+# ---------------- BUY / SELL TRANSACTION ----------------
+@csrf_exempt
+@require_http_methods(["POST"])
+@login_required_json
+async def create_transaction(request, user):
+    try:
+        serializer = TransactionSerializer(data=parse_body(request))
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    stock_symbol = serializer.validated_data["stock_symbol"]
+    transaction_type = serializer.validated_data["transaction_type"]
+    quantity = serializer.validated_data["quantity"]
+
+    # Reject oversells before paying for a price lookup
+    if transaction_type == Transaction.SELL:
+        held = await Portfolio.objects.filter(
+            user=user, stock_symbol=stock_symbol
+        ).values_list("total_quantity", flat=True).afirst()
+
+        if not held or held < quantity:
+            return JsonResponse({"error": "Not enough shares to sell"}, status=400)
+
+    price = (await afetch_prices([stock_symbol])).get(stock_symbol)
+    if price is None:
+        error = price_error(stock_symbol)
+        status = 400 if isinstance(error, UnknownSymbol) else 503
+        return JsonResponse({"error": str(error)}, status=status)
+
+    try:
+        await sync_to_async(apply_order)(
+            user, stock_symbol, transaction_type, quantity, price
+        )
+    except OrderError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(
+        {"message": f"{transaction_type} transaction successful"},
+        status=201,
+    )
@@ -0,0 +1,88 @@
+"""
+FX rates for converting holdings to a base currency.
+
+Spot rates are pair symbols ("USDINR=X") looked up like quotes: through
+``fx_cache``, then the Quote table, then one batched provider call for
+the rest. Historical rates for cost basis are the pairs' daily closes
+from the history store.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+from src.currency import fx_pair, major, symbol_currency, to_base, validate
+from src.quote_cache import QuoteCache
+
+from .quotes import _load_quotes, history_store
+
+fx_cache = QuoteCache(
+    ttl=settings.FX_CACHE_TTL,
+    maxsize=256,
+    shared=caches[settings.QUOTE_CACHE_ALIAS] if settings.QUOTE_CACHE_ALIAS else None,
+    namespace="fx:",
+)
+
+
+def base_currency(currency=None):
+    """The requested base currency, else settings.BASE_CURRENCY (validated)."""
+    return validate(currency or settings.BASE_CURRENCY)
+
+
+def _pairs(currencies, base):
+    return sorted({fx_pair(major(c)[0], base) for c in currencies} - {fx_pair(base, base)})
+
+
+def fetch_rates(currencies, base):
+    """{quote currency: factor to ``base``} at current rates."""
+    pairs = _pairs(currencies, base)
+    return to_base(currencies, base, fx_cache.get_many(pairs, _load_quotes) if pairs else {})
+
+
+def rates_at(currencies, days, base):
+    """
+    Factor to ``base`` for each (currency, day) element, from the pair's
+    last daily close on or before the day. Days before the pair's history
+    starts use its first close; pairs without history use the spot rate,
+    and elements whose pair has neither are NaN (like ``convert``).
+    """
+    import numpy as np
+    import pandas as pd
+
+    currencies = np.asarray(currencies, dtype=object)
+    factors = np.ones(len(currencies))
+    pairs = _pairs(set(currencies), base)
+    if not pairs:
+        return factors / np.array([major(c)[1] for c in currencies], dtype=float)
+
+    from src.history_store import period_since
+    from src.screener import load_panel
+
+    days = pd.DatetimeIndex(days)
+    dates, found, closes = load_panel(pairs, period_since(days.min().date()), history_store())
+    spot = None
+
+    codes, inverse = np.unique(currencies, return_inverse=True)
+    for i, currency in enumerate(codes):
+        code, units = major(currency)
+        rows = inverse == i
+        if code == base:
+            factors[rows] = 1 / units
+            continue
+
+        pair = fx_pair(code, base)
+        rate = np.full(rows.sum(), np.nan)
+        if pair in found:
+            column = closes[:, found.index(pair)]
+            at = dates.searchsorted(days[rows], side="right") - 1
+            first = column[~np.isnan(column)][0]
+            rate = np.where(at >= 0, column[np.maximum(at, 0)], first)
+            rate = np.where(np.isnan(rate), first, rate)
+        else:
+            if spot is None:
+                spot = fx_cache.get_many(pairs, _load_quotes)
+            rate[:] = spot.get(pair, np.nan)
+        factors[rows] = rate / units
+    return factors
+
+
+def currencies_of(symbols):
+    return [symbol_currency(s) for s in symbols]
@@ -0,0 +1,155 @@
+"""
+Bulk import of historical trades from CSV or JSONL uploads.
+
+Rows are read from the upload as a stream, validated and inserted in
+chunks, and the user's holdings are projected once at the end. Prices
+come from the file, so an import makes no market-data calls.
+"""
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Transaction
+from .projections import project_user
+from .serializers import TransactionImportSerializer
+
+CHUNK_SIZE = 1000
+MAX_ERRORS = 50
+
+
+class ImportFailed(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} invalid row(s)")
+        self.errors = errors
+
+
+def detect_format(upload):
+    name = (upload.name or "").lower()
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in (upload.content_type or ""):
+        return "jsonl"
+    return "csv"
+
+
+def _decode(upload):
+    """Text lines of the upload; ImportFailed if it isn't UTF-8."""
+    lines = codecs.iterdecode(upload, "utf-8-sig")
+    number = 0
+    while True:
+        try:
+            line = next(lines)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            raise ImportFailed([{"row": number + 1, "errors": "File is not UTF-8 text"}])
+        number += 1
+        yield line
+
+
+def iter_rows(upload, fmt):
+    """Yield (line_number, row dict) from an uploaded file without loading it whole."""
+    lines = _decode(upload)
+
+    if fmt == "jsonl":
+        for number, line in enumerate(lines, start=1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except ValueError:
+                    yield number, None
+        return
+
+    # Line 1 is the CSV header
+    for number, row in enumerate(csv.DictReader(lines), start=2):
+        yield number, row
+
+
+def import_transactions(user, rows, chunk_size=CHUNK_SIZE):
+    """
+    Validate and insert ``rows`` for ``user``, then update their holdings.
+
+    Runs as one database transaction: if any row is invalid (bad fields,
+    or a SELL beyond the shares held on its date, counting the user's
+    existing trades) nothing is imported and ImportFailed lists the
+    offending rows.
+
+    Returns the number of transactions imported.
+    """
+    errors = []
+    rows_by_id = {}  # imported transaction id -> file row number
+    symbols = set()
+
+    with transaction.atomic():
+        # Same per-user lock as apply_order
+        User.objects.select_for_update().filter(pk=user.pk).first()
+
+        validator = TransactionImportSerializer()
+        rows = iter(rows)
+        while chunk := list(islice(rows, chunk_size)):
+            objs, numbers = [], []
+            for number, row in chunk:
+                if not isinstance(row, dict):
+                    errors.append({"row": number, "errors": "Invalid row"})
+                    continue
+                try:
+                    data = validator.run_validation(row)
+                except ValidationError as e:
+                    errors.append({"row": number, "errors": e.detail})
+                    continue
+                objs.append(Transaction(user=user, **data))
+                numbers.append(number)
+                symbols.add(data["stock_symbol"])
+
+            if len(errors) >= MAX_ERRORS:
+                break
+            # Valid rows go in even after an error, so the oversell check
+            # sees them; a failed import is rolled back as a whole
+            Transaction.objects.bulk_create(objs, batch_size=chunk_size)
+            rows_by_id.update(zip((t.pk for t in objs), numbers))
+
+        if len(errors) < MAX_ERRORS:
+            errors += _oversells(user, symbols, rows_by_id)
+        if errors:
+            errors.sort(key=lambda e: (e["row"] is None, e["row"] or 0))
+            raise ImportFailed(errors[:MAX_ERRORS])
+
+        # -------- UPDATE PORTFOLIO (ONCE) --------
+        project_user(user)
+
+    return len(rows_by_id)
+
+
+def _oversells(user, symbols, rows_by_id):
+    """
+    Replay the user's log for the imported ``symbols`` in date order and
+    report SELLs that go below zero shares from the first imported trade
+    on (backdated SELLs, or later SELLs left uncovered by them).
+    """
+    held = {}
+    touched = set()
+    errors = []
+    log = (
+        Transaction.objects.filter(user=user, stock_symbol__in=symbols)
+        .order_by("created_at", "id")
+        .values_list("id", "stock_symbol", "transaction_type", "quantity", "created_at")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for pk, symbol, transaction_type, quantity, created_at in log:
+        if pk in rows_by_id:
+            touched.add(symbol)
+        if transaction_type == Transaction.SELL:
+            quantity = -quantity
+        held[symbol] = held.get(symbol, 0) + quantity
+        if held[symbol] < 0 and symbol in touched:
+            held[symbol] = 0
+            errors.append({
+                "row": rows_by_id.get(pk),
+                "errors": f"Not enough {symbol} shares to sell on {created_at:%Y-%m-%d}",
+            })
+            if len(errors) >= MAX_ERRORS:
+                break
+    return errors
@@ -0,0 +1,245 @@
+"""
+Tax-lot tracking: SELLs matched against the BUY lots they close.
+
+Every holding keeps its open lots in a LotQueue, a deque of
+``[transaction_id, quantity, price]`` in trade order: by ``created_at``,
+then id, so imported backdated trades take their place in the history. A SELL consumes lots
+from the front (FIFO) or the back (LIFO); under AVERAGE the queue holds a
+single lot whose price is the running average cost, which matches the
+``avg_buy_price`` of Portfolio rows. Each step is O(lots touched), so
+matching a whole log is one pass over it.
+
+Open lots for settings.LOT_METHOD are stored as TaxLot rows, another
+projection of the Transaction log kept in step with Portfolio rows by
+``projections`` (same checkpoint, same database transaction). Realized
+P&L under any method is recomputed from the log on request and cached by
+the last transaction.
+"""
+import logging
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import TaxLot, Transaction
+
+FIFO = "FIFO"
+LIFO = "LIFO"
+AVERAGE = "AVERAGE"
+METHODS = (FIFO, LIFO, AVERAGE)
+
+LOT_COLUMNS = ["id", "stock_symbol", "transaction_type", "quantity", "price"]
+TRADE_ORDER = ("created_at", "id")
+REALIZED_TIMEOUT = 24 * 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+def lot_method(method=None):
+    """
+    ``method`` (default settings.LOT_METHOD), upper-cased; raises
+    ValueError if it isn't one of METHODS.
+    """
+    method = (method or settings.LOT_METHOD).upper()
+    if method not in METHODS:
+        raise ValueError(f"Unknown lot method {method!r}, expected one of {', '.join(METHODS)}")
+    return method
+
+
+class LotQueue:
+    """Open lots of one holding, oldest first."""
+
+    __slots__ = ("method", "lots", "quantity")
+
+    def __init__(self, method=FIFO, lots=()):
+        self.method = lot_method(method)
+        self.lots = deque([lot_id, quantity, price] for lot_id, quantity, price in lots)
+        self.quantity = sum(lot[1] for lot in self.lots)
+
+    def __len__(self):
+        return len(self.lots)
+
+    def __iter__(self):
+        return (tuple(lot) for lot in self.lots)
+
+    def buy(self, lot_id, quantity, price):
+        if self.method == AVERAGE and self.lots:
+            lot = self.lots[0]
+            total = lot[1] + quantity
+            lot[2] = (lot[1] * lot[2] + quantity * price) / total
+            lot[1] = total
+        else:
+            self.lots.append([lot_id, quantity, price])
+        self.quantity += quantity
+
+    def sell(self, quantity):
+        """
+        Close ``quantity`` shares; returns their cost basis. Older logs
+        could oversell: only the shares in open lots are closed.
+        """
+        if quantity > self.quantity:
+            logger.warning("Selling %s shares with %s in open lots", quantity, self.quantity)
+            quantity = self.quantity
+
+        lots = self.lots
+        lifo = self.method == LIFO
+        cost = 0.0
+        left = quantity
+        while left:
+            lot = lots[-1] if lifo else lots[0]
+            used = lot[1] if lot[1] < left else left
+            cost += used * lot[2]
+            left -= used
+            lot[1] -= used
+            if not lot[1]:
+                if lifo:
+                    lots.pop()
+                else:
+                    lots.popleft()
+        self.quantity -= quantity
+        return cost
+
+
+def match(rows, method=FIFO, queues=None):
+    """
+    Run ``rows`` of (id, key, transaction_type, quantity, price), in trade
+    order, through one LotQueue per key (a symbol, or (user_id, symbol)).
+
+    Returns ``(realized, queues)``: realized is {key: [proceeds, cost]}
+    for the keys with SELLs, counting only shares that closed a lot;
+    queues maps every key to its open lots, starting from ``queues`` if
+    given.
+    """
+    method = lot_method(method)
+    queues = {} if queues is None else queues
+    realized = {}
+    buy = Transaction.BUY
+
+    for row_id, key, transaction_type, quantity, price in rows:
+        queue = queues.get(key)
+        if queue is None:
+            queue = queues[key] = LotQueue(method)
+
+        if transaction_type == buy:
+            queue.buy(row_id, quantity, price)
+            continue
+
+        totals = realized.get(key)
+        if totals is None:
+            totals = realized[key] = [0.0, 0.0]
+        sold = min(quantity, queue.quantity)
+        totals[0] += sold * price
+        totals[1] += queue.sell(quantity)
+
+    return realized, queues
+
+
+# ---------------- STORED LOTS ----------------
+def _lot_rows(queues):
+    """TaxLot objects for queues keyed by (user_id, stock_symbol)."""
+    return [
+        TaxLot(
+            user_id=user_id, stock_symbol=symbol, transaction_id=lot_id,
+            quantity=quantity, price=price,
+        )
+        for (user_id, symbol), queue in queues.items()
+        for lot_id, quantity, price in queue
+    ]
+
+
+def apply(user, transactions):
+    """
+    Fold new Transaction objects, none older than the trades already
+    matched, into the user's stored lots.
+    """
+    method = lot_method()
+    symbols = {t.stock_symbol for t in transactions}
+    stored = TaxLot.objects.filter(user=user, stock_symbol__in=symbols)
+
+    queues = {}
+    for symbol, lot_id, quantity, price in stored.order_by(
+        "transaction__created_at", "transaction_id"
+    ).values_list("stock_symbol", "transaction_id", "quantity", "price"):
+        key = (user.pk, symbol)
+        queue = queues.get(key)
+        if queue is None:
+            queue = queues[key] = LotQueue(method)
+        queue.buy(lot_id, quantity, price)
+
+    match(
+        (
+            (t.id, (user.pk, t.stock_symbol), t.transaction_type, t.quantity, t.price)
+            for t in sorted(transactions, key=lambda t: (t.created_at, t.id))
+        ),
+        method, queues,
+    )
+    stored.delete()
+    TaxLot.objects.bulk_create(_lot_rows(queues))
+
+
+def rebuild(df, users=None):
+    """
+    Replace stored lots with a fresh match of a transactions DataFrame
+    (projections.TRANSACTION_COLUMNS); only ``users``' lots if given.
+    """
+    df = df.sort_values(list(TRADE_ORDER), kind="stable")
+    keys = zip(df["user_id"].tolist(), df["stock_symbol"].tolist())
+    _, queues = match(
+        zip(df["id"].tolist(), keys, df["transaction_type"].tolist(),
+            df["quantity"].tolist(), df["price"].tolist()),
+        lot_method(),
+    )
+
+    stored = TaxLot.objects.all()
+    if users is not None:
+        stored = stored.filter(user__in=users)
+    stored.delete()
+    TaxLot.objects.bulk_create(_lot_rows(queues), batch_size=5000)
+
+
+# ---------------- REALIZED P&L ----------------
+def realized_report(user, method=None, last_id=None):
+    """
+    Realized P&L per symbol and the open lots left, matching the user's
+    whole log under ``method`` (default settings.LOT_METHOD).
+    """
+    from .analytics import last_transaction_id
+
+    method = lot_method(method)
+    if last_id is None:
+        last_id = last_transaction_id(user)
+
+    key = f"realized_lots:{user.pk}:{last_id}:{method}"
+    report = cache.get(key)
+    if report is not None:
+        return report
+
+    rows = (
+        Transaction.objects.filter(user=user, id__lte=last_id)
+        .order_by(*TRADE_ORDER)
+        .values_list(*LOT_COLUMNS)
+        .iterator(chunk_size=10000)
+    )
+    realized, queues = match(rows, method)
+
+    positions = [
+        {
+            "stock_symbol": symbol,
+            "proceeds": round(proceeds, 2),
+            "cost_basis": round(cost, 2),
+            "realized_pnl": round(proceeds - cost, 2),
+        }
+        for symbol, (proceeds, cost) in sorted(realized.items())
+    ]
+    report = {
+        "method": method,
+        "realized_pnl": round(sum(p - c for p, c in realized.values()), 2),
+        "positions": positions,
+        "open_lots": [
+            {"stock_symbol": symbol, "transaction_id": lot_id, "quantity": quantity, "price": price}
+            for symbol, queue in sorted(queues.items())
+            for lot_id, quantity, price in queue
+        ],
+    }
+    cache.set(key, report, REALIZED_TIMEOUT)
+    return report
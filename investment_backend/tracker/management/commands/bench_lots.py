@@ -0,0 +1,98 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tracker.lots import METHODS, match, realized_report
+from tracker.models import Transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Time lot matching (FIFO, LIFO, AVERAGE) over one user's synthetic "
+        "trade log. With --db the log is also written to a throwaway test "
+        "database and the realized P&L report is timed end to end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--trades", type=int, default=100_000)
+        parser.add_argument("--symbols", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--db", action="store_true")
+
+    def handle(self, *args, **options):
+        rows = self.trades(options["trades"], options["symbols"])
+        sells = sum(1 for row in rows if row[2] == Transaction.SELL)
+        self.stdout.write(f"{len(rows):,} trades ({sells:,} sells) over {options['symbols']} symbols")
+
+        for method in METHODS:
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                realized, queues = match(rows, method)
+                timings.append(time.perf_counter() - started)
+            pnl = sum(proceeds - cost for proceeds, cost in realized.values())
+            lots = sum(len(queue) for queue in queues.values())
+            self.stdout.write(
+                f"  {method:<8} match {statistics.median(timings) * 1000:7.1f} ms   "
+                f"realized {pnl:>16,.2f}   {lots:,} open lots"
+            )
+
+        if options["db"]:
+            self.run_db(rows, options)
+
+    def trades(self, count, symbol_count):
+        """(id, symbol, type, quantity, price) rows that never oversell."""
+        rng = random.Random(42)
+        symbols = [f"SYM{i:04d}.NS" for i in range(symbol_count)]
+        held = dict.fromkeys(symbols, 0)
+        price = {s: rng.uniform(50, 5000) for s in symbols}
+
+        rows = []
+        for row_id in range(1, count + 1):
+            symbol = rng.choice(symbols)
+            price[symbol] *= 1 + rng.gauss(0, 0.02)
+            if held[symbol] and rng.random() < 0.4:
+                quantity = rng.randint(1, held[symbol])
+                held[symbol] -= quantity
+                rows.append((row_id, symbol, Transaction.SELL, quantity, price[symbol]))
+            else:
+                quantity = rng.randint(1, 50)
+                held[symbol] += quantity
+                rows.append((row_id, symbol, Transaction.BUY, quantity, price[symbol]))
+        return rows
+
+    def run_db(self, rows, options):
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = User.objects.create(username="bench-lots")
+            Transaction.objects.bulk_create(
+                [
+                    Transaction(
+                        user=user, stock_symbol=symbol, transaction_type=ttype,
+                        quantity=quantity, price=price,
+                    )
+                    for _, symbol, ttype, quantity, price in rows
+                ],
+                batch_size=10_000,
+            )
+            last_id = Transaction.objects.latest("id").id
+
+            for method in METHODS:
+                timings = []
+                for _ in range(options["repeat"]):
+                    cache.clear()
+                    started = time.perf_counter()
+                    realized_report(user, method, last_id=last_id)
+                    timings.append(time.perf_counter() - started)
+                self.stdout.write(
+                    f"  {method:<8} report from {connection.vendor} "
+                    f"{statistics.median(timings) * 1000:7.1f} ms"
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,159 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from tracker.models import Portfolio, Transaction, Watchlist
+from tracker.pagination import TransactionCursorPagination, after
+from tracker.projections import applied_trade_times, new_transactions
+from tracker.quotes import tracked_symbols
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with synthetic data and report "
+        "timings and EXPLAIN plans for the queries behind every tracker view. "
+        "Runs against the configured database (SQLite, or PostgreSQL via "
+        "DATABASE_URL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--transactions", type=int, default=200_000)
+        parser.add_argument("--symbols", type=int, default=300)
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument(
+            "--drop-indexes", action="store_true",
+            help="Drop the tracker Meta.indexes first, to compare plans without them.",
+        )
+        parser.add_argument("--no-explain", action="store_true")
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            if options["drop_indexes"]:
+                self.drop_indexes()
+            started = time.monotonic()
+            users, symbols = self.seed(options)
+            self.stdout.write(
+                f"Seeded {options['transactions']:,} transactions for {len(users)} users "
+                f"on {connection.vendor} in {time.monotonic() - started:.1f}s\n"
+            )
+            self.run_queries(users, symbols, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    # ---------------- SETUP ----------------
+    def drop_indexes(self):
+        with connection.schema_editor() as editor:
+            for model in (Transaction, Portfolio, Watchlist):
+                for index in model._meta.indexes:
+                    editor.remove_index(model, index)
+
+    def seed(self, options):
+        rng = random.Random(42)
+        symbols = [f"SYM{i:04d}.NS" for i in range(options["symbols"])]
+
+        User.objects.bulk_create(
+            [User(username=f"bench{i}") for i in range(options["users"])],
+            batch_size=1000,
+        )
+        users = list(User.objects.filter(username__startswith="bench").values_list("id", flat=True))
+
+        start = timezone.now() - timedelta(days=5 * 365)
+        seconds = 5 * 365 * 86400
+        batch = []
+        for _ in range(options["transactions"]):
+            batch.append(Transaction(
+                user_id=rng.choice(users),
+                stock_symbol=rng.choice(symbols),
+                transaction_type=Transaction.BUY,
+                quantity=rng.randint(1, 50),
+                price=rng.uniform(50, 5000),
+                created_at=start + timedelta(seconds=rng.randrange(seconds)),
+            ))
+            if len(batch) == 10_000:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        Transaction.objects.bulk_create(batch)
+
+        holdings = [
+            Portfolio(user_id=u, stock_symbol=s, total_quantity=10, avg_buy_price=100)
+            for u in users for s in rng.sample(symbols, 20)
+        ]
+        Portfolio.objects.bulk_create(holdings, batch_size=5000, ignore_conflicts=True)
+        watched = [
+            Watchlist(user_id=u, stock_symbol=s)
+            for u in users for s in rng.sample(symbols, 10)
+        ]
+        Watchlist.objects.bulk_create(watched, batch_size=5000, ignore_conflicts=True)
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return users, symbols
+
+    # ---------------- QUERIES ----------------
+    def view_queries(self, user_id, symbol, checkpoint):
+        """
+        (label, queryset) pairs mirroring what each view runs; the replay
+        ones are projections' own querysets, ``checkpoint`` being the
+        user's second-newest transaction (one order to fold in).
+        """
+        history = Transaction.objects.filter(user_id=user_id).order_by(
+            *TransactionCursorPagination.ordering
+        )
+        cutoff = timezone.now() - timedelta(days=365)
+        return [
+            ("portfolio_list", Portfolio.objects.filter(user_id=user_id)),
+            ("watchlist_list GET", Watchlist.objects.filter(user_id=user_id)),
+            ("create_transaction: holding", Portfolio.objects.filter(user_id=user_id, stock_symbol=symbol)[:1]),
+            ("create_transaction: new trades", new_transactions(user_id, checkpoint)),
+            ("create_transaction: latest", applied_trade_times(user_id, checkpoint)[:1]),
+            ("transaction_list page 1", history[:51]),
+            ("transaction_list next page", history.filter(after(cutoff, 0))[:51]),
+            ("transaction_list ?symbol=", history.filter(stock_symbol=symbol)[:51]),
+            ("refresh_quotes: held", Portfolio.objects.values_list("stock_symbol", flat=True).distinct()),
+            ("refresh_quotes: watched", Watchlist.objects.values_list("stock_symbol", flat=True).distinct()),
+        ]
+
+    def run_queries(self, users, symbols, options):
+        rng = random.Random(7)
+        checkpoints = {
+            user_id: Transaction.objects.filter(user_id=user_id)
+            .order_by("-id").values_list("id", flat=True)[1:2].first() or 0
+            for user_id in users
+        }
+        labels = [label for label, _ in self.view_queries(users[0], symbols[0], checkpoints[users[0]])]
+        timings = {label: [] for label in labels}
+
+        for _ in range(options["repeat"]):
+            user_id = rng.choice(users)
+            queries = self.view_queries(user_id, rng.choice(symbols), checkpoints[user_id])
+            for label, qs in queries:
+                started = time.perf_counter()
+                list(qs)
+                timings[label].append(time.perf_counter() - started)
+
+        self.stdout.write(f"{'query':<32}{'median ms':>10}{'p95 ms':>10}")
+        for label in labels:
+            t = sorted(timings[label])
+            self.stdout.write(
+                f"{label:<32}{statistics.median(t) * 1000:>10.3f}"
+                f"{t[int(len(t) * 0.95) - 1] * 1000:>10.3f}"
+            )
+
+        # tracked_symbols is what the scheduler actually calls
+        started = time.perf_counter()
+        tracked_symbols()
+        self.stdout.write(f"{'tracked_symbols()':<32}{(time.perf_counter() - started) * 1000:>10.3f}")
+
+        if options["no_explain"]:
+            return
+        for label, qs in self.view_queries(users[0], symbols[0], checkpoints[users[0]]):
+            self.stdout.write(f"\n--- {label}\n{qs.explain()}")
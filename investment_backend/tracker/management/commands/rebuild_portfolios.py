@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tracker.projections import rebuild_all, rebuild_user, verify
+
+
+class Command(BaseCommand):
+    help = "Rebuild (or verify) Portfolio rows from the Transaction log."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this username.")
+        parser.add_argument(
+            "--verify", action="store_true",
+            help="Report holdings that differ from the log without writing.",
+        )
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = User.objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"Unknown user {options['user']!r}")
+
+        started = time.monotonic()
+
+        if options["verify"]:
+            drift = verify(user)
+            for user_id, symbol, stored, expected in drift:
+                self.stdout.write(f"user {user_id} {symbol}: stored={stored} expected={expected}")
+            self.stdout.write(
+                f"{len(drift)} holding(s) out of sync ({time.monotonic() - started:.2f}s)"
+            )
+            return
+
+        replayed = rebuild_user(user) if user else rebuild_all()
+        self.stdout.write(
+            f"Replayed {replayed} transaction(s) in {time.monotonic() - started:.2f}s"
+        )
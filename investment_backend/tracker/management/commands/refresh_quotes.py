@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tracker.alerts import evaluate
+from tracker.quotes import refresh_quotes, tracked_symbols
+
+
+class Command(BaseCommand):
+    help = (
+        "Keep the Quote table warm for every held, watched or alerted symbol "
+        "and trigger the price alerts each refresh crosses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=float, default=settings.QUOTE_REFRESH_INTERVAL,
+            help="Seconds between refresh rounds.",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Run a single refresh round and exit.",
+        )
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--retries", type=int, default=3)
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            symbols = tracked_symbols()
+            prices = refresh_quotes(
+                symbols,
+                batch_size=options["batch_size"],
+                workers=options["workers"],
+                retries=options["retries"],
+            )
+            triggered = evaluate(prices)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"Refreshed {len(prices)}/{len(symbols)} quotes in {elapsed:.2f}s, "
+                f"{triggered} alert(s) triggered"
+            )
+
+            if options["once"]:
+                return
+            time.sleep(max(0, options["interval"] - elapsed))
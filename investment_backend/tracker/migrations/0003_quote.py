@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_alter_portfolio_avg_buy_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Quote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_symbol', models.CharField(max_length=20, unique=True)),
+                ('price', models.FloatField()),
+                ('fetched_at', models.DateTimeField()),
+            ],
+        ),
+    ]
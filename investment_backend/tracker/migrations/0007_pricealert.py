@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-18 18:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_symbol', models.CharField(max_length=20)),
+                ('direction', models.CharField(choices=[('ABOVE', 'Above'), ('BELOW', 'Below')], max_length=5)),
+                ('target_price', models.FloatField()),
+                ('percent', models.FloatField(blank=True, null=True)),
+                ('reference_price', models.FloatField(blank=True, null=True)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('triggered_at', models.DateTimeField(blank=True, null=True)),
+                ('triggered_price', models.FloatField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['active', 'stock_symbol'], name='pricealert_active_symbol_idx'), models.Index(fields=['user', '-created_at'], name='pricealert_user_created_idx')],
+            },
+        ),
+    ]
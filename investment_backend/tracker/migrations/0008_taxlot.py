@@ -0,0 +1,82 @@
+# Generated by Django 6.0.1 on 2026-10-18 19:05
+
+from collections import defaultdict, deque
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_lots(apps, schema_editor):
+    """
+    Match the existing log, so holdings open before this have their lots.
+
+    The matching is a frozen copy of tracker.lots as of this migration.
+    Oversells in old logs close what is open and skip the rest.
+    """
+    Transaction = apps.get_model('tracker', 'Transaction')
+    TaxLot = apps.get_model('tracker', 'TaxLot')
+    method = settings.LOT_METHOD.upper()
+
+    queues = defaultdict(deque)
+    rows = (
+        Transaction.objects.order_by('created_at', 'id')
+        .values_list('id', 'user_id', 'stock_symbol', 'transaction_type', 'quantity', 'price')
+        .iterator(chunk_size=10000)
+    )
+    for lot_id, user_id, symbol, ttype, quantity, price in rows:
+        lots = queues[user_id, symbol]
+        if ttype == 'BUY':
+            if method == 'AVERAGE' and lots:
+                lot = lots[0]
+                lot[2] = (lot[1] * lot[2] + quantity * price) / (lot[1] + quantity)
+                lot[1] += quantity
+            else:
+                lots.append([lot_id, quantity, price])
+            continue
+
+        while quantity and lots:
+            lot = lots[-1] if method == 'LIFO' else lots[0]
+            used = min(lot[1], quantity)
+            lot[1] -= used
+            quantity -= used
+            if not lot[1]:
+                if method == 'LIFO':
+                    lots.pop()
+                else:
+                    lots.popleft()
+
+    TaxLot.objects.bulk_create(
+        [
+            TaxLot(user_id=user_id, stock_symbol=symbol, transaction_id=lot_id, quantity=quantity, price=price)
+            for (user_id, symbol), lots in queues.items()
+            for lot_id, quantity, price in lots
+        ],
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_pricealert'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaxLot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_symbol', models.CharField(max_length=20)),
+                ('quantity', models.PositiveIntegerField()),
+                ('price', models.FloatField()),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lots', to='tracker.transaction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'stock_symbol', 'transaction'], name='taxlot_user_symbol_idx')],
+            },
+        ),
+        migrations.RunPython(open_lots, migrations.RunPython.noop),
+    ]
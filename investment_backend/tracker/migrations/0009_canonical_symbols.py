@@ -0,0 +1,81 @@
+# Generated by Django 6.0.1 on 2026-10-18 20:40
+
+from django.db import migrations
+
+# Bare tickers that resolved to an NSE listing in src/symbols.csv when this
+# migration was written. Frozen here so every database is rewritten the
+# same way whatever the listing (or SYMBOLS_FILE) says later; any other
+# symbol is only upper-cased.
+NSE_TICKERS = (
+    'RELIANCE', 'TCS', 'HDFCBANK', 'ICICIBANK', 'INFY', 'HINDUNILVR', 'ITC',
+    'SBIN', 'BHARTIARTL', 'KOTAKBANK', 'LT', 'AXISBANK', 'BAJFINANCE',
+    'ASIANPAINT', 'MARUTI', 'HCLTECH', 'SUNPHARMA', 'TITAN', 'ULTRACEMCO',
+    'WIPRO', 'NESTLEIND', 'ONGC', 'NTPC', 'POWERGRID', 'TATAMOTORS',
+    'TATASTEEL', 'ADANIENT', 'ADANIPORTS', 'JSWSTEEL', 'COALINDIA',
+    'BAJAJFINSV', 'TECHM', 'M&M', 'HDFCLIFE', 'SBILIFE', 'GRASIM', 'DRREDDY',
+    'CIPLA', 'BRITANNIA', 'EICHERMOT', 'HEROMOTOCO', 'DIVISLAB', 'APOLLOHOSP',
+    'INDUSINDBK', 'HINDALCO', 'BPCL', 'TATACONSUM', 'UPL', 'ZOMATO', 'DMART',
+)
+CANONICAL = {ticker: ticker + '.NS' for ticker in NSE_TICKERS}
+
+
+def canonicalize(apps, schema_editor):
+    """
+    Rewrite stored symbols to the form new requests use ("reliance" and
+    "RELIANCE" -> "RELIANCE.NS"), so old rows can still be found, sold
+    and deleted. Rows that collide with an existing canonical one are
+    merged into it.
+    """
+    def canon(symbol):
+        text = symbol.strip().upper()
+        return CANONICAL.get(text, text)
+
+    def renames(model):
+        symbols = model.objects.values_list('stock_symbol', flat=True).distinct()
+        return {s: canon(s) for s in symbols if canon(s) != s}
+
+    for name in ('Transaction', 'TaxLot', 'PriceAlert'):
+        model = apps.get_model('tracker', name)
+        for old, new in renames(model).items():
+            model.objects.filter(stock_symbol=old).update(stock_symbol=new)
+
+    Watchlist = apps.get_model('tracker', 'Watchlist')
+    for old, new in renames(Watchlist).items():
+        for row in Watchlist.objects.filter(stock_symbol=old):
+            if Watchlist.objects.filter(user_id=row.user_id, stock_symbol=new).exists():
+                row.delete()
+            else:
+                row.stock_symbol = new
+                row.save(update_fields=['stock_symbol'])
+
+    # Average-cost holdings merge into one at their combined cost
+    Portfolio = apps.get_model('tracker', 'Portfolio')
+    for old, new in renames(Portfolio).items():
+        for row in Portfolio.objects.filter(stock_symbol=old):
+            target = Portfolio.objects.filter(user_id=row.user_id, stock_symbol=new).first()
+            if target is None:
+                row.stock_symbol = new
+                row.save(update_fields=['stock_symbol'])
+                continue
+            quantity = target.total_quantity + row.total_quantity
+            target.avg_buy_price = (
+                target.total_quantity * target.avg_buy_price + row.total_quantity * row.avg_buy_price
+            ) / quantity
+            target.total_quantity = quantity
+            target.save(update_fields=['total_quantity', 'avg_buy_price'])
+            row.delete()
+
+    # Cached prices are refetched under the new key
+    Quote = apps.get_model('tracker', 'Quote')
+    Quote.objects.filter(stock_symbol__in=list(renames(Quote))).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_taxlot'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalize, migrations.RunPython.noop),
+    ]
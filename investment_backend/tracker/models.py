@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Watchlist(models.Model):
@@ -9,6 +10,10 @@ class Watchlist(models.Model):
 
     class Meta:
         unique_together = ('user', 'stock_symbol')
+        indexes = [
+            # distinct symbols for refresh_quotes
+            models.Index(fields=['stock_symbol'], name='watchlist_symbol_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.stock_symbol}"
@@ -28,7 +33,18 @@ class Transaction(models.Model):
     transaction_type = models.CharField(max_length=4, choices=TRANSACTION_CHOICES)
     quantity = models.PositiveIntegerField()
     price = models.FloatField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: imported trades keep their original timestamps
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # transaction_list: newest first, keyset pagination
+            models.Index(fields=['user', '-created_at', '-id'], name='transaction_user_created_idx'),
+            # per-holding lookups and ?symbol= filters
+            models.Index(fields=['user', 'stock_symbol', '-created_at', '-id'], name='transaction_user_symbol_idx'),
+            # project_user: rows after the user's checkpoint
+            models.Index(fields=['user', 'id'], name='transaction_user_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.transaction_type} - {self.stock_symbol}"
@@ -44,6 +60,81 @@ class Portfolio(models.Model):
 
     class Meta:
         unique_together = ('user', 'stock_symbol')
+        indexes = [
+            # distinct symbols for refresh_quotes
+            models.Index(fields=['stock_symbol'], name='portfolio_symbol_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.stock_symbol}"
+
+
+class Quote(models.Model):
+    stock_symbol = models.CharField(max_length=20, unique=True)
+    price = models.FloatField()
+    fetched_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.stock_symbol} - {self.price}"
+
+
+class PortfolioCheckpoint(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    # Last Transaction id already folded into the user's Portfolio rows
+    last_transaction_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.last_transaction_id}"
+
+
+class PriceAlert(models.Model):
+    ABOVE = 'ABOVE'
+    BELOW = 'BELOW'
+
+    DIRECTION_CHOICES = [
+        (ABOVE, 'Above'),
+        (BELOW, 'Below'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    stock_symbol = models.CharField(max_length=20)
+    direction = models.CharField(max_length=5, choices=DIRECTION_CHOICES)
+    # % alerts are stored as an absolute target off the price at creation
+    target_price = models.FloatField()
+    percent = models.FloatField(null=True, blank=True)
+    reference_price = models.FloatField(null=True, blank=True)
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    triggered_at = models.DateTimeField(null=True, blank=True)
+    triggered_price = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # distinct alerted symbols for refresh_quotes
+            models.Index(fields=['active', 'stock_symbol'], name='pricealert_active_symbol_idx'),
+            # the user's alert list, newest first
+            models.Index(fields=['user', '-created_at'], name='pricealert_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.stock_symbol} {self.direction} {self.target_price}"
+
+
+class TaxLot(models.Model):
+    """What is left of one BUY, matched against later SELLs by settings.LOT_METHOD."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    stock_symbol = models.CharField(max_length=20)
+    # The BUY that opened the lot; under average cost, the first BUY of the holding
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='lots')
+    quantity = models.PositiveIntegerField()
+    price = models.FloatField()
+
+    class Meta:
+        indexes = [
+            # open lots of the holdings an order touches, in lot order
+            models.Index(fields=['user', 'stock_symbol', 'transaction'], name='taxlot_user_symbol_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.stock_symbol} {self.quantity} @ {self.price}"
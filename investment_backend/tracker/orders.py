@@ -0,0 +1,47 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .models import Portfolio, Transaction
+from .projections import project_user
+
+
+class OrderError(Exception):
+    pass
+
+
+def apply_order(user, stock_symbol, transaction_type, quantity, price):
+    """
+    Record a BUY/SELL transaction and update the user's holding.
+
+    Runs in one database transaction with the user's row locked
+    (SELECT ... FOR UPDATE), so concurrent orders for the same user are
+    applied one after another: a SELL always sees the quantity left by
+    the previous order and can never oversell. Orders of different users
+    do not wait on each other.
+
+    Raises OrderError when a SELL exceeds the shares held.
+    """
+    with transaction.atomic():
+        User.objects.select_for_update().filter(pk=user.pk).first()
+
+        # SELL validation
+        if transaction_type == Transaction.SELL:
+            portfolio = Portfolio.objects.filter(
+                user=user, stock_symbol=stock_symbol
+            ).first()
+
+            if not portfolio or portfolio.total_quantity < quantity:
+                raise OrderError("Not enough shares to sell")
+
+        # Save transaction
+        Transaction.objects.create(
+            user=user,
+            stock_symbol=stock_symbol,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            price=price,
+        )
+
+        # -------- UPDATE PORTFOLIO (ONLY PLACE) --------
+        # Portfolio rows are a projection of the transaction log
+        project_user(user)
@@ -0,0 +1,91 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def after(created_at, pk, reverse=False):
+    """
+    Rows past (created_at, id) in newest-first order (before it if
+    ``reverse``). The bare bound on created_at lets the database seek the
+    (user, created_at, id) index; the OR only settles ties.
+    """
+    if reverse:
+        return Q(created_at__gte=created_at) & (Q(created_at__gt=created_at) | Q(id__gt=pk))
+    return Q(created_at__lte=created_at) & (Q(created_at__lt=created_at) | Q(id__lt=pk))
+
+
+class TransactionCursorPagination(BasePagination):
+    """
+    Keyset pagination on (created_at, id), newest first.
+
+    The cursor is an opaque token holding both values of the row it starts
+    after, so pages stay exact however many rows share a ``created_at``
+    (date-only imports do), and no page costs more than an index seek.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = 50
+    page_size_query_param = "limit"
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        if cursor is None:
+            reverse = False
+        else:
+            created_at, pk, reverse = cursor
+            queryset = queryset.filter(after(created_at, pk, reverse))
+
+        ordering = ("created_at", "id") if reverse else self.ordering
+        rows = list(queryset.order_by(*ordering)[:size + 1])
+        more = len(rows) > size
+        rows = rows[:size]
+        if reverse:
+            rows.reverse()
+
+        # Going forward there is a previous page if we came from one, and
+        # going back there is a next page by construction
+        has_next = (not reverse and more) or (reverse and bool(rows))
+        has_previous = (reverse and more) or (not reverse and cursor is not None and bool(rows))
+        self.next = self.encode_cursor(rows[-1], False) if has_next else None
+        self.previous = self.encode_cursor(rows[0], True) if has_previous else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(size, self.max_page_size) if size > 0 else self.page_size
+
+    def decode_cursor(self, request):
+        """(created_at, id, reverse) from ?cursor=, or None on the first page."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            created_at, pk, reverse = json.loads(base64.urlsafe_b64decode(token.encode()))
+            created_at = parse_datetime(created_at)
+            if created_at is None or not isinstance(pk, int):
+                raise ValueError(token)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk, bool(reverse)
+
+    def encode_cursor(self, row, reverse):
+        token = json.dumps([row.created_at.isoformat(), row.pk, reverse], separators=(",", ":"))
+        token = base64.urlsafe_b64encode(token.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next, "previous": self.previous, "results": data})
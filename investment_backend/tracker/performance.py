@@ -0,0 +1,273 @@
+"""
+Daily portfolio history: equity curve, cost basis, TWR and MWR.
+
+The user's transactions become a dates x symbols matrix of signed share
+deltas whose cumulative sum is the position matrix; multiplied by the
+daily close panel (src.screener.load_panel) it gives the market value of
+every day at once. Cost basis comes from the average-cost replay in
+projections. Amounts are in a base currency: trades at the FX rate of
+their day, closes at the rate of theirs. Holdings in a currency with no
+FX rate at all are left out and listed in ``missing_rates``.
+
+The computed series is cached per user with the last transaction it
+includes. While no new transaction arrives, later requests only price
+the days after the cached ones (re-pricing the last cached day, whose
+bar may have been partial) instead of recomputing the whole history.
+"""
+from django.core.cache import cache
+from django.utils import timezone
+
+from .analytics import last_transaction_id
+from .fx import base_currency, currencies_of, rates_at
+from .models import Transaction
+from .projections import load_transactions
+from .quotes import history_store
+
+HISTORY_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def equity_curve(user, currency=None):
+    """Raises ValueError for an unsupported ``currency``."""
+    base = base_currency(currency)
+    last_id = last_transaction_id(user)
+    key = f"equity_curve:{user.pk}:{base}"
+    state = cache.get(key)
+
+    if state is None or state["last_id"] != last_id:
+        state = _compute(user, base)
+        state["last_id"] = last_id
+    else:
+        state = _extend(state)
+    cache.set(key, state, HISTORY_TIMEOUT)
+    return _response(state)
+
+
+# ---------------- FULL COMPUTATION ----------------
+def _closes(symbols, first_day, trade_prices):
+    """
+    (dates, closes) for ``symbols`` from ``first_day`` on. Days without a
+    close (no history, or before the first bar) use the last trade price.
+    """
+    import pandas as pd
+    from src.history_store import period_since
+    from src.screener import load_panel
+
+    dates, found, closes = load_panel(symbols, period_since(first_day), history_store())
+    panel = pd.DataFrame(closes, index=dates, columns=found)
+    panel = panel[panel.index >= pd.Timestamp(first_day)].reindex(columns=symbols)
+
+    today = pd.Timestamp(timezone.now().date())
+    if panel.empty or panel.index[-1] < today:
+        # Markets not open yet today (or no history at all): end on today
+        # so the curve reaches the latest trades
+        panel = panel.reindex(panel.index.append(pd.DatetimeIndex([today]))).ffill()
+
+    fallback = trade_prices.reindex(panel.index.union(trade_prices.index)).ffill()
+    return panel.index, panel.fillna(fallback.reindex(panel.index)).to_numpy(dtype=float)
+
+
+def _rate_matrix(symbols, dates, base):
+    """(dates x symbols) factors converting each symbol's closes to ``base``."""
+    import numpy as np
+
+    currencies = currencies_of(symbols)
+    factors = rates_at(np.tile(currencies, len(dates)), dates.repeat(len(symbols)), base)
+    return factors.reshape(len(dates), len(symbols))
+
+
+def _compute(user, base):
+    import numpy as np
+    import pandas as pd
+
+    from .projections import replay
+
+    trades = load_transactions(user=user)
+    if trades.empty:
+        return _empty_state(base)
+
+    trades["day"] = pd.to_datetime(trades["created_at"], utc=True).dt.tz_localize(None).dt.normalize()
+    trades["native_price"] = trades["price"]
+    trades["price"] = trades["price"] * rates_at(
+        currencies_of(trades["stock_symbol"]), trades["day"], base
+    )
+    # A currency with no FX rate at all can't be converted on any day
+    unconverted = trades["price"].isna()
+    missing_rates = sorted(trades.loc[unconverted, "stock_symbol"].unique())
+    trades = trades[~trades["stock_symbol"].isin(missing_rates)]
+    if trades.empty:
+        return dict(_empty_state(base), missing_rates=missing_rates)
+
+    trades = replay(trades)
+    symbols = sorted(trades["stock_symbol"].unique())
+
+    last_trade_price = (
+        trades.pivot_table(index="day", columns="stock_symbol", values="native_price", aggfunc="last")
+        .reindex(columns=symbols)
+    )
+    dates, closes = _closes(symbols, trades["day"].min().date(), last_trade_price)
+    converted = closes * _rate_matrix(symbols, dates, base)
+
+    # Trades on non-trading days count from the next trading day
+    day = np.minimum(dates.searchsorted(trades["day"].to_numpy()), len(dates) - 1)
+    col = pd.Index(symbols).get_indexer(trades["stock_symbol"])
+    is_buy = (trades["transaction_type"] == Transaction.BUY).to_numpy()
+    qty = trades["filled"].to_numpy(dtype=float)  # oversells close the holding only
+    amount = qty * trades["price"].to_numpy(dtype=float)
+
+    deltas = np.zeros((len(dates), len(symbols)))
+    np.add.at(deltas, (day, col), np.where(is_buy, qty, -qty))
+    positions = deltas.cumsum(axis=0)
+
+    # Cost basis: the holding's cost after its last trade of each day
+    last_of_day = pd.DataFrame({"day": day, "col": col, "cost": trades["cost"].to_numpy()})
+    last_of_day = last_of_day.drop_duplicates(["day", "col"], keep="last")
+    cost = np.full((len(dates), len(symbols)), np.nan)
+    cost[last_of_day["day"], last_of_day["col"]] = last_of_day["cost"]
+    cost = pd.DataFrame(cost).ffill().fillna(0).to_numpy()
+
+    # Money in (BUY) is positive, money out (SELL) negative
+    flows = np.bincount(day, weights=np.where(is_buy, amount, -amount), minlength=len(dates))
+    # NaN closes only precede a symbol's first trade, where the position is 0
+    value = np.nansum(positions * converted, axis=1)
+
+    return {
+        "currency": base,
+        "dates": [d.date().isoformat() for d in dates],
+        "value": value.tolist(),
+        "cost_basis": cost.sum(axis=1).tolist(),
+        "flows": flows.tolist(),
+        "growth": _growth(value, flows, 1.0, 0.0).tolist(),
+        "symbols": symbols,
+        "positions": positions[-1].tolist(),
+        "closes": closes[-1].tolist(),
+        "cost_last": float(cost[-1].sum()),
+        "missing_rates": missing_rates,
+    }
+
+
+def _empty_state(base):
+    return {
+        "currency": base,
+        "dates": [], "value": [], "cost_basis": [], "flows": [], "growth": [],
+        "symbols": [], "positions": [], "closes": [], "cost_last": 0.0,
+        "missing_rates": [],
+    }
+
+
+# ---------------- INCREMENTAL ----------------
+def _extend(state):
+    """Re-price the last cached day and append the days after it."""
+    import numpy as np
+    import pandas as pd
+
+    if not state["dates"]:
+        return state
+
+    last_day = pd.Timestamp(state["dates"][-1])
+    # Symbols without a new close keep their last one
+    last_closes = pd.DataFrame([state["closes"]], index=[last_day], columns=state["symbols"])
+    dates, closes = _closes(state["symbols"], last_day.date(), last_closes)
+
+    n = len(state["dates"]) - 1
+    positions = np.array(state["positions"])
+    converted = closes * _rate_matrix(state["symbols"], dates, state["currency"])
+    value = np.nansum(converted * positions, axis=1)
+    # No transaction since the cached run, so only day n can have flows
+    flows = np.zeros(len(dates))
+    flows[0] = state["flows"][n]
+    growth = _growth(
+        value, flows,
+        state["growth"][n - 1] if n else 1.0,
+        state["value"][n - 1] if n else 0.0,
+    )
+
+    state = dict(state)
+    for name, new in (
+        ("dates", [d.date().isoformat() for d in dates]),
+        ("value", value.tolist()),
+        ("cost_basis", [state["cost_last"]] * len(dates)),
+        ("flows", flows.tolist()),
+        ("growth", growth.tolist()),
+    ):
+        state[name] = state[name][:n] + new
+    state["closes"] = closes[-1].tolist()
+    return state
+
+
+# ---------------- RETURNS ----------------
+def _growth(value, flows, start_growth, start_value):
+    """
+    Time-weighted growth index (1.0 = start) from daily values and flows.
+
+    A day's return is ``(V_t - F_t) / V_{t-1}``: flows are assumed to
+    happen at the start of the day, at the trade price. Days starting from
+    an empty portfolio compare the close value with the money put in.
+    """
+    import numpy as np
+
+    prev = np.concatenate([[start_value], value[:-1]])
+    start = prev + flows
+    ratio = np.divide(value, start, out=np.ones_like(value), where=start > 0)
+    return start_growth * np.cumprod(ratio)
+
+
+def _xirr(flows, days, final_value):
+    """
+    Annualized money-weighted return: the rate r at which the investor's
+    cash flows (out at each buy, in at each sell, plus the final value)
+    have zero net present value. Solved by bisection on the NPV, which is
+    monotonic in r for a buy-first flow history.
+    """
+    import numpy as np
+
+    amounts = np.append(-np.asarray(flows), final_value)
+    years = np.append(np.asarray(days), days[-1] if len(days) else 0) / 365.25
+    if not len(amounts) or (amounts >= 0).all() or (amounts <= 0).all():
+        return None
+
+    def npv(rate):
+        return (amounts / (1 + rate) ** years).sum()
+
+    low, high = -0.9999, 10.0
+    if npv(low) * npv(high) > 0:
+        return None
+    for _ in range(200):
+        mid = (low + high) / 2
+        if npv(low) * npv(mid) <= 0:
+            high = mid
+        else:
+            low = mid
+        if high - low < 1e-9:
+            break
+    return (low + high) / 2
+
+
+def _response(state):
+    import numpy as np
+
+    dates = state["dates"]
+    missing_rates = state.get("missing_rates", [])
+    if not dates:
+        return {"currency": state["currency"], "dates": [], "market_value": [],
+                "cost_basis": [], "twr": [], "twr_total": None, "mwr": None,
+                "missing_rates": missing_rates}
+
+    day_numbers = (np.array(dates, dtype="datetime64[D]") - np.datetime64(dates[0], "D")).astype(int)
+    flows = np.array(state["flows"])
+    traded = flows != 0
+    growth = np.array(state["growth"])
+
+    return {
+        "currency": state["currency"],
+        "dates": dates,
+        "market_value": [round(v, 2) for v in state["value"]],
+        "cost_basis": [round(v, 2) for v in state["cost_basis"]],
+        "twr": [round(g - 1, 6) for g in growth],
+        "twr_total": round(float(growth[-1] - 1), 6),
+        "mwr": _round(_xirr(flows[traded], day_numbers[traded], state["value"][-1]), 6),
+        "missing_rates": missing_rates,
+    }
+
+
+def _round(value, digits):
+    return None if value is None else round(float(value), digits)
@@ -0,0 +1,306 @@
+"""
+Portfolio rows are a projection of the Transaction log.
+
+Each user has a PortfolioCheckpoint holding the id of the last Transaction
+folded into their Portfolio rows, so ``project_user`` only replays newer
+rows. ``rebuild_all`` recomputes every holding from scratch with a
+vectorized pass over the whole table.
+
+Trades are replayed in trade order, by ``created_at`` then id, so
+backdated imports land where they happened; a batch of new transactions
+older than the ones already folded in triggers a rebuild of the user.
+
+Holdings use average cost: a BUY blends its price into ``avg_buy_price``,
+a SELL lowers the quantity and leaves the average unchanged, and a holding
+that reaches zero is deleted. Logs written before orders were validated
+can oversell; such a SELL only closes the shares held.
+
+Open tax lots (TaxLot rows, see ``lots``) are projected alongside, under
+the same checkpoint and in the same database transaction.
+
+NumPy/pandas are imported inside the vectorized functions: orders only
+need the incremental path, so workers don't pay for them at startup.
+"""
+import math
+
+from django.db import transaction
+
+from . import lots
+from .models import Portfolio, PortfolioCheckpoint, Transaction
+
+TRANSACTION_COLUMNS = [
+    "id", "user_id", "stock_symbol", "transaction_type", "quantity", "price", "created_at",
+]
+TRADE_ORDER = ["created_at", "id"]
+
+
+# ---------------- INCREMENTAL ----------------
+def new_transactions(user, last_id):
+    """
+    The user's transactions after checkpoint ``last_id``, by id. Ordering
+    by trade order in SQL makes the planner walk the user's whole
+    created_at index; the few new rows are sorted in Python instead.
+    """
+    return Transaction.objects.filter(user=user, id__gt=last_id).order_by("id")
+
+
+def applied_trade_times(user, last_id):
+    """``created_at`` of the user's folded-in transactions, latest first."""
+    return (
+        Transaction.objects.filter(user=user, id__lte=last_id)
+        .order_by("-created_at")
+        .values_list("created_at", flat=True)
+    )
+
+
+def apply_to_holding(holding, transaction_type, quantity, price):
+    if transaction_type == Transaction.BUY:
+        total_cost_existing = holding.total_quantity * holding.avg_buy_price
+        new_total_quantity = holding.total_quantity + quantity
+        holding.avg_buy_price = (
+            (total_cost_existing + quantity * price) / new_total_quantity
+            if new_total_quantity > 0 else 0
+        )
+        holding.total_quantity = new_total_quantity
+    else:
+        holding.total_quantity = max(holding.total_quantity - quantity, 0)
+
+
+def project_user(user):
+    """
+    Fold the user's transactions newer than their checkpoint into their
+    Portfolio rows. Returns the number of transactions applied.
+    """
+    with transaction.atomic():
+        checkpoint = PortfolioCheckpoint.objects.filter(user=user).first()
+        if checkpoint is None:
+            return rebuild_user(user)
+
+        new = sorted(
+            new_transactions(user, checkpoint.last_transaction_id),
+            key=lambda t: (t.created_at, t.id),
+        )
+        if not new:
+            return 0
+
+        latest = applied_trade_times(user, checkpoint.last_transaction_id).first()
+        if latest is not None and new[0].created_at < latest:
+            return rebuild_user(user)  # backdated: every later trade moves
+
+        holdings = {
+            p.stock_symbol: p
+            for p in Portfolio.objects.filter(
+                user=user, stock_symbol__in={t.stock_symbol for t in new}
+            )
+        }
+
+        for t in new:
+            holding = holdings.get(t.stock_symbol)
+            if holding is None:
+                holding = holdings[t.stock_symbol] = Portfolio(
+                    user=user, stock_symbol=t.stock_symbol,
+                    total_quantity=0, avg_buy_price=0,
+                )
+            apply_to_holding(holding, t.transaction_type, t.quantity, t.price)
+
+        for holding in holdings.values():
+            if holding.total_quantity > 0:
+                holding.save()
+            elif holding.pk:
+                holding.delete()
+        lots.apply(user, new)
+
+        checkpoint.last_transaction_id = max(t.id for t in new)
+        checkpoint.save()
+
+    return len(new)
+
+
+# ---------------- VECTORIZED ----------------
+def load_transactions(**filters):
+    import pandas as pd
+
+    rows = (
+        Transaction.objects.filter(**filters)
+        .order_by(*TRADE_ORDER)
+        .values_list(*TRANSACTION_COLUMNS)
+        .iterator(chunk_size=10000)
+    )
+    return pd.DataFrame.from_records(rows, columns=TRANSACTION_COLUMNS)
+
+
+def replay(df):
+    """
+    Replay a transactions DataFrame (TRANSACTION_COLUMNS) in trade order.
+
+    Average cost makes the cost basis a linear recurrence per holding:
+    ``C = C + qty * price`` on a BUY and ``C = C * after / before`` on a
+    SELL, where before/after are the share counts around the trade. Its
+    closed form, ``C_n = A_n * cumsum(b / A)_n`` with ``A`` the running
+    product of the SELL ratios, is evaluated with grouped cumsum/cumprod,
+    so no Python loop touches individual rows. A SELL of more than the
+    holding (old logs could oversell) only closes it: the position is the
+    running sum reflected at 0, ``S - min(0, cummin(S))``.
+
+    Returns the sorted rows with ``total_quantity`` and ``cost`` (the
+    holding right after each trade), ``filled`` (the shares actually
+    bought or sold) and ``realized_pnl`` (SELL price minus the average
+    cost at the time, times ``filled``) added.
+    """
+    import numpy as np
+    import pandas as pd
+
+    order = TRADE_ORDER if "created_at" in df else ["id"]
+    df = df.sort_values(order, kind="stable").reset_index(drop=True)
+    keys = [df["user_id"], df["stock_symbol"]]
+
+    qty = df["quantity"].to_numpy(dtype=float)
+    price = df["price"].to_numpy(dtype=float)
+    is_buy = (df["transaction_type"] == Transaction.BUY).to_numpy()
+
+    signed = pd.Series(np.where(is_buy, qty, -qty))
+    running = signed.groupby(keys).cumsum()
+    after = (running - running.groupby(keys).cummin().clip(upper=0)).to_numpy()
+    before = pd.Series(after).groupby(keys).shift(1).fillna(0).to_numpy()
+    filled = np.where(is_buy, qty, before - after)
+
+    # A holding that went flat is deleted, so the next trade starts afresh
+    episode = pd.Series(before <= 0).groupby(keys).cumsum()
+
+    ratio = np.divide(after, before, out=np.zeros_like(after), where=before > 0)
+    a = np.where(is_buy, 1.0, np.clip(ratio, 0, None))
+    b = np.where(is_buy, qty * price, 0.0)
+
+    groups = keys + [episode]
+    A = pd.Series(a).groupby(groups).cumprod().to_numpy()
+    scaled = np.divide(b, A, out=np.zeros_like(b), where=A > 0)
+    cost = A * pd.Series(scaled).groupby(groups).cumsum().to_numpy()
+
+    # The previous row's cost is 0 when the holding was flat
+    cost_before = pd.Series(cost).groupby(keys).shift(1).fillna(0).to_numpy()
+    avg_before = np.divide(cost_before, before, out=np.zeros_like(cost), where=before > 0)
+
+    df["total_quantity"] = after
+    df["cost"] = cost
+    df["filled"] = filled
+    df["realized_pnl"] = np.where(is_buy, 0.0, filled * (price - avg_before))
+    return df
+
+
+def compute_holdings(df):
+    """
+    Open holdings for a transactions DataFrame (see ``replay``).
+
+    Returns a DataFrame of user_id, stock_symbol, total_quantity,
+    avg_buy_price and last_id for every holding with shares left.
+    """
+    import pandas as pd
+
+    result_columns = ["user_id", "stock_symbol", "total_quantity", "avg_buy_price", "last_id"]
+    if df.empty:
+        return pd.DataFrame(columns=result_columns)
+
+    df = replay(df)
+    last = df.groupby(["user_id", "stock_symbol"], sort=False).tail(1)
+    last = last[last["total_quantity"] > 0]
+
+    return pd.DataFrame({
+        "user_id": last["user_id"].to_numpy(),
+        "stock_symbol": last["stock_symbol"].to_numpy(),
+        "total_quantity": last["total_quantity"].to_numpy().astype(int),
+        "avg_buy_price": (last["cost"] / last["total_quantity"]).to_numpy(),
+        "last_id": last["id"].to_numpy(),
+    }, columns=result_columns)
+
+
+def realized_pnl_by_symbol(df):
+    """{stock_symbol: realized P&L} for one user's transactions DataFrame."""
+    if df.empty:
+        return {}
+    return replay(df).groupby("stock_symbol")["realized_pnl"].sum().to_dict()
+
+
+def _checkpoints(df):
+    """{user_id: last transaction id} for a transactions DataFrame."""
+    if df.empty:
+        return {}
+    return df.groupby("user_id")["id"].max().to_dict()
+
+
+def _write(df, holdings, checkpoints, users=None):
+    portfolio = Portfolio.objects.all()
+    if users is not None:
+        portfolio = portfolio.filter(user__in=users)
+
+    with transaction.atomic():
+        portfolio.delete()
+        Portfolio.objects.bulk_create(
+            [
+                Portfolio(
+                    user_id=int(h.user_id),
+                    stock_symbol=h.stock_symbol,
+                    total_quantity=int(h.total_quantity),
+                    avg_buy_price=float(h.avg_buy_price),
+                )
+                for h in holdings.itertuples(index=False)
+            ],
+            batch_size=5000,
+        )
+        lots.rebuild(df, users)
+        PortfolioCheckpoint.objects.bulk_create(
+            [
+                PortfolioCheckpoint(user_id=int(user_id), last_transaction_id=int(last_id))
+                for user_id, last_id in checkpoints.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["last_transaction_id", "updated_at"],
+            batch_size=5000,
+        )
+
+
+def rebuild_user(user):
+    """Recompute the user's Portfolio rows from their whole transaction log."""
+    df = load_transactions(user=user)
+    checkpoints = _checkpoints(df) or {user.pk: 0}
+    _write(df, compute_holdings(df), checkpoints, users=[user])
+    return len(df)
+
+
+def rebuild_all():
+    """Recompute every user's Portfolio rows. Returns the transactions replayed."""
+    df = load_transactions()
+    _write(df, compute_holdings(df), _checkpoints(df))
+    return len(df)
+
+
+def verify(user=None):
+    """
+    Compare stored Portfolio rows with a fresh projection.
+
+    Returns a list of (user_id, stock_symbol, stored, expected) tuples,
+    where stored/expected are (total_quantity, avg_buy_price) or None.
+    """
+    filters = {"user": user} if user is not None else {}
+    expected = {
+        (h.user_id, h.stock_symbol): (int(h.total_quantity), float(h.avg_buy_price))
+        for h in compute_holdings(load_transactions(**filters)).itertuples(index=False)
+    }
+    stored = {
+        (p["user_id"], p["stock_symbol"]): (p["total_quantity"], p["avg_buy_price"])
+        for p in Portfolio.objects.filter(**filters).values(
+            "user_id", "stock_symbol", "total_quantity", "avg_buy_price"
+        )
+    }
+
+    def same(a, b):
+        return (
+            a is not None and b is not None
+            and a[0] == b[0] and math.isclose(a[1], b[1], rel_tol=1e-9)
+        )
+
+    return [
+        (key[0], key[1], stored.get(key), expected.get(key))
+        for key in sorted(stored.keys() | expected.keys())
+        if not same(stored.get(key), expected.get(key))
+    ]
@@ -0,0 +1,273 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from src.quote_cache import QuoteCache
+
+from .models import Portfolio, PriceAlert, Quote, Watchlist
+
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------- ERRORS ----------------
+class PriceUnavailable(Exception):
+    """No price for a symbol within the request's time budget."""
+
+
+class UnknownSymbol(PriceUnavailable):
+    """The provider has no data for a symbol: mistyped or delisted."""
+
+
+# ---------------- PROVIDERS ----------------
+def get_provider():
+    """
+    The provider named by ``settings.QUOTE_PROVIDER``: an alias from
+    src.market_data ("yahoo", "replay", "random") or a dotted path.
+    """
+    # Imported here so workers don't load pandas until a quote misses
+    from src.market_data import load_provider
+
+    return load_provider(settings.QUOTE_PROVIDER, **settings.MARKET_DATA_OPTIONS)
+
+
+def fetch_history(symbol, start=None, interval="1d"):
+    return get_provider().get_history(symbol, start, interval)
+
+
+@functools.lru_cache(maxsize=1)
+def history_store():
+    """
+    The backend's HistoryStore, downloading through get_provider() so its
+    history comes from settings.QUOTE_PROVIDER like its quotes (the
+    Streamlit side keeps MARKET_DATA_PROVIDER). Pass it to src.screener;
+    it is built on first use, which loads pandas and pyarrow.
+    """
+    from src.history_store import HistoryStore
+
+    return HistoryStore(fetch=fetch_history)
+
+
+# ---------------- CACHE ----------------
+quote_cache = QuoteCache(
+    ttl=settings.QUOTE_CACHE_TTL,
+    maxsize=settings.QUOTE_CACHE_SIZE,
+    shared=caches[settings.QUOTE_CACHE_ALIAS] if settings.QUOTE_CACHE_ALIAS else None,
+    namespace="quote:",
+)
+
+# Negative cache: symbols the provider had no data for are not looked up
+# again for UNKNOWN_SYMBOL_TTL seconds
+unknown_symbols = QuoteCache(
+    ttl=settings.UNKNOWN_SYMBOL_TTL,
+    maxsize=settings.QUOTE_CACHE_SIZE,
+    shared=caches[settings.QUOTE_CACHE_ALIAS] if settings.QUOTE_CACHE_ALIAS else None,
+    namespace="unknown:",
+)
+
+
+# ---------------- PRICE LOOKUP ----------------
+def fetch_prices(symbols, timeout=None):
+    """
+    Return a {symbol: price} map for the ``symbols`` that could be priced.
+
+    Lookups go through ``quote_cache``, then the ``Quote`` table kept warm
+    by the ``refresh_quotes`` command; only symbols missing from both are
+    fetched from the provider, within ``timeout`` seconds (default
+    QUOTE_REQUEST_TIMEOUT) for the whole call. Symbols known to be
+    unknown, failing or still pending at the deadline are left out.
+    """
+    symbols = sorted(set(symbols))
+    if not symbols:
+        return {}
+    unknown = unknown_symbols.peek_many(symbols)
+    deadline = _deadline(timeout)
+    return quote_cache.get_many(
+        [s for s in symbols if s not in unknown],
+        lambda missing: _load_quotes(missing, deadline),
+    )
+
+
+def _deadline(timeout=None):
+    return time.monotonic() + (settings.QUOTE_REQUEST_TIMEOUT if timeout is None else timeout)
+
+
+def _load_quotes(symbols, deadline=None):
+    fresh_after = timezone.now() - timedelta(seconds=settings.QUOTE_MAX_AGE)
+    prices = dict(
+        Quote.objects.filter(
+            stock_symbol__in=symbols, fetched_at__gte=fresh_after
+        ).values_list("stock_symbol", "price")
+    )
+
+    missing = [s for s in symbols if s not in prices]
+    if missing:
+        fetched = _fetch_available(missing, deadline)
+        save_quotes(fetched)
+        prices.update(fetched)
+
+    return prices
+
+
+def _fetch_available(symbols, deadline=None):
+    """
+    _fetch_upstream for a request: a provider failure leaves the symbols
+    unpriced (PriceUnavailable for the caller) instead of failing it.
+    """
+    try:
+        return _fetch_upstream(symbols, deadline)
+    except Exception:
+        logger.warning("Price lookup failed for %s", ", ".join(symbols), exc_info=True)
+        return {}
+
+
+def _fetch_upstream(symbols, deadline=None):
+    """
+    One batched provider call, then concurrent single-symbol fetches for
+    anything the batch could not price, all before ``deadline``.
+
+    Symbols whose single fetch finds no data go into ``unknown_symbols``
+    and ones that run out of time are left out; calls still running at
+    the deadline are abandoned, not waited for. Any other provider error
+    (network, rate limit) is raised, for the caller to retry.
+    """
+    from src.market_data import NO_DATA_ERRORS
+
+    deadline = _deadline() if deadline is None else deadline
+    provider = get_provider()
+    prices = {}
+    pool = ThreadPoolExecutor(max_workers=min(len(symbols), settings.QUOTE_FETCH_WORKERS))
+    try:
+        if hasattr(provider, "get_prices"):
+            batch = pool.submit(provider.get_prices, symbols)
+            try:
+                prices.update(batch.result(timeout=max(0, deadline - time.monotonic())))
+            except TimeoutError:
+                return prices
+
+        missing = {pool.submit(provider.get_price, s): s for s in symbols if s not in prices}
+        done, _ = wait(missing, timeout=max(0, deadline - time.monotonic()))
+        unknown = {}
+        failed = None
+        for future in done:
+            error = future.exception()
+            if error is None:
+                prices[missing[future]] = future.result()
+            elif isinstance(error, NO_DATA_ERRORS):
+                unknown[missing[future]] = True
+            else:
+                failed = error
+        unknown_symbols.set_many(unknown)
+        if failed is not None:
+            raise failed
+        return prices
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def price_error(symbol):
+    """The PriceUnavailable (or UnknownSymbol) explaining a missing price."""
+    if unknown_symbols.peek_many([symbol]):
+        return UnknownSymbol(f"Unknown symbol {symbol}")
+    return PriceUnavailable(f"No price for {symbol} right now, try again shortly")
+
+
+def fetch_price(symbol):
+    """Raises UnknownSymbol or PriceUnavailable when there is no price."""
+    price = fetch_prices([symbol]).get(symbol)
+    if price is None:
+        raise price_error(symbol)
+    return price
+
+
+async def afetch_prices(symbols, timeout=None):
+    """
+    Async version of fetch_prices for the ASGI views.
+
+    Cache and ``Quote`` table lookups never leave the event loop; the
+    remaining symbols are fetched in a worker thread within the budget.
+    """
+    symbols = sorted(set(symbols))
+    unknown = unknown_symbols.peek_many(symbols)
+    deadline = _deadline(timeout)
+    prices = quote_cache.peek_many(symbols)
+
+    fresh_after = timezone.now() - timedelta(seconds=settings.QUOTE_MAX_AGE)
+    async for symbol, price in Quote.objects.filter(
+        stock_symbol__in=[s for s in symbols if s not in prices and s not in unknown],
+        fetched_at__gte=fresh_after,
+    ).values_list("stock_symbol", "price"):
+        prices[symbol] = price
+
+    missing = [s for s in symbols if s not in prices and s not in unknown]
+    if missing:
+        fetched = await asyncio.to_thread(
+            quote_cache.get_many, missing, lambda keys: _fetch_available(keys, deadline)
+        )
+        await sync_to_async(save_quotes)(fetched)
+        prices.update(fetched)
+
+    return prices
+
+
+# ---------------- BACKGROUND REFRESH ----------------
+def tracked_symbols():
+    """Every symbol that is held, watched or has an active price alert."""
+    held = Portfolio.objects.values_list("stock_symbol", flat=True).distinct()
+    watched = Watchlist.objects.values_list("stock_symbol", flat=True).distinct()
+    alerted = (
+        PriceAlert.objects.filter(active=True)
+        .values_list("stock_symbol", flat=True).distinct()
+    )
+    symbols = sorted(set(held) | set(watched) | set(alerted))
+    unknown = unknown_symbols.peek_many(symbols)
+    return [s for s in symbols if s not in unknown]
+
+
+def save_quotes(prices):
+    if not prices:
+        return
+    now = timezone.now()
+    Quote.objects.bulk_create(
+        [Quote(stock_symbol=s, price=p, fetched_at=now) for s, p in prices.items()],
+        update_conflicts=True,
+        unique_fields=["stock_symbol"],
+        update_fields=["price", "fetched_at"],
+    )
+
+
+def refresh_quotes(symbols, batch_size=50, workers=4, retries=3, backoff=1.0):
+    """
+    Fetch ``symbols`` in batches (at most ``workers`` batches in flight),
+    retrying failed batches with exponential backoff, and store the
+    results in the ``Quote`` table and the quote cache.
+
+    Returns the {symbol: price} map that was refreshed.
+    """
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+    def fetch_batch(batch):
+        for attempt in range(retries + 1):
+            try:
+                return _fetch_upstream(batch, _deadline(settings.QUOTE_REFRESH_INTERVAL))
+            except Exception:
+                if attempt == retries:
+                    return {}
+                time.sleep(backoff * 2 ** attempt)
+
+    prices = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for result in pool.map(fetch_batch, batches):
+            prices.update(result)
+
+    save_quotes(prices)
+    quote_cache.set_many(prices)
+    return prices
@@ -1,5 +1,23 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Portfolio, Watchlist
+
+from src.symbols import is_valid, normalize
+
+from .models import Portfolio, PriceAlert, Watchlist
+
+
+class SymbolField(serializers.CharField):
+    """A stock symbol, stored in its canonical form (see src.symbols)."""
+
+    default_error_messages = {"invalid_symbol": "Not a valid stock symbol."}
+
+    def to_internal_value(self, data):
+        symbol = normalize(super().to_internal_value(data))
+        if not is_valid(symbol):
+            self.fail("invalid_symbol")
+        return symbol
 
 
 class PortfolioSerializer(serializers.ModelSerializer):
@@ -9,6 +27,8 @@ class PortfolioSerializer(serializers.ModelSerializer):
 
 
 class WatchlistSerializer(serializers.ModelSerializer):
+    stock_symbol = SymbolField(max_length=20)
+
     class Meta:
         model = Watchlist
         fields = ['stock_symbol']
@@ -20,6 +40,8 @@ from .models import Transaction
 
 
 class TransactionSerializer(serializers.ModelSerializer):
+    stock_symbol = SymbolField(max_length=20)
+
     class Meta:
         model = Transaction
         fields = [
@@ -31,3 +53,56 @@ class TransactionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["price", "created_at"]
 
+
+class TransactionImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk import; the price comes from the file, not Yahoo."""
+
+    # Allowance for a broker clock slightly ahead of ours
+    MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+    stock_symbol = SymbolField(max_length=20)
+    quantity = serializers.IntegerField(min_value=1)
+    price = serializers.FloatField(min_value=0)
+
+    def validate_created_at(self, value):
+        # A future trade would sort after every real order, forcing a full
+        # rebuild on each of them, and count as held in the equity curve
+        if value > timezone.now() + self.MAX_CLOCK_SKEW:
+            raise serializers.ValidationError("Trade date is in the future.")
+        return value
+
+    class Meta:
+        model = Transaction
+        fields = [
+            "stock_symbol",
+            "transaction_type",
+            "quantity",
+            "price",
+            "created_at",
+        ]
+
+
+class PriceAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceAlert
+        fields = [
+            "id",
+            "stock_symbol",
+            "direction",
+            "target_price",
+            "percent",
+            "reference_price",
+            "active",
+            "created_at",
+            "triggered_at",
+            "triggered_price",
+        ]
+
+
+class PriceAlertCreateSerializer(serializers.Serializer):
+    """Either direction + target_price, or a percent move from the current price."""
+
+    stock_symbol = SymbolField(max_length=20)
+    direction = serializers.ChoiceField(choices=PriceAlert.DIRECTION_CHOICES, required=False)
+    target_price = serializers.FloatField(required=False, min_value=0)
+    percent = serializers.FloatField(required=False, min_value=-99.99, max_value=1000)
@@ -1,3 +1,1393 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
 
-# Create your tests here.
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+import numpy as np
+import pandas as pd
+
+from src import indicators, portfolio_tracker
+from src.alerts_notification import ABOVE, BELOW, AlertBook
+from src.history_store import HistoryStore
+from src.jsonl_store import JsonlLog, KeyedStore
+from src.market_data import MarketDataProvider, RandomWalkProvider, ReplayProvider, record_fixtures
+from src.quote_cache import QuoteCache
+from src.screener import screen
+from src.stock_analysis import downsample_minmax
+from src.symbols import SymbolIndex, is_valid, normalize
+
+from . import alerts, lots
+from .models import Portfolio, PortfolioCheckpoint, PriceAlert, Quote, TaxLot, Transaction, Watchlist
+from .orders import OrderError, apply_order
+from .projections import (
+    load_transactions, project_user, realized_pnl_by_symbol, rebuild_all, verify,
+)
+from .fx import fx_cache
+from .quotes import fetch_prices, history_store, quote_cache, refresh_quotes, unknown_symbols
+
+
+STATIC_PRICES = {"AAPL": 190.0, "RELIANCE.NS": 2900.5, "TCS.NS": 4100.0}
+
+
+class StaticPriceProvider:
+    """Offline provider serving prices from ``settings.STATIC_PRICES``."""
+
+    def get_prices(self, symbols):
+        prices = settings.STATIC_PRICES
+        return {s: float(prices[s]) for s in symbols if s in prices}
+
+    def get_price(self, symbol):
+        return float(settings.STATIC_PRICES[symbol])
+
+
+class SingleSymbolProvider:
+    """Provider without batch support, to exercise the fan-out path."""
+
+    calls = []
+
+    def get_price(self, symbol):
+        self.calls.append(symbol)
+        return STATIC_PRICES[symbol]
+
+
+class FlakyProvider(StaticPriceProvider):
+    """Fails its first batch call, like a dropped connection."""
+
+    calls = 0
+
+    def get_prices(self, symbols):
+        FlakyProvider.calls += 1
+        if FlakyProvider.calls == 1:
+            raise ConnectionError("connection reset")
+        return super().get_prices(symbols)
+
+
+class SlowProvider:
+    """TCS.NS takes a second to price."""
+
+    def get_price(self, symbol):
+        if symbol == "TCS.NS":
+            time.sleep(1)
+        return STATIC_PRICES[symbol]
+
+
+@override_settings(
+    QUOTE_PROVIDER="tracker.tests.StaticPriceProvider",
+    STATIC_PRICES=STATIC_PRICES,
+)
+class QuoteServiceTests(TestCase):
+    def setUp(self):
+        quote_cache.clear()
+        unknown_symbols.clear()
+
+    def test_batch_fetch_returns_price_map(self):
+        prices = fetch_prices(["AAPL", "TCS.NS", "AAPL"])
+        self.assertEqual(prices, {"AAPL": 190.0, "TCS.NS": 4100.0})
+
+    @override_settings(QUOTE_PROVIDER="tracker.tests.SingleSymbolProvider")
+    def test_fan_out_when_provider_cannot_batch(self):
+        SingleSymbolProvider.calls = []
+        prices = fetch_prices(["AAPL", "RELIANCE.NS"])
+        self.assertEqual(prices["RELIANCE.NS"], 2900.5)
+        self.assertCountEqual(SingleSymbolProvider.calls, ["AAPL", "RELIANCE.NS"])
+
+    def test_portfolio_list_uses_price_map(self):
+        user = User.objects.create_user(username="alice", password="pw")
+        Portfolio.objects.create(
+            user=user, stock_symbol="AAPL", total_quantity=2, avg_buy_price=150
+        )
+        Portfolio.objects.create(
+            user=user, stock_symbol="TCS.NS", total_quantity=1, avg_buy_price=4000
+        )
+        self.client.force_login(user)
+
+        r = self.client.get("/api/portfolio/")
+
+        self.assertEqual(r.status_code, 200)
+        prices = {row["stock_symbol"]: row["current_price"] for row in r.json()}
+        self.assertEqual(prices, {"AAPL": 190.0, "TCS.NS": 4100.0})
+
+    def test_repeated_lookups_are_served_from_cache(self):
+        fetch_prices(["AAPL"])
+        fetch_prices(["AAPL"])
+        stats = quote_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_refresh_command_prewarms_held_and_watched_symbols(self):
+        user = User.objects.create_user(username="bob", password="pw")
+        Portfolio.objects.create(user=user, stock_symbol="AAPL", total_quantity=1)
+        Watchlist.objects.create(user=user, stock_symbol="TCS.NS")
+
+        call_command("refresh_quotes", "--once", stdout=StringIO())
+
+        self.assertEqual(
+            dict(Quote.objects.values_list("stock_symbol", "price")),
+            {"AAPL": 190.0, "TCS.NS": 4100.0},
+        )
+
+    @override_settings(QUOTE_PROVIDER="tracker.tests.SingleSymbolProvider")
+    def test_fresh_quote_rows_are_served_without_upstream_call(self):
+        SingleSymbolProvider.calls = []
+        Quote.objects.create(
+            stock_symbol="AAPL", price=188.0, fetched_at=timezone.now()
+        )
+        self.assertEqual(fetch_prices(["AAPL"]), {"AAPL": 188.0})
+        self.assertEqual(SingleSymbolProvider.calls, [])
+
+    @override_settings(QUOTE_PROVIDER="random", MARKET_DATA_OPTIONS={"seed": 3, "latency": 0})
+    def test_quotes_from_market_data_provider(self):
+        quote_cache.clear()
+        prices = fetch_prices(["AAPL", "ANY.NS"])
+
+        self.assertEqual(prices, RandomWalkProvider(seed=3, latency=0).get_prices(["AAPL", "ANY.NS"]))
+
+    @override_settings(QUOTE_PROVIDER="tracker.tests.SingleSymbolProvider")
+    def test_unknown_symbol_is_rejected_and_not_looked_up_again(self):
+        SingleSymbolProvider.calls = []
+        self.client.force_login(User.objects.create_user(username="ivan", password="pw"))
+        order = {"stock_symbol": "NOPE.NS", "transaction_type": "BUY", "quantity": 1}
+
+        for _ in range(2):
+            r = self.client.post("/api/transaction/", order, content_type="application/json")
+            self.assertEqual(r.status_code, 400)
+            self.assertIn("Unknown symbol", r.json()["error"])
+
+        self.assertEqual(SingleSymbolProvider.calls, ["NOPE.NS"])
+        self.assertFalse(Transaction.objects.exists())
+
+    @override_settings(QUOTE_PROVIDER="random", MARKET_DATA_OPTIONS={"seed": 3, "latency": 0})
+    def test_history_comes_from_the_quote_provider(self):
+        start = pd.Timestamp("2024-01-01", tz="UTC")
+        pd.testing.assert_frame_equal(
+            history_store().fetch("AAPL", start, "1d"),
+            RandomWalkProvider(seed=3, latency=0).get_history("AAPL", start, "1d"),
+        )
+        # The Streamlit side's shared store keeps its own provider
+        from src import history_store as shared
+
+        self.assertIsNot(history_store(), shared.store)
+        self.assertIs(shared.store.fetch, shared.fetch_history)
+
+    @override_settings(QUOTE_PROVIDER="tracker.tests.FlakyProvider")
+    def test_refresh_retries_provider_failures(self):
+        FlakyProvider.calls = 0
+        self.assertEqual(refresh_quotes(["AAPL"], backoff=0), {"AAPL": 190.0})
+        self.assertEqual(FlakyProvider.calls, 2)
+
+    @override_settings(QUOTE_PROVIDER="tracker.tests.FlakyProvider")
+    def test_request_degrades_when_the_provider_fails(self):
+        FlakyProvider.calls = 0
+        with self.assertLogs("tracker.quotes", "WARNING"):
+            self.assertEqual(fetch_prices(["AAPL"]), {})
+        self.assertEqual(unknown_symbols.peek_many(["AAPL"]), {})
+
+    @override_settings(QUOTE_PROVIDER="tracker.tests.SlowProvider")
+    def test_slow_lookups_are_left_out_after_the_budget(self):
+        started = time.monotonic()
+        prices = fetch_prices(["AAPL", "TCS.NS"], timeout=0.2)
+
+        self.assertLess(time.monotonic() - started, 0.9)
+        self.assertEqual(prices, {"AAPL": 190.0})
+        self.assertEqual(unknown_symbols.peek_many(["TCS.NS"]), {})
+
+
+@override_settings(
+    QUOTE_PROVIDER="tracker.tests.StaticPriceProvider",
+    STATIC_PRICES=STATIC_PRICES,
+)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        quote_cache.clear()
+        self.user = User.objects.create_user(username="carol", password="pw")
+
+    async def test_async_portfolio_requires_login(self):
+        r = await self.async_client.get("/api/async/portfolio/")
+        self.assertEqual(r.status_code, 403)
+
+    async def test_async_buy_then_list_portfolio(self):
+        await self.async_client.aforce_login(self.user)
+
+        r = await self.async_client.post(
+            "/api/async/transaction/",
+            {"stock_symbol": "AAPL", "transaction_type": "BUY", "quantity": 3},
+            content_type="application/json",
+        )
+        self.assertEqual(r.status_code, 201)
+
+        r = await self.async_client.get("/api/async/portfolio/")
+        self.assertEqual(
+            r.json(),
+            [{"stock_symbol": "AAPL", "total_quantity": 3,
+              "avg_buy_price": 190.0, "current_price": 190.0, "price_available": True}],
+        )
+
+    async def test_async_oversell_is_rejected(self):
+        await self.async_client.aforce_login(self.user)
+        r = await self.async_client.post(
+            "/api/async/transaction/",
+            {"stock_symbol": "AAPL", "transaction_type": "SELL", "quantity": 1},
+            content_type="application/json",
+        )
+        self.assertEqual(r.status_code, 400)
+
+    async def test_async_watchlist_add_and_list(self):
+        await self.async_client.aforce_login(self.user)
+        r = await self.async_client.post(
+            "/api/async/watchlist/", {"stock_symbol": "tcs.ns"},
+            content_type="application/json",
+        )
+        self.assertEqual(r.status_code, 201)
+
+        r = await self.async_client.get("/api/async/watchlist/")
+        self.assertEqual(r.json(), [{"stock_symbol": "TCS.NS"}])
+
+
+class ProjectionTests(TestCase):
+    TRADES = [
+        ("AAPL", "BUY", 10, 100.0),
+        ("AAPL", "BUY", 10, 120.0),
+        ("AAPL", "SELL", 5, 130.0),
+        ("AAPL", "BUY", 5, 90.0),
+        ("TCS.NS", "BUY", 3, 4000.0),
+        ("TCS.NS", "SELL", 3, 4100.0),
+        ("TCS.NS", "BUY", 2, 3900.0),
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="dave", password="pw")
+        for symbol, ttype, qty, price in self.TRADES:
+            apply_order(self.user, symbol, ttype, qty, price)
+
+    def holdings(self):
+        return {
+            p.stock_symbol: (p.total_quantity, round(p.avg_buy_price, 6))
+            for p in Portfolio.objects.filter(user=self.user)
+        }
+
+    def test_orders_fold_into_average_cost_holdings(self):
+        # (10*100 + 10*120) / 20 = 110; sell keeps 110; (15*110 + 5*90) / 20 = 105
+        self.assertEqual(self.holdings(), {"AAPL": (20, 105.0), "TCS.NS": (2, 3900.0)})
+        self.assertEqual(
+            PortfolioCheckpoint.objects.get(user=self.user).last_transaction_id,
+            Transaction.objects.latest("id").id,
+        )
+
+    def test_vectorized_rebuild_matches_incremental_projection(self):
+        before = self.holdings()
+        Portfolio.objects.all().delete()
+
+        rebuild_all()
+
+        self.assertEqual(self.holdings(), before)
+        self.assertEqual(verify(), [])
+
+    def test_project_user_only_replays_new_transactions(self):
+        Transaction.objects.create(
+            user=self.user, stock_symbol="AAPL",
+            transaction_type="SELL", quantity=20, price=150.0,
+        )
+        self.assertEqual(project_user(self.user), 1)
+        self.assertEqual(project_user(self.user), 0)
+        self.assertEqual(self.holdings(), {"TCS.NS": (2, 3900.0)})
+
+    def test_oversold_legacy_log_rebuilds_like_incremental_projection(self):
+        # Logs from before orders were validated can sell more than is held
+        with self.assertLogs("tracker.lots", "WARNING"):
+            for ttype, qty, price in [("BUY", 5, 10.0), ("SELL", 10, 12.0), ("BUY", 3, 11.0)]:
+                Transaction.objects.create(
+                    user=self.user, stock_symbol="INFY.NS",
+                    transaction_type=ttype, quantity=qty, price=price,
+                )
+                project_user(self.user)
+            incremental = self.holdings()
+
+            rebuild_all()
+
+        self.assertEqual(incremental["INFY.NS"], (3, 11.0))
+        self.assertEqual(self.holdings(), incremental)
+        self.assertEqual(verify(), [])
+        pnl = realized_pnl_by_symbol(load_transactions(user=self.user, stock_symbol="INFY.NS"))
+        self.assertEqual(pnl, {"INFY.NS": 10.0})  # 5 shares at 12 - 10
+
+    def test_verify_reports_drift(self):
+        Portfolio.objects.filter(stock_symbol="AAPL").update(total_quantity=99)
+        drift = verify(self.user)
+        self.assertEqual([d[1] for d in drift], ["AAPL"])
+
+
+class ConcurrentOrderTests(TransactionTestCase):
+    def test_parallel_orders_on_one_holding_keep_invariants(self):
+        user = User.objects.create_user(username="erin", password="pw")
+        apply_order(user, "AAPL", "BUY", 100, 100.0)
+
+        # 30 sells of 5 shares race 10 buys of 2: at most 120 shares can go
+        orders = [("SELL", 5, 110.0)] * 30 + [("BUY", 2, 90.0)] * 10
+        rejected = []
+        barrier = threading.Barrier(len(orders))
+
+        def place(order):
+            ttype, qty, price = order
+            barrier.wait()
+            try:
+                apply_order(user, "AAPL", ttype, qty, price)
+            except OrderError:
+                rejected.append(order)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=place, args=(o,)) for o in orders]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        def total(ttype):
+            return Transaction.objects.filter(
+                user=user, transaction_type=ttype
+            ).aggregate(q=Sum("quantity"))["q"] or 0
+
+        held = total("BUY") - total("SELL")
+        self.assertGreaterEqual(held, 0)
+        self.assertEqual(len(orders) + 1, Transaction.objects.count() + len(rejected))
+        self.assertTrue(all(o[0] == "SELL" for o in rejected))
+        self.assertEqual(
+            Portfolio.objects.filter(user=user).aggregate(q=Sum("total_quantity"))["q"] or 0,
+            held,
+        )
+        self.assertEqual(verify(user), [])
+
+
+class TransactionImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="frank", password="pw")
+        self.client.force_login(self.user)
+
+    def upload(self, name, content):
+        return self.client.post(
+            "/api/transactions/import/",
+            {"file": SimpleUploadedFile(name, content.encode())},
+        )
+
+    def test_csv_import_creates_transactions_and_holdings(self):
+        r = self.upload("trades.csv", (
+            "stock_symbol,transaction_type,quantity,price,created_at\n"
+            "AAPL,BUY,10,100,2021-03-01T10:00:00Z\n"
+            "AAPL,BUY,10,120,2021-06-01T10:00:00Z\n"
+            "AAPL,SELL,5,150,2022-01-03T10:00:00Z\n"
+        ))
+
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(
+            Transaction.objects.earliest("created_at").created_at.year, 2021
+        )
+        holding = Portfolio.objects.get(user=self.user, stock_symbol="AAPL")
+        self.assertEqual((holding.total_quantity, holding.avg_buy_price), (15, 110.0))
+
+    def test_jsonl_import(self):
+        r = self.upload("trades.jsonl", (
+            '{"stock_symbol": "TCS.NS", "transaction_type": "BUY", "quantity": 2, "price": 4000}\n'
+            '\n'
+            '{"stock_symbol": "TCS.NS", "transaction_type": "BUY", "quantity": 2, "price": 3000}\n'
+        ))
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(Portfolio.objects.get(user=self.user).avg_buy_price, 3500.0)
+
+    def test_invalid_rows_reject_the_whole_import(self):
+        r = self.upload("trades.csv", (
+            "stock_symbol,transaction_type,quantity,price\n"
+            "AAPL,BUY,10,100\n"
+            "AAPL,HOLD,1,100\n"
+            "AAPL,SELL,50,100\n"
+        ))
+
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual([e["row"] for e in r.json()["rows"]], [3, 4])
+        self.assertFalse(Transaction.objects.exists())
+        self.assertFalse(Portfolio.objects.exists())
+
+    def test_sells_are_checked_against_holdings_on_their_date(self):
+        apply_order(self.user, "AAPL", "BUY", 10, 100.0)
+
+        r = self.upload("trades.csv", (
+            "stock_symbol,transaction_type,quantity,price,created_at\n"
+            "AAPL,SELL,5,90,2021-03-01T10:00:00Z\n"
+            "AAPL,BUY,5,80,2021-06-01T10:00:00Z\n"
+        ))
+
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual([e["row"] for e in r.json()["rows"]], [2])
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_negative_prices_and_quantities_are_rejected(self):
+        r = self.upload("trades.csv", (
+            "stock_symbol,transaction_type,quantity,price\n"
+            "AAPL,BUY,10,-100\n"
+            "AAPL,BUY,0,100\n"
+        ))
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual([e["row"] for e in r.json()["rows"]], [2, 3])
+
+    def test_future_trade_dates_are_rejected(self):
+        future = (timezone.now() + timezone.timedelta(days=1)).isoformat()
+        r = self.upload("trades.csv", (
+            "stock_symbol,transaction_type,quantity,price,created_at\n"
+            "AAPL,BUY,10,100,2024-01-02\n"
+            f"AAPL,BUY,1,100,{future}\n"
+        ))
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual([e["row"] for e in r.json()["rows"]], [3])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_non_utf8_file_is_rejected(self):
+        r = self.client.post(
+            "/api/transactions/import/",
+            {"file": SimpleUploadedFile("trades.csv", "stock_symbol\nNESTL\xc9.SW\n".encode("latin-1"))},
+        )
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(r.json()["rows"][0]["errors"], "File is not UTF-8 text")
+
+
+class TransactionListTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="gina", password="pw")
+        start = timezone.make_aware(timezone.datetime(2024, 1, 1))
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, stock_symbol="AAPL" if i % 2 else "TCS.NS",
+                transaction_type="BUY", quantity=1, price=100 + i,
+                created_at=start + timezone.timedelta(days=i),
+            )
+            for i in range(7)
+        ])
+        self.client.force_login(self.user)
+
+    def test_cursor_pages_cover_every_row_once(self):
+        prices = []
+        url = "/api/transactions/?limit=3"
+        while url:
+            page = self.client.get(url).json()
+            prices += [row["price"] for row in page["results"]]
+            url = page["next"]
+        self.assertEqual(prices, [106, 105, 104, 103, 102, 101, 100])
+
+    def test_pages_are_exact_when_rows_share_a_timestamp(self):
+        # Date-only imports give many rows the same created_at
+        day = timezone.make_aware(timezone.datetime(2023, 6, 1))
+        Transaction.objects.bulk_create([
+            Transaction(
+                user=self.user, stock_symbol="AAPL", transaction_type="BUY",
+                quantity=1, price=1000 + i, created_at=day,
+            )
+            for i in range(1200)
+        ])
+        prices, pages = [], []
+        url = "/api/transactions/?limit=500"
+        while url:
+            page = self.client.get(url).json()
+            pages.append(page)
+            prices += [row["price"] for row in page["results"]]
+            url = page["next"]
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(len(prices), 1207)
+        self.assertEqual(prices[:7], [106, 105, 104, 103, 102, 101, 100])
+        self.assertEqual(prices[7:], list(range(2199, 999, -1)))  # newest id first
+        self.assertIsNone(pages[0]["previous"])
+        back = self.client.get(pages[2]["previous"]).json()
+        self.assertEqual(back["results"], pages[1]["results"])
+        self.assertEqual(self.client.get(back["previous"]).json()["results"], pages[0]["results"])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get("/api/transactions/?cursor=bogus").status_code, 404)
+
+    def test_symbol_and_date_filters(self):
+        r = self.client.get("/api/transactions/?symbol=aapl&since=2024-01-03&until=2024-01-04")
+        self.assertEqual([row["price"] for row in r.json()["results"]], [103])
+
+    def test_ndjson_export_streams_all_rows(self):
+        r = self.client.get("/api/transactions/?export=ndjson")
+        lines = b"".join(r.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[0])["price"], 106)
+
+
+# Spot rates; a year of history sits at different ones (fx_history)
+FX_PRICES = {**STATIC_PRICES, "USDINR=X": 80.0, "INRUSD=X": 0.0125}
+
+
+def fx_history(symbol, period="1y", interval="1d"):
+    rates = {"USDINR=X": 75.0, "INRUSD=X": 1 / 75}
+    if symbol not in rates:
+        return pd.DataFrame()
+    index = pd.bdate_range(end=timezone.now().date(), periods=260)
+    return pd.DataFrame({"Close": rates[symbol]}, index=index)
+
+
+@override_settings(
+    QUOTE_PROVIDER="tracker.tests.StaticPriceProvider",
+    STATIC_PRICES=FX_PRICES,
+)
+class PortfolioSummaryTests(TestCase):
+    def setUp(self):
+        quote_cache.clear()
+        unknown_symbols.clear()
+        fx_cache.clear()
+        cache.clear()
+        patcher = mock.patch.object(history_store(), "get", side_effect=fx_history)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(username="hank", password="pw")
+        apply_order(self.user, "AAPL", "BUY", 10, 150.0)
+        apply_order(self.user, "AAPL", "SELL", 4, 175.0)
+        apply_order(self.user, "TCS.NS", "BUY", 1, 4000.0)
+        self.client.force_login(self.user)
+
+    def test_summary_totals_weights_and_pnl(self):
+        s = self.client.get("/api/portfolio/summary/").json()
+
+        # AAPL is in USD: cost at the trade day's 75 INR, value at today's 80
+        self.assertEqual(s["currency"], "INR")
+        self.assertEqual(s["total_invested"], 6 * 150 * 75 + 4000)
+        self.assertEqual(s["market_value"], 6 * 190 * 80 + 4100)
+        self.assertEqual(s["unrealized_pnl"], 6 * 190 * 80 + 4100 - (6 * 150 * 75 + 4000))
+        self.assertEqual(s["realized_pnl"], 4 * 25 * 75)
+        weights = {p["stock_symbol"]: p["weight"] for p in s["positions"]}
+        self.assertAlmostEqual(weights["AAPL"], round(91200 / 95300, 4))
+        self.assertAlmostEqual(sum(weights.values()), 1, places=3)
+
+    def test_summary_in_another_currency(self):
+        s = self.client.get("/api/portfolio/summary/?currency=usd").json()
+
+        self.assertEqual(s["currency"], "USD")
+        self.assertAlmostEqual(s["total_invested"], 6 * 150 + 4000 / 75, places=2)
+        self.assertAlmostEqual(s["market_value"], 6 * 190 + 4100 * 0.0125, places=2)
+        aapl = next(p for p in s["positions"] if p["stock_symbol"] == "AAPL")
+        self.assertEqual((aapl["currency"], aapl["current_price"]), ("USD", 190))
+        self.assertEqual(self.client.get("/api/portfolio/summary/?currency=XYZ").status_code, 400)
+
+    @override_settings(STATIC_PRICES=STATIC_PRICES)
+    def test_currency_without_any_rate_is_left_out_of_totals(self):
+        with mock.patch.object(history_store(), "get", return_value=pd.DataFrame()):
+            s = self.client.get("/api/portfolio/summary/?currency=INR").json()
+
+        self.assertEqual(s["missing_prices"], ["AAPL"])
+        self.assertEqual((s["total_invested"], s["market_value"]), (4000, 4100))
+        aapl = next(p for p in s["positions"] if p["stock_symbol"] == "AAPL")
+        self.assertEqual((aapl["invested"], aapl["market_value"], aapl["price_available"]), (None, None, False))
+
+    def test_unpriced_holding_is_flagged_and_carried_at_cost(self):
+        apply_order(self.user, "NOPE.NS", "BUY", 2, 50.0)
+
+        s = self.client.get("/api/portfolio/summary/").json()
+
+        self.assertEqual(s["missing_prices"], ["NOPE.NS"])
+        nope = next(p for p in s["positions"] if p["stock_symbol"] == "NOPE.NS")
+        self.assertEqual((nope["price_available"], nope["current_price"]), (False, None))
+        self.assertEqual(nope["market_value"], 100)
+        self.assertEqual(s["market_value"], 6 * 190 * 80 + 4100 + 100)
+
+    def test_summary_refreshes_after_a_new_transaction(self):
+        self.client.get("/api/portfolio/summary/")
+        apply_order(self.user, "AAPL", "SELL", 6, 200.0)
+
+        s = self.client.get("/api/portfolio/summary/").json()
+
+        self.assertEqual(s["holdings"], 1)
+        self.assertEqual(s["realized_pnl"], (4 * 25 + 6 * 50) * 75)
+
+
+class MarketDataProviderTests(SimpleTestCase):
+    def test_providers_must_implement_history(self):
+        class QuotesOnly(MarketDataProvider):
+            def get_price(self, symbol):
+                return 1.0
+
+        with self.assertRaises(TypeError):
+            QuotesOnly()
+
+    def test_fixtures_live_under_the_project_root(self):
+        project = os.path.dirname(settings.BASE_DIR)
+        with mock.patch.dict(os.environ, {"MARKET_DATA_FIXTURES": ""}):
+            self.assertEqual(ReplayProvider().root, os.path.join(project, "data", "fixtures"))
+        with mock.patch.dict(os.environ, {"MARKET_DATA_FIXTURES": "/tmp/fixtures"}):
+            self.assertEqual(ReplayProvider().root, "/tmp/fixtures")
+
+    def test_random_walk_is_deterministic_per_symbol(self):
+        a, b = RandomWalkProvider(seed=1, latency=0), RandomWalkProvider(seed=1, latency=0)
+        history = a.get_history("AAPL", pd.Timestamp("2024-01-01", tz="UTC"))
+
+        self.assertEqual(list(history.columns), ["Open", "High", "Low", "Close", "Volume"])
+        self.assertTrue((history["High"] >= history["Low"]).all())
+        self.assertEqual(a.get_prices(["AAPL", "TCS.NS"]), b.get_prices(["AAPL", "TCS.NS"]))
+        self.assertNotEqual(a.get_price("AAPL"), a.get_price("TCS.NS"))
+        self.assertEqual(a.get_price("AAPL"), round(history["Close"].iloc[-1], 2))
+
+    def test_replay_serves_recorded_fixtures(self):
+        root = tempfile.mkdtemp()
+        source = RandomWalkProvider(seed=7, since="2023-01-02", latency=0)
+        recorded = record_fixtures(["AAPL", "TCS.NS"], source, root=root, intervals=["1d", "1wk"])
+        replay = ReplayProvider(root=root, latency=0)
+
+        self.assertEqual(replay.get_prices(["AAPL", "TCS.NS", "MISSING"]), recorded)
+        start = pd.Timestamp("2024-06-01", tz="UTC")
+        pd.testing.assert_frame_equal(
+            replay.get_history("AAPL", start, "1wk"),
+            source.get_history("AAPL", start, "1wk"),
+            check_freq=False, check_dtype=False,
+        )
+        self.assertTrue(replay.get_history("MISSING").empty)
+
+
+class AlertBookTests(SimpleTestCase):
+    def test_tick_fires_only_crossed_thresholds(self):
+        book = AlertBook()
+        for i, target in enumerate([100, 110, 120]):
+            book.add(i, "AAPL", ABOVE, target)
+        for i, target in enumerate([90, 80], start=10):
+            book.add(i, "AAPL", BELOW, target)
+        book.add(20, "TCS.NS", ABOVE, 1)
+
+        self.assertEqual(book.update("AAPL", 110), [0, 1])
+        self.assertEqual(book.update("AAPL", 110), [])
+        self.assertEqual(sorted(book.update("AAPL", 75)), [10, 11])
+        self.assertEqual(len(book), 2)
+
+    def test_remove_among_equal_targets(self):
+        book = AlertBook()
+        for i in range(5):
+            book.add(i, "AAPL", BELOW, 50)
+
+        self.assertTrue(book.remove(3))
+        self.assertFalse(book.remove(3))
+        self.assertEqual(book.update("AAPL", 49), [0, 1, 2, 4])
+
+    def test_rising_alerts_after_partial_fills(self):
+        book = AlertBook()
+        for i in range(10):
+            book.add(i, "AAPL", ABOVE, 100 + i)
+
+        self.assertEqual(book.update("AAPL", 102), [0, 1, 2])
+        book.add(50, "AAPL", ABOVE, 101)
+        self.assertTrue(book.remove(5))
+        self.assertFalse(book.remove(1))
+        self.assertEqual(book.update("AAPL", 101.5), [50])
+        self.assertEqual(book.update("AAPL", 107), [3, 4, 6, 7])
+        self.assertEqual(book.update("AAPL", 200), [8, 9])
+        self.assertEqual(len(book), 0)
+
+    def test_large_book(self):
+        book = AlertBook()
+        for i in range(100_000):
+            book.add(i, f"S{i % 100}", ABOVE if i % 2 else BELOW, 50 + i % 100)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            book.update("S1", 100.0)  # ABOVE targets on S1 are all 51
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(len(book), 99_000)
+        self.assertLess(elapsed, 0.5)
+
+
+@override_settings(
+    QUOTE_PROVIDER="tracker.tests.StaticPriceProvider",
+    STATIC_PRICES=STATIC_PRICES,
+)
+class PriceAlertTests(TestCase):
+    def setUp(self):
+        quote_cache.clear()
+        alerts.sync(full=True)
+        self.user = User.objects.create_user(username="june", password="pw")
+        self.client.force_login(self.user)
+
+    def test_create_threshold_and_percent_alerts(self):
+        r = self.client.post(
+            "/api/alerts/",
+            {"stock_symbol": "aapl", "direction": "ABOVE", "target_price": 200},
+            content_type="application/json",
+        )
+        self.assertEqual(r.status_code, 201)
+        self.assertEqual(r.json()["stock_symbol"], "AAPL")
+
+        r = self.client.post(
+            "/api/alerts/", {"stock_symbol": "TCS.NS", "percent": -10},
+            content_type="application/json",
+        )
+        alert = r.json()
+        self.assertEqual(alert["direction"], "BELOW")
+        self.assertEqual(alert["reference_price"], 4100.0)
+        self.assertAlmostEqual(alert["target_price"], 3690.0)
+
+        r = self.client.post("/api/alerts/", {"stock_symbol": "AAPL"}, content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+
+    def test_evaluate_triggers_crossed_alerts_once(self):
+        hit = alerts.create_alert(self.user, "AAPL", "ABOVE", 195)
+        missed = alerts.create_alert(self.user, "AAPL", "ABOVE", 250)
+        cancelled = alerts.create_alert(self.user, "AAPL", "BELOW", 185)
+        alerts.sync()
+        alerts.cancel_alert(self.user, cancelled.pk)
+
+        self.assertEqual(alerts.evaluate({"AAPL": 196.0}), 1)
+        self.assertEqual(alerts.evaluate({"AAPL": 180.0}), 0)
+
+        hit.refresh_from_db()
+        self.assertFalse(hit.active)
+        self.assertEqual(hit.triggered_price, 196.0)
+        self.assertTrue(PriceAlert.objects.get(pk=missed.pk).active)
+
+        active = self.client.get("/api/alerts/?active=1").json()
+        self.assertEqual([a["id"] for a in active], [missed.pk])
+
+    def test_replay_feed(self):
+        alerts.create_alert(self.user, "AAPL", "BELOW", 180)
+        alerts.create_alert(self.user, "RELIANCE.NS", "ABOVE", 3000)
+        feed = os.path.join(tempfile.mkdtemp(), "feed.csv")
+        with open(feed, "w") as f:
+            f.write(
+                "timestamp,stock_symbol,price\n"
+                "2024-01-02T10:00:00Z,AAPL,185\n"
+                "2024-01-02T10:00:00Z,RELIANCE.NS,2950\n"
+                "2024-01-02T10:01:00Z,AAPL,179.5\n"
+                "2024-01-02T10:02:00Z,RELIANCE.NS,3010\n"
+            )
+
+        out = StringIO()
+        call_command("replay_alerts", feed, "--dry-run", stdout=out)
+        self.assertIn("2 alert(s) triggered", out.getvalue())
+        self.assertEqual(PriceAlert.objects.filter(active=True).count(), 2)
+
+        out = StringIO()
+        call_command("replay_alerts", feed, stdout=out)
+        self.assertIn("Replayed 3 tick(s)", out.getvalue())
+        self.assertEqual(
+            sorted(PriceAlert.objects.values_list("triggered_price", flat=True)), [179.5, 3010.0]
+        )
+
+
+def fake_history(symbol, period="1y", interval="1d"):
+    """300 daily bars: AAPL doubles linearly, TCS.NS halves, others missing."""
+    index = pd.bdate_range("2024-01-01", periods=300, tz="America/New_York")
+    if symbol == "AAPL":
+        close = np.linspace(100, 200, 300)
+    elif symbol == "TCS.NS":
+        close = np.linspace(200, 100, 300)
+    else:
+        return pd.DataFrame()
+    return pd.DataFrame({"Close": close}, index=index)
+
+
+class ScreenerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="ivy", password="pw")
+        Portfolio.objects.create(user=self.user, stock_symbol="AAPL", total_quantity=1, avg_buy_price=100)
+        Watchlist.objects.create(user=self.user, stock_symbol="TCS.NS")
+        Watchlist.objects.create(user=self.user, stock_symbol="DELISTED")
+        self.client.force_login(self.user)
+
+    def test_screen_metrics(self):
+        closes = np.column_stack([np.linspace(100, 200, 300), np.linspace(200, 100, 300)])
+        result = screen(closes, ["UP", "DOWN"])
+        up, down = result["rows"]
+
+        self.assertEqual(up["last_price"], 200)
+        self.assertEqual(up["from_high"], 0)
+        self.assertEqual(down["from_low"], 0)
+        self.assertEqual((up["momentum_rank"], down["momentum_rank"]), (1, 2))
+        self.assertGreater(up["return_1m"], 0)
+        self.assertLess(down["return_1y"], 0)
+        self.assertEqual(result["correlation"][0][0], 1)
+
+    @mock.patch.object(history_store(), "get", side_effect=fake_history)
+    def test_screener_covers_held_and_watched_symbols(self, get):
+        r = self.client.get("/api/screener/")
+
+        self.assertEqual(r.status_code, 200)
+        data = r.json()
+        self.assertEqual(data["symbols"], ["AAPL", "TCS.NS"])
+        self.assertEqual({row["symbol"] for row in data["rows"]}, {"AAPL", "TCS.NS"})
+        self.assertEqual(data["as_of"], "2025-02-21")
+        self.assertEqual(len(data["correlation"]), 2)
+        self.assertEqual(
+            sorted(c.args[0] for c in get.call_args_list), ["AAPL", "DELISTED", "TCS.NS"]
+        )
+
+    def test_rejects_unknown_period(self):
+        self.assertEqual(self.client.get("/api/screener/?period=3d").status_code, 400)
+
+
+@override_settings(BASE_CURRENCY="USD")
+class PortfolioHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="jo", password="pw")
+        self.client.force_login(self.user)
+
+    def trade(self, day, *order):
+        apply_order(self.user, *order)
+        Transaction.objects.filter(pk=Transaction.objects.latest("id").pk).update(
+            created_at=timezone.make_aware(timezone.datetime.fromisoformat(day))
+        )
+
+    def test_empty_history(self):
+        data = self.client.get("/api/portfolio/history/").json()
+        self.assertEqual(data["dates"], [])
+        self.assertIsNone(data["mwr"])
+
+    @mock.patch.object(history_store(), "get", side_effect=fake_history)
+    def test_equity_curve_and_returns(self, get):
+        # AAPL closes at 100 on 2024-01-01 and 200 on 2025-02-21
+        self.trade("2024-01-01", "AAPL", "BUY", 10, 100.0)
+        self.trade("2024-01-06", "AAPL", "BUY", 5, 101.0)  # Saturday
+        self.trade("2024-06-03", "DELISTED", "BUY", 2, 50.0)
+
+        data = self.client.get("/api/portfolio/history/").json()
+        dates, value = data["dates"], data["market_value"]
+
+        self.assertEqual(dates[0], "2024-01-01")
+        self.assertEqual(dates[-1], timezone.now().date().isoformat())
+        self.assertEqual(value[0], 1000)
+        # The weekend buy counts from Monday; DELISTED is valued at its trade price
+        self.assertNotIn("2024-01-06", dates)
+        self.assertAlmostEqual(value[dates.index("2024-01-08")] / value[dates.index("2024-01-05")], 1.5, 1)
+        self.assertAlmostEqual(value[-1], 15 * 200 + 2 * 50)
+        self.assertEqual(data["cost_basis"][-1], 1505 + 100)
+        self.assertGreater(data["twr_total"], 0.9)
+        self.assertGreater(data["mwr"], 0)
+
+    @mock.patch.object(history_store(), "get", side_effect=fake_history)
+    def test_curve_starts_at_the_earliest_trade(self, get):
+        apply_order(self.user, "AAPL", "BUY", 5, 190.0)
+        self.trade("2024-01-01", "AAPL", "BUY", 10, 100.0)  # imported later, backdated
+        project_user(self.user)
+
+        data = self.client.get("/api/portfolio/history/").json()
+        self.assertEqual(data["dates"][0], "2024-01-01")
+        self.assertEqual(data["market_value"][0], 1000)
+        self.assertEqual(data["cost_basis"][-1], 1000 + 950)
+
+    @override_settings(QUOTE_PROVIDER="tracker.tests.StaticPriceProvider", STATIC_PRICES=STATIC_PRICES)
+    @mock.patch.object(history_store(), "get", side_effect=fake_history)
+    def test_currency_without_any_rate_is_left_out(self, get):
+        self.trade("2024-01-01", "AAPL", "BUY", 10, 100.0)
+        self.trade("2024-01-01", "TCS.NS", "BUY", 1, 200.0)
+
+        data = self.client.get("/api/portfolio/history/").json()
+        self.assertEqual(data["missing_rates"], ["TCS.NS"])
+        self.assertEqual(data["market_value"][0], 1000)
+
+    @mock.patch.object(
+        history_store(), "get",
+        side_effect=lambda symbol, **kw: fx_history(symbol) if "=X" in symbol else fake_history(symbol),
+    )
+    def test_curve_in_base_currency(self, get):
+        self.trade("2024-01-01", "TCS.NS", "BUY", 1, 200.0)
+
+        data = self.client.get("/api/portfolio/history/").json()
+        self.assertEqual(data["currency"], "USD")
+        self.assertAlmostEqual(data["market_value"][-1], round(100 / 75, 2))
+        self.assertAlmostEqual(data["cost_basis"][-1], round(200 / 75, 2))
+        self.assertEqual(self.client.get("/api/portfolio/history/?currency=INR").json()["cost_basis"][-1], 200)
+
+    @mock.patch.object(history_store(), "get", side_effect=fake_history)
+    def test_cached_curve_is_extended_until_a_new_trade(self, get):
+        self.trade("2024-01-01", "AAPL", "BUY", 10, 100.0)
+        first = self.client.get("/api/portfolio/history/").json()
+        self.assertAlmostEqual(first["twr_total"], 1.0)
+
+        get.reset_mock()
+        with mock.patch("tracker.performance._compute") as compute:
+            again = self.client.get("/api/portfolio/history/").json()
+        compute.assert_not_called()
+        self.assertEqual(again["dates"], first["dates"])
+        self.assertEqual(again["market_value"], first["market_value"])
+        self.assertEqual(again["twr"], first["twr"])
+        self.assertEqual(get.call_args.kwargs["period"], "1mo")
+
+        self.trade("2024-03-01", "AAPL", "SELL", 4, 130.0)
+        data = self.client.get("/api/portfolio/history/").json()
+        self.assertAlmostEqual(data["market_value"][-1], 6 * 200)
+        self.assertEqual(data["cost_basis"][-1], 600)
+
+
+class LotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="kit", password="pw")
+        self.client.force_login(self.user)
+
+    def orders(self):
+        apply_order(self.user, "AAPL", "BUY", 10, 100.0)
+        apply_order(self.user, "AAPL", "BUY", 10, 120.0)
+        apply_order(self.user, "AAPL", "SELL", 15, 130.0)
+        apply_order(self.user, "TCS.NS", "BUY", 2, 4000.0)
+
+    def test_lot_queue_methods(self):
+        for method, cost in ((lots.FIFO, 1000 + 600), (lots.LIFO, 1200 + 500), (lots.AVERAGE, 1650)):
+            queue = lots.LotQueue(method)
+            queue.buy(1, 10, 100.0)
+            queue.buy(2, 10, 120.0)
+            self.assertAlmostEqual(queue.sell(15), cost)
+            self.assertEqual(queue.quantity, 5)
+        self.assertEqual(list(queue), [(1, 5, 110.0)])
+        # Oversells in old logs close what is open instead of failing
+        with self.assertLogs("tracker.lots", "WARNING"):
+            self.assertAlmostEqual(queue.sell(6), 550.0)
+        self.assertEqual((queue.quantity, len(queue)), (0, 0))
+
+    def test_backdated_trades_are_matched_by_date(self):
+        apply_order(self.user, "AAPL", "BUY", 10, 100.0)
+        Transaction.objects.create(
+            user=self.user, stock_symbol="AAPL", transaction_type="BUY", quantity=10, price=50.0,
+            created_at=timezone.now() - timezone.timedelta(days=5 * 365),
+        )
+        project_user(self.user)
+        apply_order(self.user, "AAPL", "SELL", 10, 120.0)
+
+        report = lots.realized_report(self.user)
+        self.assertEqual(report["realized_pnl"], 10 * 120 - 500)
+        self.assertEqual(
+            list(TaxLot.objects.filter(user=self.user).values_list("quantity", "price")),
+            [(10, 100.0)],
+        )
+
+    @override_settings(LOT_METHOD="lifo")
+    def test_lot_method_setting_is_case_insensitive(self):
+        self.orders()
+        self.assertEqual(lots.realized_report(self.user)["method"], "LIFO")
+        self.assertEqual(
+            list(TaxLot.objects.filter(user=self.user, stock_symbol="AAPL").values_list("price", flat=True)),
+            [100.0],
+        )
+
+    def test_average_matches_projection(self):
+        self.orders()
+        apply_order(self.user, "AAPL", "BUY", 3, 90.0)
+        apply_order(self.user, "AAPL", "SELL", 8, 140.0)
+        report = lots.realized_report(self.user, "average")
+        expected = realized_pnl_by_symbol(load_transactions(user=self.user))
+        self.assertAlmostEqual(report["realized_pnl"], sum(expected.values()), places=2)
+
+    def test_stored_lots_follow_orders_and_rebuild(self):
+        self.orders()
+        stored = list(
+            TaxLot.objects.filter(user=self.user).order_by("stock_symbol", "transaction_id")
+            .values_list("stock_symbol", "quantity", "price")
+        )
+        self.assertEqual(stored, [("AAPL", 5, 120.0), ("TCS.NS", 2, 4000.0)])
+
+        TaxLot.objects.all().delete()
+        rebuild_all()
+        self.assertEqual(TaxLot.objects.filter(user=self.user).count(), 2)
+
+    def test_realized_endpoint(self):
+        self.orders()
+        fifo = self.client.get("/api/portfolio/realized/").json()
+        lifo = self.client.get("/api/portfolio/realized/?method=lifo").json()
+
+        self.assertEqual((fifo["method"], fifo["realized_pnl"]), ("FIFO", 15 * 130 - 1600))
+        self.assertEqual(lifo["realized_pnl"], 15 * 130 - 1700)
+        self.assertEqual(
+            [(lot["stock_symbol"], lot["quantity"], lot["price"]) for lot in lifo["open_lots"]],
+            [("AAPL", 5, 100.0), ("TCS.NS", 2, 4000.0)],
+        )
+        self.assertEqual(self.client.get("/api/portfolio/realized/?method=hifo").status_code, 400)
+
+
+class SymbolTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="lee", password="pw")
+        self.client.force_login(self.user)
+
+    def test_index_resolves_and_searches(self):
+        index = SymbolIndex([("RELIANCE.NS", "Reliance Industries"), ("RELIANCE.BO", "Reliance Industries"),
+                             ("TCS.NS", "Tata Consultancy Services"), ("AAPL", "Apple")])
+
+        self.assertEqual(index.resolve(" reliance "), "RELIANCE.NS")
+        self.assertEqual(index.resolve("reliance.bo"), "RELIANCE.BO")
+        self.assertIsNone(index.resolve("INFY"))
+        self.assertEqual(index.search("tata"), ["TCS.NS"])
+        self.assertEqual(index.search("reliance"), ["RELIANCE.NS", "RELIANCE.BO"])
+        self.assertEqual(index.search("a", limit=1), ["AAPL"])
+
+    def test_normalize(self):
+        self.assertEqual(
+            [normalize(s) for s in ["reliance", "Reliance.ns", "aapl", "newco", "usdinr=x", "^nsei"]],
+            ["RELIANCE.NS", "RELIANCE.NS", "AAPL", "NEWCO", "USDINR=X", "^NSEI"],
+        )
+
+    def test_unlisted_legacy_symbols_can_be_removed(self):
+        Watchlist.objects.create(user=self.user, stock_symbol="PLTR")
+
+        r = self.client.delete("/api/watchlist/", {"stock_symbol": "pltr"}, content_type="application/json")
+        self.assertEqual(r.status_code, 200)
+        self.assertFalse(Watchlist.objects.filter(user=self.user).exists())
+        r = self.client.delete("/api/watchlist/", {"stock_symbol": "pltr"}, content_type="application/json")
+        self.assertEqual(r.status_code, 404)
+
+    def test_migration_canonicalizes_stored_symbols(self):
+        from django.apps import apps
+        from importlib import import_module
+
+        Watchlist.objects.create(user=self.user, stock_symbol="RELIANCE")
+        Watchlist.objects.create(user=self.user, stock_symbol="RELIANCE.NS")
+        Portfolio.objects.create(user=self.user, stock_symbol="RELIANCE", total_quantity=2, avg_buy_price=100)
+        Portfolio.objects.create(user=self.user, stock_symbol="RELIANCE.NS", total_quantity=2, avg_buy_price=200)
+        Transaction.objects.create(user=self.user, stock_symbol="PLTR", transaction_type="BUY", quantity=1, price=20)
+
+        import_module("tracker.migrations.0009_canonical_symbols").canonicalize(apps, None)
+
+        self.assertEqual(
+            list(Watchlist.objects.filter(user=self.user).values_list("stock_symbol", flat=True)),
+            ["RELIANCE.NS"],
+        )
+        self.assertEqual(
+            list(Portfolio.objects.filter(user=self.user).values_list("stock_symbol", "total_quantity", "avg_buy_price")),
+            [("RELIANCE.NS", 4, 150.0)],
+        )
+        self.assertEqual(Transaction.objects.get(user=self.user).stock_symbol, "PLTR")
+
+    def test_entry_points_share_one_key(self):
+        self.client.post("/api/watchlist/", {"stock_symbol": "reliance"}, content_type="application/json")
+        r = self.client.post("/api/watchlist/", {"stock_symbol": "RELIANCE.NS"}, content_type="application/json")
+        self.assertEqual(r.status_code, 400)
+        self.assertEqual(
+            list(Watchlist.objects.filter(user=self.user).values_list("stock_symbol", flat=True)),
+            ["RELIANCE.NS"],
+        )
+
+        self.client.delete("/api/watchlist/", {"stock_symbol": "Reliance"}, content_type="application/json")
+        self.assertFalse(Watchlist.objects.filter(user=self.user).exists())
+
+    def test_symbols_outside_the_ticker_charset_are_rejected(self):
+        for symbol in ("../../escaped", "A/B", "AAPL US", "X" * 21):
+            r = self.client.post(
+                "/api/alerts/",
+                {"stock_symbol": symbol, "direction": "ABOVE", "target_price": 1},
+                content_type="application/json",
+            )
+            self.assertEqual(r.status_code, 400, symbol)
+        self.assertFalse(PriceAlert.objects.exists())
+        for symbol in ("^NSEI", "USDINR=X", "BRK-B", "M&M.NS"):
+            self.assertTrue(is_valid(symbol), symbol)
+
+    async def test_watchlist_validates_symbols(self):
+        await self.async_client.aforce_login(self.user)
+        for url in ("/api/watchlist/", "/api/async/watchlist/"):
+            for method in (self.async_client.post, self.async_client.delete):
+                for body in ({"stock_symbol": "../../escaped"}, {"stock_symbol": "X" * 21}, {}):
+                    r = await method(url, body, content_type="application/json")
+                    self.assertEqual(r.status_code, 400, (url, body))
+        self.assertFalse(await Watchlist.objects.aexists())
+
+    def test_autocomplete(self):
+        r = self.client.get("/api/symbols/?q=hdfc")
+        self.assertEqual(r.status_code, 200)
+        self.assertIn({"stock_symbol": "HDFCBANK.NS", "name": "HDFC Bank"}, r.json())
+        self.assertEqual(self.client.get("/api/symbols/?q=").json(), [])
+
+
+class IndicatorTests(SimpleTestCase):
+    # Reference closes and 14-day RSI from Wilder's worked example
+    CLOSES = [
+        44.34, 44.09, 44.15, 43.61, 44.33, 44.83, 45.10, 45.42, 45.84, 46.08, 45.89,
+        46.03, 45.61, 46.28, 46.28, 46.00, 46.03, 46.41, 46.22, 45.64, 46.21, 46.25,
+        45.71, 46.45, 45.78, 45.35, 44.03, 44.18, 44.22, 44.57, 43.42, 42.66, 43.13,
+    ]
+    RSI = [
+        70.46, 66.25, 66.48, 69.35, 66.29, 57.92, 62.88, 63.21, 56.01, 62.34,
+        54.67, 50.39, 40.02, 41.49, 41.90, 45.50, 37.32, 33.09, 37.79,
+    ]
+
+    def ohlcv(self, close):
+        close = pd.Series(close, index=pd.bdate_range("2025-01-01", periods=len(close)))
+        return pd.DataFrame({"High": close + 1, "Low": close - 1, "Close": close})
+
+    def test_rsi_uses_wilder_smoothing(self):
+        result = indicators.rsi(pd.Series(self.CLOSES))
+
+        self.assertTrue(result.iloc[:14].isna().all())
+        for got, want in zip(result.iloc[14:], self.RSI):
+            self.assertAlmostEqual(got, want, places=2)
+
+    def test_sma_and_macd(self):
+        close = pd.Series(self.CLOSES)
+
+        sma = indicators.sma(close, 3)
+        self.assertTrue(sma.iloc[:2].isna().all())
+        self.assertAlmostEqual(sma.iloc[2], (44.34 + 44.09 + 44.15) / 3)
+        self.assertAlmostEqual(sma.iloc[-1], (43.42 + 42.66 + 43.13) / 3)
+
+        def ema(values, span):
+            alpha, out = 2 / (span + 1), [values[0]]
+            for value in values[1:]:
+                out.append(alpha * value + (1 - alpha) * out[-1])
+            return np.array(out)
+
+        line = ema(self.CLOSES, 12) - ema(self.CLOSES, 26)
+        signal = ema(line, 9)
+        got = indicators.macd(close)
+        np.testing.assert_allclose(got[0], line)
+        np.testing.assert_allclose(got[1], signal)
+        np.testing.assert_allclose(got[2], line - signal)
+
+    def test_batch_matches_single_symbol(self):
+        rng = np.random.default_rng(7)
+        frames = {
+            "AAA": self.ohlcv(100 + rng.normal(0, 1, 80).cumsum()),
+            "BBB": self.ohlcv(50 + rng.normal(0, 1, 80).cumsum()),
+        }
+        # A shorter history: leading NaNs in the panel must not shift the seed
+        frames["CCC"] = self.ohlcv(20 + rng.normal(0, 1, 60).cumsum())
+        frames["CCC"].index = frames["AAA"].index[20:]
+
+        batch = indicators.compute_batch(frames)
+
+        for symbol, data in frames.items():
+            single = indicators.compute_indicators(data)
+            for name, panel in batch.items():
+                pd.testing.assert_series_equal(
+                    panel[symbol].loc[data.index], single[name],
+                    check_names=False, check_freq=False,
+                )
+
+
+class DownsampleTests(SimpleTestCase):
+    def test_short_series_is_kept_whole(self):
+        np.testing.assert_array_equal(downsample_minmax(np.arange(10.0), 5), np.arange(10))
+
+    def test_keeps_endpoints_and_extremes(self):
+        values = np.random.default_rng(3).normal(0, 1, 1001).cumsum()
+        values[417] = 1e6  # a one-point spike
+        values[733] = -1e6
+
+        keep = downsample_minmax(values, 50)
+
+        self.assertLessEqual(len(keep), 2 * 50 + 2)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+        self.assertEqual((keep[0], keep[-1]), (0, 1000))
+        self.assertIn(417, keep)
+        self.assertIn(733, keep)
+        # Every bucket keeps its own min and max
+        for start in range(0, 1001, 21):
+            bucket = values[start:start + 21]
+            self.assertIn(start + bucket.argmin(), keep)
+            self.assertIn(start + bucket.argmax(), keep)
+
+
+class StreamlitPortfolioTests(SimpleTestCase):
+    HOLDINGS = [
+        {"Stock": "AAPL", "Shares": 2, "BuyPrice": 150.0},
+        {"Stock": "TCS.NS", "Shares": 1, "BuyPrice": 3000.0},
+    ]
+
+    def setUp(self):
+        # TCS.NS hangs until the test ends, then fails without caching anything
+        released = threading.Event()
+        self.addCleanup(released.set)
+
+        class HangingProvider:
+            def get_price(self, symbol):
+                if symbol == "TCS.NS":
+                    released.wait(5)
+                    raise ConnectionError(symbol)
+                return STATIC_PRICES[symbol]
+
+        self.price_cache = QuoteCache(ttl=60)
+        for target, value in [
+            ("get_portfolio_data", lambda: self.HOLDINGS),
+            ("default_provider", HangingProvider),
+            ("price_cache", self.price_cache),
+            ("unknown_cache", QuoteCache(ttl=60)),
+            ("PRICE_TIMEOUT", 0.2),
+        ]:
+            patcher = mock.patch(f"src.portfolio_tracker.{target}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_slow_prices_are_left_out_after_the_timeout(self):
+        started = time.monotonic()
+        df = portfolio_tracker.get_portfolio()
+
+        self.assertLess(time.monotonic() - started, 0.9)
+        rows = df.set_index("Stock")
+        self.assertEqual(rows.loc["AAPL", "Current Price"], 190.0)
+        self.assertTrue(np.isnan(rows.loc["TCS.NS", "Current Price"]))
+        self.assertEqual(rows.loc["TOTAL", "Current Value"], 380.0)
+        self.assertEqual(rows.loc["TOTAL", "Profit / Loss"], 80.0)
+        self.assertEqual(list(rows["Stale"]), [False, True, True])
+
+    def test_expired_cached_price_is_the_fallback(self):
+        self.price_cache.set_many({"TCS.NS": 4000.0}, ttl=-1)
+
+        rows = portfolio_tracker.get_portfolio().set_index("Stock")
+
+        self.assertEqual(rows.loc["TCS.NS", "Current Price"], 4000.0)
+        self.assertTrue(rows.loc["TCS.NS", "Stale"])
+        self.assertFalse(rows.loc["AAPL", "Stale"])
+        self.assertEqual(rows.loc["TOTAL", "Current Value"], 4380.0)
+
+
+class HistoryStoreTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.calls = []
+        self.bars = pd.DataFrame(
+            {"Close": np.arange(30, dtype=float)},
+            index=pd.bdate_range(end=pd.Timestamp.now(tz="UTC").normalize(), periods=30),
+        )
+        self.store = HistoryStore(root=tmp.name, fetch=self.fetch, refresh_after=60)
+
+    def fetch(self, symbol, start, interval):
+        self.calls.append(start)
+        return self.bars if start is None else self.bars[self.bars.index >= start]
+
+    def test_fresh_cache_is_served_from_disk(self):
+        first = self.store.get("AAPL", period="3mo")
+        second = self.store.get("AAPL", period="3mo")
+
+        self.assertEqual(len(self.calls), 1)
+        pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+    def test_stale_cache_fetches_only_the_tail(self):
+        self.store.get("AAPL", period="3mo")
+        old = time.time() - 120
+        os.utime(self.store.path("AAPL", "1d"), (old, old))
+        self.bars.iloc[-1, 0] = 99.0  # the last bar was partial
+
+        data = self.store.get("AAPL", period="3mo")
+
+        self.assertEqual(self.calls[-1], self.bars.index[-1])
+        self.assertEqual((len(data), data["Close"].iloc[-1]), (len(self.bars), 99.0))
+
+    def test_corrupt_file_is_downloaded_again(self):
+        path = self.store.path("AAPL", "1d")
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"not parquet")
+
+        data = self.store.get("AAPL", period="3mo")
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(data), len(self.bars))
+        self.assertEqual(len(self.store.read("AAPL", "1d")[0]), len(self.bars))
+
+    def test_symbols_never_name_files_outside_the_root(self):
+        with self.assertRaises(ValueError):
+            self.store.path("../../escaped", "1d")
+
+        data = self.store.get("../../escaped", period="3mo")
+
+        self.assertEqual(len(data), len(self.bars))  # served, just not stored
+        self.assertEqual(os.listdir(self.store.root), [])
+
+
+class QuoteCacheTests(SimpleTestCase):
+    def test_entries_expire_after_ttl(self):
+        cache = QuoteCache(ttl=0.05)
+        self.assertEqual(cache.get("A", lambda k: 1), 1)
+        self.assertEqual(cache.get("A", lambda k: 2), 1)
+        time.sleep(0.06)
+        self.assertEqual(cache.get("A", lambda k: 3), 3)
+
+    def test_expired_entries_are_available_as_stale_fallback(self):
+        cache = QuoteCache(ttl=0.05)
+        cache.set_many({"A": 1})
+        time.sleep(0.06)
+
+        self.assertEqual(cache.peek_many(["A", "B"]), {})
+        self.assertEqual(cache.peek_many(["A", "B"], stale=True), {"A": 1})
+
+    def test_peek_sees_entries_other_processes_shared(self):
+        cache.clear()
+        # Two workers' negative caches over one shared backend
+        first = QuoteCache(ttl=60, shared=cache, namespace="unknown:")
+        second = QuoteCache(ttl=60, shared=cache, namespace="unknown:")
+        first.set_many({"NOPE.NS": True})
+
+        self.assertEqual(second.peek_many(["NOPE.NS", "AAPL"]), {"NOPE.NS": True})
+        cache.clear()
+        self.assertEqual(second.peek_many(["NOPE.NS"]), {"NOPE.NS": True})  # now local
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = QuoteCache(maxsize=2)
+        cache.set_many({"A": 1, "B": 2})
+        cache.get("A", lambda k: None)  # touch A so B is the LRU entry
+        cache.set_many({"C": 3})
+
+        self.assertEqual(cache.get("B", lambda k: "refetched"), "refetched")
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_concurrent_misses_trigger_a_single_fetch(self):
+        cache = QuoteCache()
+        calls = []
+
+        def slow_fetch(keys):
+            calls.append(keys)
+            time.sleep(0.05)
+            return {k: 42 for k in keys}
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.get_many(["AAPL"], slow_fetch))
+            )
+            for _ in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"AAPL": 42}] * 10)
+
+
+class JsonlStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def test_torn_last_line_is_skipped_and_fenced(self):
+        log = JsonlLog(os.path.join(self.root, "log.jsonl"))
+        log.append({"n": 1})
+        with open(log.path, "a") as f:
+            f.write('{"n": 2')  # crash mid-write
+        log.append({"n": 3})
+
+        self.assertEqual(list(log), [{"n": 1}, {"n": 3}])
+
+    def test_keyed_store_compacts_and_imports_legacy(self):
+        legacy = os.path.join(self.root, "watchlist.json")
+        with open(legacy, "w") as f:
+            json.dump(["aapl", "tcs.ns"], f)
+        store = KeyedStore(
+            JsonlLog(
+                os.path.join(self.root, "watchlist.jsonl"), legacy=legacy,
+                upgrade=lambda rows: [{"Stock": s.upper()} for s in rows],
+            ),
+            key="Stock", compact_every=10,
+        )
+
+        for i in range(50):
+            store.put({"Stock": "AAPL", "n": i})
+        store.delete("TCS.NS")
+
+        self.assertEqual(store.load(), {"AAPL": {"Stock": "AAPL", "n": 49}})
+        self.assertLessEqual(len(store.log), 10)
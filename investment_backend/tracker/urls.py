@@ -1,13 +1,22 @@
 from django.urls import path
+from . import async_views
 from .views import create_transaction
 from .views import (
     portfolio_list,
+    portfolio_summary_api,
+    portfolio_history_api,
+    portfolio_realized_api,
+    screener_api,
+    symbol_search,
     watchlist_list,
+    alert_list,
     login_api,
     logout_api,
     me_api,
     register_api,
-    transaction_list
+    transaction_list,
+    transaction_import,
+    quote_cache_stats,
 )
 
 urlpatterns = [
@@ -15,9 +24,22 @@ urlpatterns = [
     path('logout/', logout_api),
     path('me/', me_api),
     path('portfolio/', portfolio_list),
+    path('portfolio/summary/', portfolio_summary_api),
+    path('portfolio/history/', portfolio_history_api),
+    path('portfolio/realized/', portfolio_realized_api),
+    path('screener/', screener_api),
+    path('symbols/', symbol_search),
     path('watchlist/', watchlist_list),
+    path('alerts/', alert_list),
     path('transaction/', create_transaction),
     path("register/", register_api),
     path("transactions/", transaction_list),
+    path("transactions/import/", transaction_import),
+    path("quotes/stats/", quote_cache_stats),
+
+    # Async variants, served by the ASGI app (backend.asgi)
+    path("async/portfolio/", async_views.portfolio_list),
+    path("async/watchlist/", async_views.watchlist_list),
+    path("async/transaction/", async_views.create_transaction),
 
 ]
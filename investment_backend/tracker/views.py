@@ -1,46 +1,123 @@
+import json
+from datetime import datetime, time, timedelta
+
 from rest_framework.decorators import (
     api_view,
     permission_classes,
     authentication_classes,
+    parser_classes,
 )
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from src.symbols import normalize, search
 
+from .alerts import AlertError, cancel_alert, create_alert
+from .analytics import portfolio_summary, screener
 from .authentication import CsrfExemptSessionAuthentication
-from .models import Portfolio, Watchlist, Transaction
+from .imports import ImportFailed, detect_format, import_transactions, iter_rows
+from .lots import realized_report
+from .models import Portfolio, PriceAlert, Watchlist, Transaction
+from .orders import OrderError, apply_order
+from .performance import equity_curve
+from .pagination import TransactionCursorPagination
+from .quotes import PriceUnavailable, UnknownSymbol, fetch_price, fetch_prices, quote_cache
 from .serializers import (
     PortfolioSerializer,
+    PriceAlertCreateSerializer,
+    PriceAlertSerializer,
     WatchlistSerializer,
     TransactionSerializer,
 )
 
-import yfinance as yf
-
 
 # ---------------- PORTFOLIO ----------------
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def portfolio_list(request):
-    portfolio = Portfolio.objects.filter(user=request.user)
+    """Holdings whose price can't be fetched have current_price null."""
+    portfolio = list(Portfolio.objects.filter(user=request.user))
+    prices = fetch_prices(p.stock_symbol for p in portfolio)
     data = []
 
     for p in portfolio:
-        ticker = yf.Ticker(p.stock_symbol)
-        price = ticker.history(period="1d")["Close"].iloc[-1]
+        price = prices.get(p.stock_symbol)
 
         data.append({
             "stock_symbol": p.stock_symbol,
             "total_quantity": p.total_quantity,
             "avg_buy_price": p.avg_buy_price,
-            "current_price": round(float(price), 2)
+            "current_price": None if price is None else round(float(price), 2),
+            "price_available": price is not None,
         })
 
     return Response(data)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def portfolio_summary_api(request):
+    """Totals in ?currency= (default settings.BASE_CURRENCY)."""
+    try:
+        return Response(portfolio_summary(request.user, request.query_params.get("currency")))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def portfolio_history_api(request):
+    """Daily market value, cost basis and time/money-weighted returns in ?currency=."""
+    try:
+        return Response(equity_curve(request.user, request.query_params.get("currency")))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def portfolio_realized_api(request):
+    """Realized P&L and open tax lots under ?method=fifo|lifo|average."""
+    try:
+        return Response(realized_report(request.user, request.query_params.get("method")))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+
+# ---------------- SCREENER ----------------
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def screener_api(request):
+    """Returns, momentum rank, 52-week range and correlations for held + watched symbols."""
+    try:
+        return Response(screener(request.user, request.query_params.get("period", "1y")))
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+
+
+# ---------------- SYMBOLS ----------------
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def symbol_search(request):
+    """Autocomplete: listed symbols matching the ?q= prefix."""
+    try:
+        limit = min(int(request.query_params.get("limit", 10)), 50)
+    except ValueError:
+        return Response({"error": "limit must be an integer"}, status=400)
+    return Response([
+        {"stock_symbol": symbol, "name": name}
+        for symbol, name in search(request.query_params.get("q", ""), limit)
+    ])
+
+
 # ---------------- WATCHLIST ----------------
 @api_view(['GET', 'POST', 'DELETE'])
 @permission_classes([IsAuthenticated])
@@ -53,15 +130,15 @@ def watchlist_list(request):
         serializer = WatchlistSerializer(watchlist, many=True)
         return Response(serializer.data)
 
-    if request.method == 'POST':
-        stock_symbol = request.data.get("stock_symbol")
-
-        if not stock_symbol:
-            return Response({"error": "Stock symbol required"}, status=400)
+    serializer = WatchlistSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
+    stock_symbol = serializer.validated_data["stock_symbol"]
 
+    if request.method == 'POST':
         obj, created = Watchlist.objects.get_or_create(
             user=user,
-            stock_symbol=stock_symbol.upper()
+            stock_symbol=stock_symbol
         )
 
         if not created:
@@ -70,16 +147,54 @@ def watchlist_list(request):
         return Response({"message": "Stock added"}, status=201)
 
     if request.method == 'DELETE':
-        stock_symbol = request.data.get("stock_symbol")
-        Watchlist.objects.filter(
+        deleted, _ = Watchlist.objects.filter(
             user=user,
             stock_symbol=stock_symbol
         ).delete()
+
+        if not deleted:
+            return Response({"error": "Stock not in watchlist"}, status=404)
+
         return Response({"message": "Stock removed"}, status=200)
 
 
 
 
+# ---------------- PRICE ALERTS ----------------
+@api_view(['GET', 'POST', 'DELETE'])
+@permission_classes([IsAuthenticated])
+@authentication_classes([CsrfExemptSessionAuthentication])
+def alert_list(request):
+    user = request.user
+
+    if request.method == 'GET':
+        alerts = PriceAlert.objects.filter(user=user).order_by("-created_at")
+        if request.query_params.get("active") in ("1", "true"):
+            alerts = alerts.filter(active=True)
+        return Response(PriceAlertSerializer(alerts, many=True).data)
+
+    if request.method == 'POST':
+        serializer = PriceAlertCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        try:
+            alert = create_alert(user, **serializer.validated_data)
+        except AlertError as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response(PriceAlertSerializer(alert).data, status=201)
+
+    if request.method == 'DELETE':
+        try:
+            alert_id = int(request.data.get("id"))
+        except (TypeError, ValueError):
+            return Response({"error": "Alert id required"}, status=400)
+        if not cancel_alert(user, alert_id):
+            return Response({"error": "No such active alert"}, status=404)
+        return Response({"message": "Alert cancelled"}, status=200)
+
+
 # ---------------- LOGIN ----------------
 @api_view(["POST"])
 @authentication_classes([CsrfExemptSessionAuthentication])
@@ -124,55 +239,18 @@ def create_transaction(request):
     transaction_type = serializer.validated_data["transaction_type"]
     quantity = serializer.validated_data["quantity"]
 
-    # Fetch live price from Yahoo
-    ticker = yf.Ticker(stock_symbol)
-    price = ticker.history(period="1d")["Close"].iloc[-1]
-
-    # SELL validation
-    if transaction_type == Transaction.SELL:
-        portfolio = Portfolio.objects.filter(
-            user=request.user, stock_symbol=stock_symbol
-        ).first()
-
-        if not portfolio or portfolio.total_quantity < quantity:
-            return Response(
-                {"error": "Not enough shares to sell"}, status=400
-            )
-
-    # Save transaction
-    Transaction.objects.create(
-        user=request.user,
-        stock_symbol=stock_symbol,
-        transaction_type=transaction_type,
-        quantity=quantity,
-        price=price,
-    )
-
-    # -------- UPDATE PORTFOLIO (ONLY PLACE) --------
-    portfolio, created = Portfolio.objects.get_or_create(
-    user=request.user,
-    stock_symbol=stock_symbol,
-    defaults={"total_quantity": 0, "avg_buy_price": 0},
-)
-    if transaction_type == Transaction.BUY:
-        total_cost_existing = portfolio.total_quantity * portfolio.avg_buy_price
-        total_cost_new = quantity * price
-
-        new_total_quantity = portfolio.total_quantity + quantity
-
-        portfolio.avg_buy_price = (
-             (total_cost_existing + total_cost_new) / new_total_quantity
-             if new_total_quantity > 0 else 0
-               )
-        portfolio.total_quantity = new_total_quantity
-    elif transaction_type == Transaction.SELL:
-        portfolio.total_quantity -= quantity
-    # avg_buy_price remains unchanged on SELL
-    if portfolio.total_quantity <= 0:
-        portfolio.delete()
-    else:
-        portfolio.save()
+    # Live price (served from the quote cache when fresh)
+    try:
+        price = fetch_price(stock_symbol)
+    except UnknownSymbol as e:
+        return Response({"error": str(e)}, status=400)
+    except PriceUnavailable as e:
+        return Response({"error": str(e)}, status=503)
 
+    try:
+        apply_order(request.user, stock_symbol, transaction_type, quantity, price)
+    except OrderError as e:
+        return Response({"error": str(e)}, status=400)
 
     return Response(
         {"message": f"{transaction_type} transaction successful"},
@@ -208,12 +286,107 @@ def register_api(request):
 
 
 # ---------------- TRANSACTION HISTORY ----------------
+EXPORT_FIELDS = TransactionSerializer.Meta.fields
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 @authentication_classes([CsrfExemptSessionAuthentication])
 def transaction_list(request):
-    transactions = Transaction.objects.filter(
-        user=request.user
-    ).order_by("-created_at")
-    serializer = TransactionSerializer(transactions, many=True)
-    return Response(serializer.data)
+    """
+    Cursor-paginated history (?cursor=, ?limit=), optionally filtered by
+    ?symbol=, ?since= and ?until= (ISO dates). ?export=ndjson|json streams
+    every matching row instead of a page.
+    """
+    transactions = Transaction.objects.filter(user=request.user)
+
+    symbol = request.query_params.get("symbol")
+    if symbol:
+        transactions = transactions.filter(stock_symbol=normalize(symbol))
+
+    for param, lookup in (("since", "created_at__gte"), ("until", "created_at__lt")):
+        value = request.query_params.get(param)
+        if value:
+            bound = parse_bound(value, inclusive_end=(param == "until"))
+            if bound is None:
+                return Response({"error": f"Invalid {param} date"}, status=400)
+            transactions = transactions.filter(**{lookup: bound})
+
+    export = request.query_params.get("export")
+    if export in ("ndjson", "json"):
+        return stream_transactions(transactions.order_by("-created_at", "-id"), export)
+
+    paginator = TransactionCursorPagination()
+    page = paginator.paginate_queryset(transactions, request)
+    serializer = TransactionSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+def parse_bound(value, inclusive_end=False):
+    """Aware datetime for an ISO date/datetime query value (None if invalid)."""
+    try:
+        day = parse_date(value)
+        if day is not None:
+            if inclusive_end:
+                day += timedelta(days=1)  # ?until=2024-01-31 includes that day
+            parsed = datetime.combine(day, time.min)
+        else:
+            parsed = parse_datetime(value)
+    except ValueError:
+        return None
+    if parsed is None:
+        return None
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def stream_transactions(transactions, export):
+    rows = (
+        json.dumps(row, cls=DjangoJSONEncoder)
+        for row in transactions.values(*EXPORT_FIELDS).iterator(chunk_size=2000)
+    )
+
+    if export == "ndjson":
+        body = (row + "\n" for row in rows)
+        content_type = "application/x-ndjson"
+    else:
+        def body_gen():
+            yield "["
+            for i, row in enumerate(rows):
+                yield row if i == 0 else "," + row
+            yield "]"
+        body = body_gen()
+        content_type = "application/json"
+
+    response = StreamingHttpResponse(body, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="transactions.{export}"'
+    return response
+
+
+# ---------------- BULK IMPORT ----------------
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@authentication_classes([CsrfExemptSessionAuthentication])
+@parser_classes([MultiPartParser])
+def transaction_import(request):
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "Upload a CSV or JSONL file as 'file'"}, status=400)
+
+    try:
+        imported = import_transactions(
+            request.user, iter_rows(upload, detect_format(upload))
+        )
+    except ImportFailed as e:
+        return Response({"error": str(e), "rows": e.errors}, status=400)
+
+    return Response({"message": f"Imported {imported} transactions"}, status=201)
+
+
+# ---------------- QUOTE CACHE STATS ----------------
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def quote_cache_stats(request):
+    return Response(quote_cache.stats())
@@ -1,22 +1,144 @@
-# alerts_notifications.py
+# src/alerts_notification.py
 
-alerts = []
+"""
+Price-alert matching.
 
-def add_alert(stock, target_price):
-    alerts.append({"stock": stock, "target_price": target_price})
-    print(f"Alert added: {stock} at ${target_price}")
+AlertBook keeps every active alert in two sorted arrays per symbol: one
+for "price rises to X" and one for "price falls to X". A price tick is
+matched with a binary search, and the alerts it crossed are always a
+contiguous run at one end of an array, so a tick costs O(log n) plus
+(amortized) the number of alerts it fires, however many alerts are
+active.
 
-def view_alerts():
-    print("Your Alerts:")
-    for alert in alerts:
-        print(f"{alert['stock']} → ${alert['target_price']}")
+Alerts are identified by an id chosen by the caller (the backend uses
+PriceAlert primary keys); the book stores nothing else.
+"""
 
-# Test
-if __name__ == "__main__":
-    add_alert("AAPL", 200)
-    view_alerts()
+import threading
+from bisect import bisect_left, bisect_right
 
-alerts = ["AAPL +5% today", "TSLA -3% today"]
+ABOVE = "ABOVE"
+BELOW = "BELOW"
 
-def get_alerts():
-    return alerts
+
+class _Side:
+    """
+    Targets sorted ascending, with ids kept in the same order.
+
+    Entries before ``start`` have fired already: crossed rising alerts are
+    a prefix, so popping them only moves ``start``, and the dead prefix is
+    dropped once it is half the array (amortized O(1) per fired alert).
+    """
+
+    __slots__ = ("targets", "ids", "start")
+
+    def __init__(self):
+        self.targets = []
+        self.ids = []
+        self.start = 0
+
+    def add(self, target, alert_id):
+        i = bisect_right(self.targets, target, self.start)
+        self.targets.insert(i, target)
+        self.ids.insert(i, alert_id)
+
+    def remove(self, target, alert_id):
+        i = bisect_left(self.targets, target, self.start)
+        while i < len(self.targets) and self.targets[i] == target:
+            if self.ids[i] == alert_id:
+                del self.targets[i], self.ids[i]
+                return True
+            i += 1
+        return False
+
+    def pop_upto(self, price):
+        """Ids with target <= price (rising alerts crossed)."""
+        i = bisect_right(self.targets, price, self.start)
+        fired = self.ids[self.start:i]
+        self.start = i
+        self._compact()
+        return fired
+
+    def pop_from(self, price):
+        """Ids with target >= price (falling alerts crossed)."""
+        i = bisect_left(self.targets, price, self.start)
+        fired = self.ids[i:]
+        del self.targets[i:], self.ids[i:]
+        self._compact()
+        return fired
+
+    def _compact(self):
+        if self.start and 2 * self.start >= len(self.targets):
+            del self.targets[:self.start], self.ids[:self.start]
+            self.start = 0
+
+    def __len__(self):
+        return len(self.ids) - self.start
+
+
+class AlertBook:
+    def __init__(self):
+        self._books = {}   # symbol -> {ABOVE: _Side, BELOW: _Side}
+        self._alerts = {}  # id -> (symbol, direction, target)
+        self._lock = threading.Lock()
+
+    def add(self, alert_id, symbol, direction, target):
+        if direction not in (ABOVE, BELOW):
+            raise ValueError(f"Unknown direction {direction!r}")
+        with self._lock:
+            if alert_id in self._alerts:
+                return
+            sides = self._books.setdefault(symbol, {ABOVE: _Side(), BELOW: _Side()})
+            sides[direction].add(target, alert_id)
+            self._alerts[alert_id] = (symbol, direction, target)
+
+    def remove(self, alert_id):
+        with self._lock:
+            entry = self._alerts.pop(alert_id, None)
+            if entry is None:
+                return False
+            symbol, direction, target = entry
+            return self._books[symbol][direction].remove(target, alert_id)
+
+    def update(self, symbol, price):
+        """Remove and return the ids of alerts on ``symbol`` crossed by ``price``."""
+        with self._lock:
+            sides = self._books.get(symbol)
+            if sides is None:
+                return []
+            fired = sides[ABOVE].pop_upto(price) + sides[BELOW].pop_from(price)
+            for alert_id in fired:
+                del self._alerts[alert_id]
+            return fired
+
+    def update_many(self, prices):
+        """{symbol: price} -> {symbol: [fired ids]} (symbols with no hits omitted)."""
+        fired = {}
+        for symbol, price in prices.items():
+            hits = self.update(symbol, price)
+            if hits:
+                fired[symbol] = hits
+        return fired
+
+    def clear(self):
+        with self._lock:
+            self._books.clear()
+            self._alerts.clear()
+
+    def __contains__(self, alert_id):
+        return alert_id in self._alerts
+
+    def __len__(self):
+        return len(self._alerts)
+
+
+# ---------- DISPLAY ----------
+def format_alert(alert):
+    """One-line description of an alert dict from the backend API."""
+    arrow = "≥" if alert["direction"] == ABOVE else "≤"
+    text = f"{alert['stock_symbol']} {arrow} {alert['target_price']:,.2f}"
+    if alert.get("percent") is not None:
+        text += f" ({alert['percent']:+g}% from {alert['reference_price']:,.2f})"
+    if alert.get("triggered_at"):
+        text += f" · hit at {alert['triggered_price']:,.2f}"
+    return text
@@ -0,0 +1,102 @@
+# src/currency.py
+
+"""
+Currencies of listed symbols and conversion between them.
+
+A symbol's currency follows from its exchange suffix (RELIANCE.NS is in
+INR, VOD.L in pence); symbols without one are US listings, in USD. FX
+rates are Yahoo-style pair symbols, so they are priced by the same
+providers and caches as stocks: "USDINR=X" is the price of 1 USD in INR.
+"""
+
+# ---------- SETTINGS ----------
+DEFAULT_CURRENCY = "USD"
+
+SUFFIX_CURRENCY = {
+    "NS": "INR", "BO": "INR",
+    "L": "GBp",
+    "DE": "EUR", "F": "EUR", "PA": "EUR", "AS": "EUR", "MI": "EUR", "MC": "EUR",
+    "SW": "CHF",
+    "T": "JPY",
+    "HK": "HKD",
+    "SS": "CNY", "SZ": "CNY",
+    "KS": "KRW",
+    "SI": "SGD",
+    "AX": "AUD",
+    "TO": "CAD", "V": "CAD",
+    "JO": "ZAc",
+}
+
+# Currencies quoted in a minor unit: (major currency, minor units per major)
+MINOR_UNITS = {"GBp": ("GBP", 100), "ZAc": ("ZAR", 100)}
+
+CURRENCIES = sorted(
+    {DEFAULT_CURRENCY}
+    | {MINOR_UNITS.get(c, (c, 1))[0] for c in SUFFIX_CURRENCY.values()}
+)
+
+CURRENCY_SIGNS = {"INR": "₹", "USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥"}
+
+
+# ---------- LOOKUP ----------
+def symbol_currency(symbol):
+    """Currency a symbol is quoted in, e.g. "INR", or "GBp" for pence."""
+    if symbol.endswith("=X"):
+        return symbol[3:6]  # FX pair: quoted in the second currency
+    _, dot, suffix = symbol.rpartition(".")
+    return SUFFIX_CURRENCY.get(suffix.upper(), DEFAULT_CURRENCY) if dot else DEFAULT_CURRENCY
+
+
+def major(currency):
+    """(major currency, minor units per major) for a quote currency."""
+    return MINOR_UNITS.get(currency, (currency, 1))
+
+
+def fx_pair(currency, base):
+    """Pair symbol pricing one ``currency`` in ``base``."""
+    return f"{currency}{base}=X"
+
+
+def validate(currency):
+    """Upper-cased ``currency``; raises ValueError if it isn't supported."""
+    code = (currency or "").upper()
+    if code not in CURRENCIES:
+        raise ValueError(f"Unsupported currency {currency!r}, expected one of {', '.join(CURRENCIES)}")
+    return code
+
+
+# ---------- CONVERSION ----------
+def to_base(currencies, base, pair_prices):
+    """
+    {quote currency: factor} that converts an amount in each of
+    ``currencies`` to ``base``, given {pair symbol: price}.
+
+    Currencies whose pair has no price are left out.
+    """
+    factors = {}
+    for currency in set(currencies):
+        code, units = major(currency)
+        rate = 1.0 if code == base else pair_prices.get(fx_pair(code, base))
+        if rate is not None:
+            factors[currency] = rate / units
+    return factors
+
+
+def convert(amounts, currencies, factors):
+    """
+    Convert an array of amounts, one currency per element, in one pass.
+    Amounts in a currency missing from ``factors`` become NaN.
+    """
+    import numpy as np
+
+    currencies = np.asarray(currencies, dtype=object)
+    if not len(currencies):
+        return np.asarray(amounts, dtype=float)
+    codes, inverse = np.unique(currencies, return_inverse=True)
+    scale = np.array([factors.get(c, np.nan) for c in codes], dtype=float)
+    return np.asarray(amounts, dtype=float) * scale[inverse]
+
+
+def format_money(amount, currency):
+    sign = CURRENCY_SIGNS.get(currency)
+    return f"{sign} {amount:,.2f}" if sign else f"{amount:,.2f} {currency}"
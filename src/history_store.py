@@ -0,0 +1,160 @@
+# src/history_store.py
+
+import os
+import tempfile
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.symbols import is_valid
+
+# ---------- SETTINGS ----------
+# Under the project root whatever the working directory (the backend runs
+# from investment_backend/); HISTORY_DIR overrides it
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_DIR = os.environ.get("HISTORY_DIR") or os.path.join(PROJECT_DIR, "data", "history")
+REFRESH_AFTER = 15 * 60  # seconds before the latest bars are re-checked
+
+# Only bar sizes with long histories are worth keeping on disk
+STORED_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+PERIOD_DAYS = {
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653,
+}
+
+
+# ---------- HELPERS ----------
+def period_start(period):
+    """First timestamp covered by a yfinance ``period`` (None for 'max')."""
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp.now(tz="UTC").normalize().replace(month=1, day=1)
+    return pd.Timestamp.now(tz="UTC").normalize() - pd.Timedelta(days=PERIOD_DAYS[period])
+
+
+def period_since(day):
+    """Shortest ``period`` whose bars reach back to ``day`` (a date)."""
+    days = (pd.Timestamp.now(tz="UTC").date() - day).days + 7
+    for period, length in sorted(PERIOD_DAYS.items(), key=lambda kv: kv[1]):
+        if length >= days:
+            return period
+    return "max"
+
+
+def fetch_history(symbol, start, interval):
+    from src.market_data import default_provider
+
+    return default_provider().get_history(symbol, start, interval)
+
+
+class HistoryStore:
+    """
+    On-disk OHLCV cache, one Parquet file per (symbol, interval).
+
+    Cached ranges are read back memory-mapped; only bars newer than the
+    last stored one are requested from the provider, and at most once
+    every ``refresh_after`` seconds.
+    """
+
+    def __init__(self, root=HISTORY_DIR, fetch=fetch_history, refresh_after=REFRESH_AFTER):
+        self.root = root
+        self.fetch = fetch
+        self.refresh_after = refresh_after
+
+    def path(self, symbol, interval):
+        # The symbol is the file name: never let one point outside root
+        if not is_valid(symbol):
+            raise ValueError(f"Not a valid symbol: {symbol!r}")
+        return os.path.join(self.root, interval, f"{symbol}.parquet")
+
+    # ---------- READ ----------
+    def read(self, symbol, interval):
+        """
+        Return (bars, covered_from) from disk; covered_from is 'max', a
+        Timestamp or None. An unreadable file counts as missing.
+        """
+        path = self.path(symbol, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame(), None
+
+        try:
+            table = pq.read_table(path, memory_map=True)
+        except (pa.ArrowException, OSError):
+            return pd.DataFrame(), None
+        meta = table.schema.metadata or {}
+        covered = meta.get(b"covered_from", b"").decode()
+        if covered and covered != "max":
+            covered = pd.Timestamp(covered)
+        return table.to_pandas(), covered or None
+
+    def get(self, symbol, period="5y", interval="1d"):
+        if interval not in STORED_INTERVALS or not is_valid(symbol):
+            return self.fetch(symbol, period_start(period), interval)
+
+        start = period_start(period)
+        data, covered = self.read(symbol, interval)
+
+        if data.empty or not self._covers(covered, start):
+            # Nothing usable on disk: one full download for the range
+            data = self.fetch(symbol, start, interval)
+            if data.empty:
+                return data
+            self.write(symbol, interval, data, "max" if start is None else start)
+
+        elif self._is_stale(symbol, interval):
+            # Re-request from the last stored bar, which may have been partial
+            tail = self.fetch(symbol, data.index[-1], interval)
+            if tail.empty:
+                os.utime(self.path(symbol, interval))
+            else:
+                data = pd.concat([data[data.index < tail.index[0]], tail])
+                self.write(symbol, interval, data, covered)
+
+        if start is not None:
+            data = data[data.index >= start]
+        return data
+
+    def _covers(self, covered, start):
+        if covered is None:
+            return False
+        if covered == "max":
+            return True
+        return start is not None and covered <= start
+
+    def _is_stale(self, symbol, interval):
+        age = time.time() - os.path.getmtime(self.path(symbol, interval))
+        return age > self.refresh_after
+
+    # ---------- WRITE ----------
+    def write(self, symbol, interval, data, covered_from):
+        path = self.path(symbol, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        table = pa.Table.from_pandas(data)
+        covered = covered_from if covered_from == "max" else covered_from.isoformat()
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"covered_from": covered.encode()}
+        )
+
+        # Write to a temp file of our own first, so readers never see a
+        # half-written file and concurrent writers don't share one
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pq.write_table(table, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+store = HistoryStore()
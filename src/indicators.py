@@ -0,0 +1,138 @@
+# src/indicators.py
+
+"""
+Technical indicators over OHLCV data from stock_analysis.get_stock_data.
+
+Every function takes either a Series (one symbol) or a wide DataFrame
+(dates x symbols) and only uses pandas/NumPy rolling and ewm kernels, so
+a panel of many symbols is computed in one call with no Python loops.
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+# ---------- MOVING AVERAGES ----------
+def sma(close, window=20):
+    return close.rolling(window, min_periods=window).mean()
+
+
+def ema(close, span=20):
+    return close.ewm(span=span, adjust=False, min_periods=span).mean()
+
+
+# ---------- MOMENTUM ----------
+def _wilder(values, window):
+    """
+    Wilder's smoothing: the first average is the plain mean of the first
+    ``window`` values, then ``avg = (avg * (window - 1) + value) / window``.
+    """
+    count = values.notna().cumsum()
+    seed = values.rolling(window, min_periods=window).mean()
+    seeded = values.where(count > window, seed.where(count == window))
+    return seeded.ewm(alpha=1 / window, adjust=False).mean()
+
+
+def rsi(close, window=14):
+    """Wilder's RSI (0-100), first defined on the ``window``-th change."""
+    delta = close.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+
+    avg_gain = _wilder(gain, window)
+    avg_loss = _wilder(loss, window)
+
+    rs = avg_gain / avg_loss
+    out = 100 - 100 / (1 + rs)
+    # No losses in the window: RSI is 100
+    return out.where(avg_loss != 0, 100.0).where(avg_gain.notna())
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """Returns (macd line, signal line, histogram)."""
+    line = (
+        close.ewm(span=fast, adjust=False).mean()
+        - close.ewm(span=slow, adjust=False).mean()
+    )
+    signal_line = line.ewm(span=signal, adjust=False).mean()
+    return line, signal_line, line - signal_line
+
+
+# ---------- VOLATILITY ----------
+def bollinger(close, window=20, k=2.0):
+    """Returns (middle, upper, lower) bands."""
+    mid = sma(close, window)
+    std = close.rolling(window, min_periods=window).std(ddof=0)
+    return mid, mid + k * std, mid - k * std
+
+
+def atr(high, low, close, window=14):
+    """Average true range (Wilder smoothing)."""
+    prev_close = close.shift(1)
+    ranges = [
+        (high - low).to_numpy(),
+        (high - prev_close).abs().to_numpy(),
+        (low - prev_close).abs().to_numpy(),
+    ]
+    true_range = np.fmax.reduce(ranges)
+    true_range = (
+        pd.Series(true_range, index=close.index)
+        if close.ndim == 1
+        else pd.DataFrame(true_range, index=close.index, columns=close.columns)
+    )
+    return _wilder(true_range, window)
+
+
+def volatility(close, window=20, periods=TRADING_DAYS):
+    """Annualized rolling volatility of log returns."""
+    returns = np.log(close / close.shift(1))
+    return returns.rolling(window, min_periods=window).std() * np.sqrt(periods)
+
+
+def drawdown(close):
+    """Fraction below the running peak (0 at a new high, negative otherwise)."""
+    return close / close.cummax() - 1
+
+
+# ---------- ALL INDICATORS ----------
+def _all(high, low, close):
+    macd_line, macd_signal, macd_hist = macd(close)
+    bb_mid, bb_upper, bb_lower = bollinger(close)
+    return {
+        "SMA 20": sma(close, 20),
+        "SMA 50": sma(close, 50),
+        "EMA 20": ema(close, 20),
+        "RSI 14": rsi(close),
+        "MACD": macd_line,
+        "MACD Signal": macd_signal,
+        "MACD Hist": macd_hist,
+        "BB Upper": bb_upper,
+        "BB Mid": bb_mid,
+        "BB Lower": bb_lower,
+        "ATR 14": atr(high, low, close),
+        "Volatility 20": volatility(close),
+        "Drawdown": drawdown(close),
+    }
+
+
+def compute_indicators(data):
+    """Close plus every indicator as columns, for one OHLCV DataFrame."""
+    close = data["Close"]
+    return pd.DataFrame({"Close": close, **_all(data["High"], data["Low"], close)})
+
+
+def build_panel(frames, field="Close"):
+    """Wide dates x symbols DataFrame of ``field`` from {symbol: OHLCV DataFrame}."""
+    return pd.DataFrame({symbol: df[field] for symbol, df in frames.items()})
+
+
+def compute_batch(frames):
+    """
+    Indicators for many symbols at once.
+
+    ``frames`` is {symbol: OHLCV DataFrame}; the result maps each
+    indicator name to a wide dates x symbols DataFrame.
+    """
+    return _all(*(build_panel(frames, f) for f in ("High", "Low", "Close")))
@@ -0,0 +1,159 @@
+# src/jsonl_store.py
+
+import json
+import os
+import threading
+
+
+class JsonlLog:
+    """
+    Append-only JSON Lines file.
+
+    - each append writes one line and fsyncs it, so the cost does not grow
+      with the file and a crash loses at most the record being written
+    - a torn last line (crash mid-write) is skipped on read and fenced off
+      with a newline before the next append
+    - ``rewrite`` replaces the whole file atomically (temp file + rename),
+      which is how stores on top of it compact
+    - ``legacy`` is an old whole-file JSON array, imported once (through
+      ``upgrade``, if given) when the log does not exist yet
+    """
+
+    def __init__(self, path, legacy=None, upgrade=None):
+        self.path = path
+        self.legacy = legacy
+        self.upgrade = upgrade
+        self._lock = threading.Lock()
+        self._lines = None  # counted lazily
+
+    # ---------- READ ----------
+    def __iter__(self):
+        """Stream records from disk, one line at a time."""
+        self._import_legacy()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write
+
+    def __len__(self):
+        """Number of lines in the log, live or not."""
+        if self._lines is None:
+            self._lines = sum(1 for _ in self)
+        return self._lines
+
+    # ---------- WRITE ----------
+    def append(self, record):
+        self._import_legacy()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._makedirs()
+            with open(self.path, "a+b") as f:
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            if self._lines is not None:
+                self._lines += 1
+
+    def rewrite(self, records):
+        """Atomically replace the log with ``records``."""
+        with self._lock:
+            self._makedirs()
+            tmp = self.path + ".tmp"
+            count = 0
+            with open(tmp, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    count += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            _fsync_dir(os.path.dirname(self.path))
+            self._lines = count
+
+    # ---------- HELPERS ----------
+    def _makedirs(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def _import_legacy(self):
+        if not self.legacy or os.path.exists(self.path) or not os.path.exists(self.legacy):
+            return
+        try:
+            with open(self.legacy, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError):
+            records = []
+        self.rewrite(self.upgrade(records) if self.upgrade else records)
+
+
+class KeyedStore:
+    """
+    Latest record per key, persisted as a JsonlLog of upserts and deletes.
+
+    Every change is one append. Once the log holds more than
+    ``compact_every`` lines and at least twice as many lines as live
+    records, it is compacted down to one line per live record.
+    """
+
+    DELETED = "_deleted"
+
+    def __init__(self, log, key, compact_every=500):
+        self.log = log
+        self.key = key
+        self.compact_every = compact_every
+        self._check_at = compact_every
+
+    def load(self):
+        """{key: record} for every live record, in first-inserted order."""
+        records = {}
+        for record in self.log:
+            if record.get(self.DELETED):
+                records.pop(record[self.key], None)
+            else:
+                records[record[self.key]] = record
+        return records
+
+    def put(self, record):
+        self.log.append(record)
+        self._maybe_compact()
+
+    def delete(self, key):
+        self.log.append({self.key: key, self.DELETED: True})
+        self._maybe_compact()
+
+    def compact(self):
+        live = self.load()
+        self.log.rewrite(live.values())
+        self._check_at = max(self.compact_every, 2 * len(live))
+
+    def _maybe_compact(self):
+        lines = len(self.log)
+        if lines <= self._check_at:
+            return
+        live = self.load()
+        if lines >= 2 * len(live):
+            self.log.rewrite(live.values())
+        # Nothing to gain before the log doubles the live set again
+        self._check_at = max(self.compact_every, 2 * len(live))
+
+
+def _fsync_dir(folder):
+    # Makes the rename itself durable; directories can't be opened on Windows
+    if os.name != "posix":
+        return
+    fd = os.open(folder or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,345 @@
+# src/market_data.py
+
+"""
+Market-data providers: batch quotes and OHLCV history behind one interface.
+
+- YahooProvider        live data from Yahoo Finance (yfinance)
+- ReplayProvider       recorded fixtures on disk, fully offline
+- RandomWalkProvider   deterministic synthetic prices for any symbol
+
+``load_provider`` picks one by alias ("yahoo", "replay", "random") or
+dotted path. Without arguments it reads the MARKET_DATA_PROVIDER
+environment variable, which the Django settings use as well, so one
+variable switches the whole stack offline. Options not passed explicitly
+come from MARKET_DATA_FIXTURES, MARKET_DATA_SEED and MARKET_DATA_LATENCY.
+
+Record fixtures for the replay provider from any other provider with:
+
+    python -m src.market_data record AAPL RELIANCE.NS --period 5y
+"""
+
+import functools
+import importlib
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from src.symbols import is_valid
+
+# ---------- SETTINGS ----------
+DEFAULT_PROVIDER = "yahoo"
+# Under the project root whatever the working directory (the backend runs
+# from investment_backend/); MARKET_DATA_FIXTURES overrides it
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(PROJECT_DIR, "data", "fixtures")
+
+RESAMPLE_RULES = {"1d": None, "5d": "5B", "1wk": "W-FRI", "1mo": "ME", "3mo": "QE"}
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _env_float(name, default):
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+# What get_price raises for a symbol the source has no data for
+NO_DATA_ERRORS = (KeyError, IndexError, ValueError)
+
+
+# ---------- INTERFACE ----------
+class MarketDataProvider(ABC):
+    """
+    Base class. Subclasses implement ``get_history`` and either
+    ``get_prices`` or ``get_price``; each has a default in terms of the
+    others.
+
+    ``latency`` (seconds) is slept once per call, to simulate a remote
+    source in load tests.
+    """
+
+    def __init__(self, latency=None):
+        self.latency = _env_float("MARKET_DATA_LATENCY", 0.0) if latency is None else latency
+
+    def get_prices(self, symbols):
+        """{symbol: last price}; symbols that can't be priced are left out."""
+        prices = {}
+        for symbol in symbols:
+            try:
+                prices[symbol] = self.get_price(symbol)
+            except NO_DATA_ERRORS:
+                continue
+        return prices
+
+    def get_price(self, symbol):
+        history = self.get_history(symbol, pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=7))
+        if history.empty:
+            raise KeyError(symbol)
+        return float(history["Close"].iloc[-1])
+
+    @abstractmethod
+    def get_history(self, symbol, start=None, interval="1d"):
+        """OHLCV bars since ``start`` (a Timestamp, or None for everything)."""
+
+    def _wait(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+
+# ---------- YAHOO ----------
+class YahooProvider(MarketDataProvider):
+    """
+    Yahoo Finance. yfinance is imported on first use; it is slow to
+    import and most reads are served from caches.
+    """
+
+    def get_prices(self, symbols):
+        import yfinance as yf
+
+        self._wait()
+        # One batched request for every symbol
+        data = yf.download(list(symbols), period="1d", progress=False, threads=False)
+        if data.empty:
+            return {}
+
+        closes = data["Close"].ffill().iloc[-1]
+        return {
+            symbol: float(price)
+            for symbol, price in closes.items()
+            if price == price  # skip NaN
+        }
+
+    def get_price(self, symbol):
+        import yfinance as yf
+
+        self._wait()
+        history = yf.Ticker(symbol).history(period="1d")
+        if history.empty:
+            raise KeyError(symbol)  # unknown or delisted
+        return float(history["Close"].iloc[-1])
+
+    def get_history(self, symbol, start=None, interval="1d"):
+        import yfinance as yf
+
+        self._wait()
+        ticker = yf.Ticker(symbol)
+        if start is None:
+            return ticker.history(period="max", interval=interval)
+        return ticker.history(start=start.strftime("%Y-%m-%d"), interval=interval)
+
+
+# ---------- REPLAY ----------
+@functools.lru_cache(maxsize=256)
+def _read_csv(path, mtime, dated=True):
+    # mtime is part of the key so re-recorded fixtures are picked up
+    frame = pd.read_csv(path, index_col=0)
+    if dated:
+        frame.index = pd.to_datetime(frame.index, utc=True)
+    return frame
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Serves recorded fixtures, laid out as
+
+        <root>/history/<interval>/<SYMBOL>.csv   OHLCV bars
+        <root>/quotes.csv                        stock_symbol,price (optional)
+
+    Quotes missing from quotes.csv are the last recorded daily close.
+    """
+
+    def __init__(self, root=None, latency=None):
+        super().__init__(latency)
+        self.root = root or os.environ.get("MARKET_DATA_FIXTURES") or FIXTURES_DIR
+
+    def history_path(self, symbol, interval):
+        if not is_valid(symbol):
+            raise ValueError(f"Not a valid symbol: {symbol!r}")
+        return os.path.join(self.root, "history", interval, f"{symbol}.csv")
+
+    def _load(self, path, dated=True):
+        if not os.path.exists(path):
+            return None
+        return _read_csv(path, os.path.getmtime(path), dated)
+
+    def get_prices(self, symbols):
+        self._wait()
+        quotes = self._load(os.path.join(self.root, "quotes.csv"), dated=False)
+        recorded = {} if quotes is None else dict(zip(quotes.index, quotes["price"]))
+
+        prices = {}
+        for symbol in symbols:
+            if symbol in recorded:
+                prices[symbol] = float(recorded[symbol])
+                continue
+            if not is_valid(symbol):
+                continue
+            bars = self._load(self.history_path(symbol, "1d"))
+            if bars is not None and not bars.empty:
+                prices[symbol] = float(bars["Close"].iloc[-1])
+        return prices
+
+    def get_price(self, symbol):
+        return self.get_prices([symbol])[symbol]
+
+    def get_history(self, symbol, start=None, interval="1d"):
+        self._wait()
+        bars = self._load(self.history_path(symbol, interval)) if is_valid(symbol) else None
+        if bars is None:
+            return pd.DataFrame(columns=OHLCV)
+        if start is not None:
+            bars = bars[bars.index >= start]
+        return bars.copy()
+
+
+def record_fixtures(symbols, source, root=None, start=None, intervals=("1d",)):
+    """
+    Save history and last prices from ``source`` in ReplayProvider's
+    layout, under ``root`` (default: where ReplayProvider looks).
+    """
+    replay = ReplayProvider(root=root, latency=0)
+    for interval in intervals:
+        os.makedirs(os.path.dirname(replay.history_path("X", interval)), exist_ok=True)
+        for symbol in symbols:
+            bars = source.get_history(symbol, start, interval)
+            if not bars.empty:
+                bars[[c for c in OHLCV if c in bars]].to_csv(replay.history_path(symbol, interval))
+
+    prices = source.get_prices(symbols)
+    pd.Series(prices, name="price").rename_axis("stock_symbol").to_csv(
+        os.path.join(replay.root, "quotes.csv")
+    )
+    return prices
+
+
+# ---------- RANDOM WALK ----------
+class RandomWalkProvider(MarketDataProvider):
+    """
+    Synthetic geometric random walk, seeded per symbol, so every symbol
+    has a stable daily history from ``since`` to today with no fixtures.
+
+    With ``tick_seconds`` set, quotes also move between daily closes: the
+    last close is nudged by a deterministic step per tick window, which
+    makes quotes (and alerts) change during a load test.
+    """
+
+    def __init__(self, seed=None, since="2000-01-03", volatility=0.02,
+                 tick_seconds=0, latency=None):
+        super().__init__(latency)
+        self.seed = int(_env_float("MARKET_DATA_SEED", 0)) if seed is None else seed
+        self.since = pd.Timestamp(since, tz="UTC")
+        self.volatility = volatility
+        self.tick_seconds = tick_seconds
+
+    def _rng(self, *parts):
+        key = ":".join(str(p) for p in (self.seed, *parts))
+        return np.random.default_rng(zlib.crc32(key.encode()))
+
+    def _daily(self, symbol):
+        index = pd.bdate_range(self.since, pd.Timestamp.now(tz="UTC").normalize(), tz="UTC")
+        return _random_walk(self._rng(symbol), index, self.volatility)
+
+    def get_history(self, symbol, start=None, interval="1d"):
+        if interval not in RESAMPLE_RULES:
+            raise ValueError(f"RandomWalkProvider has no {interval!r} bars")
+        self._wait()
+
+        bars = self._daily(symbol)
+        rule = RESAMPLE_RULES[interval]
+        if rule:
+            bars = bars.resample(rule).agg(
+                {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+            ).dropna()
+        if start is not None:
+            bars = bars[bars.index >= start]
+        return bars
+
+    def get_prices(self, symbols):
+        self._wait()
+        window = int(time.time() // self.tick_seconds) if self.tick_seconds else 0
+        prices = {}
+        for symbol in symbols:
+            close = float(self._daily(symbol)["Close"].iloc[-1])
+            if window:
+                close *= float(np.exp(self._rng(symbol, window).normal(0, self.volatility / 4)))
+            prices[symbol] = round(close, 2)
+        return prices
+
+    def get_price(self, symbol):
+        return self.get_prices([symbol])[symbol]
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_walk(seed, length, volatility):
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(50, 500)
+    returns = rng.normal(0.0003, volatility, length)
+    close = start * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, volatility / 2, length))
+    volume = rng.integers(10_000, 5_000_000, length)
+    return close, spread, volume
+
+
+def _random_walk(rng, index, volatility):
+    # Draw the seed from rng so the walk is cached per symbol and length
+    close, spread, volume = _cached_walk(int(rng.integers(2**32)), len(index), volatility)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * (1 + spread),
+        "Low": np.minimum(open_, close) * (1 - spread),
+        "Close": close,
+        "Volume": volume,
+    }, index=index)
+
+
+# ---------- SELECTION ----------
+PROVIDERS = {
+    "yahoo": YahooProvider,
+    "replay": ReplayProvider,
+    "random": RandomWalkProvider,
+}
+
+
+def load_provider(spec=None, **options):
+    """
+    Instantiate a provider from an alias or dotted path (default: the
+    MARKET_DATA_PROVIDER environment variable, else Yahoo).
+    """
+    spec = spec or os.environ.get("MARKET_DATA_PROVIDER") or DEFAULT_PROVIDER
+    cls = PROVIDERS.get(spec)
+    if cls is None:
+        module, _, name = spec.rpartition(".")
+        cls = getattr(importlib.import_module(module), name)
+    return cls(**options)
+
+
+@functools.lru_cache(maxsize=1)
+def default_provider():
+    """Process-wide provider for the Streamlit side, chosen by environment."""
+    return load_provider()
+
+
+# ---------- CLI ----------
+if __name__ == "__main__":
+    import argparse
+
+    from src.history_store import period_start
+
+    parser = argparse.ArgumentParser(description="Record market-data fixtures for ReplayProvider.")
+    parser.add_argument("command", choices=["record"])
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--source", default="yahoo", help="Provider alias or dotted path.")
+    parser.add_argument("--root", default=os.environ.get("MARKET_DATA_FIXTURES") or FIXTURES_DIR)
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--intervals", nargs="+", default=["1d"])
+    args = parser.parse_args()
+
+    recorded = record_fixtures(
+        [s.upper() for s in args.symbols], load_provider(args.source, latency=0),
+        root=args.root, start=period_start(args.period), intervals=args.intervals,
+    )
+    print(f"Recorded {len(recorded)} symbol(s) into {args.root}")
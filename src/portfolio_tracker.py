@@ -1,155 +1,197 @@
-import json
-import os
-import yfinance as yf
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 
+from src.jsonl_store import JsonlLog, KeyedStore
+from src.market_data import NO_DATA_ERRORS, default_provider
+from src.quote_cache import price_cache, unknown_cache
+from src.symbols import normalize
+
 # ---------- FILE PATHS ----------
-PORTFOLIO_FILE = "data/portfolio.json"
-TRANSACTION_FILE = "data/transactions.json"
+PORTFOLIO_FILE = "data/portfolio.jsonl"
+TRANSACTION_FILE = "data/transactions.jsonl"
+
+# Whole-file JSON from older versions, imported on first use
+LEGACY_PORTFOLIO_FILE = "data/portfolio.json"
+LEGACY_TRANSACTION_FILE = "data/transactions.json"
+
+TRANSACTION_COLUMNS = ["Action", "Stock", "Shares", "Timestamp"]
 
+PRICE_WORKERS = 8
+PRICE_TIMEOUT = 5  # seconds for a whole get_portfolio price batch
 
-# ---------- HELPERS ----------
-def normalize_stock(stock):
-    stock = stock.upper().strip()
-    if not stock.endswith(".NS"):
-        stock += ".NS"
-    return stock
+portfolio_store = KeyedStore(JsonlLog(PORTFOLIO_FILE, legacy=LEGACY_PORTFOLIO_FILE), key="Stock")
+transaction_log = JsonlLog(TRANSACTION_FILE, legacy=LEGACY_TRANSACTION_FILE)
 
 
-# ---------- LOAD PORTFOLIO SAFELY ----------
-if os.path.exists(PORTFOLIO_FILE):
-    try:
-        with open(PORTFOLIO_FILE, "r") as f:
-            portfolio_data = json.load(f)
-    except:
-        portfolio_data = []
-else:
-    portfolio_data = []
+# ---------- LOAD PORTFOLIO ----------
+_portfolio_data = None
+
+
+def get_portfolio_data():
+    """Holdings, read from disk on first use and kept in memory after."""
+    global _portfolio_data
+    if _portfolio_data is None:
+        _portfolio_data = list(portfolio_store.load().values())
+    return _portfolio_data
 
 
 # ---------- SAVE HELPERS ----------
-def save_portfolio():
-    os.makedirs("data", exist_ok=True)
-    with open(PORTFOLIO_FILE, "w") as f:
-        json.dump(portfolio_data, f, indent=4)
+# Each change is a single fsynced append, not a rewrite of the whole file
+def save_holding(item):
+    portfolio_store.put(item)
 
 
 def log_transaction(action, stock, shares):
-    os.makedirs("data", exist_ok=True)
-
-    if os.path.exists(TRANSACTION_FILE):
-        try:
-            with open(TRANSACTION_FILE, "r") as f:
-                transactions = json.load(f)
-        except:
-            transactions = []
-    else:
-        transactions = []
-
-    transactions.append({
+    transaction_log.append({
         "Action": action,
         "Stock": stock,
         "Shares": shares,
         "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     })
 
-    with open(TRANSACTION_FILE, "w") as f:
-        json.dump(transactions, f, indent=4)
+
+# ---------- PRICE FETCH ----------
+def last_price(stock):
+    return round(default_provider().get_price(stock), 2)
+
+
+def _remember(stock):
+    # Lookups that miss the deadline still warm the cache for next time;
+    # symbols with no data at all are not looked up again for an hour
+    def done(future):
+        if future.cancelled():
+            return
+        if isinstance(future.exception(), NO_DATA_ERRORS):
+            unknown_cache.set_many({stock: True})
+        elif future.exception() is None and future.result() is not None:
+            price_cache.set_many({stock: future.result()})
+    return done
+
+
+def fetch_last_prices(stocks, timeout=None):
+    """
+    Fetch last closes concurrently within a ``timeout`` budget for the
+    whole batch (``PRICE_TIMEOUT`` by default). Symbols that fail, are
+    still pending or are known to have no data are left out.
+    """
+    if timeout is None:
+        timeout = PRICE_TIMEOUT
+    unknown = unknown_cache.peek_many(stocks)
+    stocks = [s for s in stocks if s not in unknown]
+    if not stocks:
+        return {}
+
+    pool = ThreadPoolExecutor(max_workers=min(PRICE_WORKERS, len(stocks)))
+    futures = {}
+    for stock in stocks:
+        future = pool.submit(last_price, stock)
+        future.add_done_callback(_remember(stock))
+        futures[future] = stock
+    done, _ = wait(futures, timeout=timeout)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    prices = {}
+    for future in done:
+        if future.exception() is None and future.result() is not None:
+            prices[futures[future]] = future.result()
+    return prices
 
 
 # ---------- CORE FUNCTIONS ----------
 def get_portfolio():
-    rows = []
-    total_invested = 0
-    total_current = 0
-
-    for item in portfolio_data:
-        stock = item["Stock"]
-        shares = item["Shares"]
-
-        # 🔐 SAFE access (handles old data)
-        buy_price = item.get("BuyPrice", 0)
-
-        try:
-            ticker = yf.Ticker(stock)
-            hist = ticker.history(period="5d")
-            price = round(hist["Close"].iloc[-1], 2) if not hist.empty else 0
-        except:
-            price = 0
-
-        invested = round(shares * buy_price, 2)
-        current_value = round(shares * price, 2)
-        profit_loss = round(current_value - invested, 2)
-
-        total_invested += invested
-        total_current += current_value
-
-        rows.append({
-            "Stock": stock,
-            "Shares": shares,
-            "Buy Price": buy_price,
-            "Current Price": price,
-            "Invested": invested,
-            "Current Value": current_value,
-            "Profit / Loss": profit_loss
-        })
-
-    df = pd.DataFrame(rows)
-
-    if not df.empty:
-        df.loc[len(df)] = [
-            "TOTAL", "", "", "",
-            round(total_invested, 2),
-            round(total_current, 2),
-            round(total_current - total_invested, 2)
-        ]
+    """
+    Holdings with current prices and P&L, plus a TOTAL row.
+
+    Prices the live lookup could not deliver in time fall back to the last
+    cached value and are flagged in the ``Stale`` column; holdings with no
+    price at all show NaN and are left out of the value and P&L totals.
+    """
+    portfolio_data = get_portfolio_data()
+    stocks = [item["Stock"] for item in portfolio_data]
+    if not stocks:
+        return pd.DataFrame()
+
+    prices = price_cache.get_many(stocks, fetch_last_prices)
+    missing = [s for s in stocks if s not in prices]
+    fallback = price_cache.peek_many(missing, stale=True)
+
+    shares = np.array([item["Shares"] for item in portfolio_data], dtype=float)
+    # 🔐 SAFE access (handles old data)
+    buy_price = np.array([item.get("BuyPrice", 0) for item in portfolio_data], dtype=float)
+    price = np.array([prices.get(s, fallback.get(s, np.nan)) for s in stocks], dtype=float)
+
+    invested = np.round(shares * buy_price, 2)
+    current_value = np.round(shares * price, 2)
+    profit_loss = np.round(current_value - invested, 2)
+
+    df = pd.DataFrame({
+        "Stock": stocks,
+        "Shares": shares.astype(int),
+        "Buy Price": buy_price,
+        "Current Price": price,
+        "Invested": invested,
+        "Current Value": current_value,
+        "Profit / Loss": profit_loss,
+        "Stale": [s not in prices for s in stocks],
+    })
 
-    return df
+    total = pd.DataFrame({
+        "Stock": ["TOTAL"],
+        "Invested": [round(invested.sum(), 2)],
+        "Current Value": [round(np.nansum(current_value), 2)],
+        "Profit / Loss": [round(np.nansum(profit_loss), 2)],
+        "Stale": [bool(missing)],
+    })
+    return pd.concat([df, total], ignore_index=True)
 
 
 
 def add_stock(stock, shares, buy_price):
-    stock = normalize_stock(stock)
+    stock = normalize(stock)
     shares = int(shares)
     buy_price = float(buy_price)
+    portfolio_data = get_portfolio_data()
 
     for item in portfolio_data:
         if item["Stock"] == stock:
             item["Shares"] += shares
             item["BuyPrice"] = buy_price
-            save_portfolio()
+            save_holding(item)
             log_transaction("BUY", stock, shares)
             return f"Added {shares} more shares of {stock}."
 
-    portfolio_data.append({
+    item = {
         "Stock": stock,
         "Shares": shares,
         "BuyPrice": buy_price
-    })
+    }
+    portfolio_data.append(item)
 
-    save_portfolio()
+    save_holding(item)
     log_transaction("BUY", stock, shares)
     return f"{stock} added successfully."
 
 
 def remove_stock(stock):
-    stock = normalize_stock(stock)
+    stock = normalize(stock)
+    portfolio_data = get_portfolio_data()
 
     for item in portfolio_data:
         if item["Stock"] == stock:
             portfolio_data.remove(item)
-            save_portfolio()
+            portfolio_store.delete(stock)
             log_transaction("SELL", stock, item["Shares"])
             return f"{stock} removed from portfolio."
 
     return f"{stock} not found in portfolio."
 
 
-def get_transactions():
-    if os.path.exists(TRANSACTION_FILE):
-        with open(TRANSACTION_FILE, "r") as f:
-            data = json.load(f)
-        return pd.DataFrame(data)
+def iter_transactions():
+    """Stream logged transactions, oldest first, without loading the whole file."""
+    return iter(transaction_log)
 
-    return pd.DataFrame(columns=["Action", "Stock", "Shares", "Timestamp"])
+
+def get_transactions():
+    return pd.DataFrame(iter_transactions(), columns=TRANSACTION_COLUMNS)
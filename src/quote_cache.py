@@ -0,0 +1,185 @@
+# src/quote_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class QuoteCache:
+    """
+    Thread-safe TTL + LRU cache for prices and other market data.
+
+    - every entry carries its own expiry, so callers can pass a per-symbol ttl
+    - the least recently used entry is evicted once ``maxsize`` is reached
+    - concurrent misses for the same key are coalesced into a single fetch
+    - ``shared`` is an optional second level with the Django cache API
+      (``get_many`` / ``set_many``) so several processes can share results
+    """
+
+    def __init__(self, ttl=60, maxsize=1024, shared=None, namespace=""):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.shared = shared
+        self.namespace = namespace
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> threading.Event
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    # ---------- READ ----------
+    def get(self, key, fetch, ttl=None):
+        """Return the cached value for ``key``, calling ``fetch(key)`` on a miss."""
+        result = self.get_many([key], lambda keys: {k: fetch(k) for k in keys}, ttl)
+        return result.get(key)
+
+    def peek_many(self, keys, stale=False):
+        """
+        Return the fresh cached entries for ``keys`` without fetching.
+
+        With ``stale=True`` expired entries that have not been evicted yet
+        are returned too, as a fallback when the source is unavailable.
+        Keys missing locally are looked up in ``shared`` (and kept locally,
+        as ``get_many`` does), so other processes' entries count as well.
+        """
+        result = {}
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and (stale or entry[0] > now):
+                    self._entries.move_to_end(key)
+                    result[key] = entry[1]
+                    self.hits += 1
+
+        missing = [k for k in keys if k not in result]
+        if self.shared is not None and missing:
+            found = self.shared.get_many([self.namespace + k for k in missing])
+            values = {k: found[self.namespace + k] for k in missing if self.namespace + k in found}
+            with self._lock:
+                for key, value in values.items():
+                    self._store(key, value, self.ttl)
+                    self.hits += 1
+            result.update(values)
+        return result
+
+    def get_many(self, keys, fetch, ttl=None):
+        """
+        Return {key: value} for ``keys``.
+
+        ``fetch(missing_keys)`` must return a dict; keys it leaves out are
+        not cached and are missing from the result.
+        """
+        result = {}
+        owned = []
+        waiting = {}
+        now = time.monotonic()
+
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    result[key] = entry[1]
+                    self.hits += 1
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                    self.coalesced += 1
+                else:
+                    self._inflight[key] = threading.Event()
+                    owned.append(key)
+                    self.misses += 1
+
+        if owned:
+            try:
+                result.update(self._load(owned, fetch, ttl))
+            finally:
+                with self._lock:
+                    for key in owned:
+                        self._inflight.pop(key).set()
+
+        for key, event in waiting.items():
+            event.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                result[key] = entry[1]
+
+        return result
+
+    def _load(self, keys, fetch, ttl):
+        ttl = self.ttl if ttl is None else ttl
+        values = {}
+
+        if self.shared is not None:
+            found = self.shared.get_many([self.namespace + k for k in keys])
+            for key in keys:
+                if self.namespace + key in found:
+                    values[key] = found[self.namespace + key]
+
+        missing = [k for k in keys if k not in values]
+        if missing:
+            fetched = fetch(missing)
+            values.update(fetched)
+            if self.shared is not None and fetched:
+                self.shared.set_many(
+                    {self.namespace + k: v for k, v in fetched.items()}, ttl
+                )
+
+        with self._lock:
+            for key, value in values.items():
+                self._store(key, value, ttl)
+
+        return values
+
+    # ---------- WRITE ----------
+    def set_many(self, values, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            for key, value in values.items():
+                self._store(key, value, ttl)
+        if self.shared is not None and values:
+            self.shared.set_many(
+                {self.namespace + k: v for k, v in values.items()}, ttl
+            )
+
+    def _store(self, key, value, ttl):
+        # caller holds self._lock
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.shared is not None:
+            self.shared.delete_many([self.namespace + key])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.coalesced = 0
+
+    # ---------- STATS ----------
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+
+# Process-wide caches for the Streamlit side.
+price_cache = QuoteCache(ttl=60, maxsize=2048)
+unknown_cache = QuoteCache(ttl=3600, maxsize=2048)  # symbols with no data
+history_cache = QuoteCache(ttl=300, maxsize=64)
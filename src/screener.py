@@ -0,0 +1,134 @@
+# src/screener.py
+
+"""
+Multi-symbol screener.
+
+Close prices for all symbols are aligned into one dates x symbols NumPy
+array, and every metric is computed column-wise over that array in a
+single pass.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.history_store import store
+
+# ---------- SETTINGS ----------
+TRADING_DAYS = 252
+LOAD_WORKERS = 8
+
+# Trailing returns, in trading days
+HORIZONS = {"1w": 5, "1m": 21, "3m": 63, "6m": 126, "1y": 252}
+
+# 12-1 momentum: the last year's return, skipping the most recent month
+MOMENTUM_LOOKBACK = 252
+MOMENTUM_SKIP = 21
+
+
+# ---------- PANEL ----------
+def _daily_closes(data):
+    index = data.index
+    if index.tz is not None:
+        # Exchanges sit in different timezones; align on local trading dates
+        index = index.tz_localize(None)
+    close = pd.Series(data["Close"].to_numpy(), index=index.normalize())
+    return close[~close.index.duplicated(keep="last")]
+
+
+def load_panel(symbols, period="1y", store=store):
+    """
+    Return (dates, symbols, closes) for symbols with any history, read
+    through ``store`` (a HistoryStore, by default the shared one).
+
+    ``closes`` is a float (dates x symbols) array, forward-filled across
+    holidays of one exchange and NaN before a symbol's first bar.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return pd.DatetimeIndex([]), [], np.empty((0, 0))
+
+    with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(symbols))) as pool:
+        frames = list(pool.map(lambda s: store.get(s, period=period), symbols))
+
+    series = {
+        symbol: _daily_closes(data)
+        for symbol, data in zip(symbols, frames)
+        if not data.empty
+    }
+    if not series:
+        return pd.DatetimeIndex([]), [], np.empty((0, 0))
+
+    panel = pd.DataFrame(series).sort_index().ffill()
+    return panel.index, list(panel.columns), panel.to_numpy(dtype=float)
+
+
+# ---------- METRICS ----------
+def _trailing_return(closes, days):
+    if len(closes) <= days:
+        return np.full(closes.shape[1], np.nan)
+    return closes[-1] / closes[-1 - days] - 1
+
+
+def _rank_desc(values):
+    """1 = best; NaNs are left unranked."""
+    return pd.Series(values).rank(ascending=False, method="min").to_numpy()
+
+
+def screen(closes, symbols):
+    """Per-symbol metrics and the return correlation matrix for a close panel."""
+    if not symbols:
+        return {"rows": [], "correlation": []}
+
+    last = closes[-1]
+    year = closes[-TRADING_DAYS:]
+    high = np.nanmax(year, axis=0)
+    low = np.nanmin(year, axis=0)
+
+    daily = closes[1:] / closes[:-1] - 1
+    if len(daily) > 1:
+        volatility = np.nanstd(daily[-TRADING_DAYS:], axis=0, ddof=1) * np.sqrt(TRADING_DAYS)
+    else:
+        volatility = np.full(len(symbols), np.nan)
+
+    if len(closes) > MOMENTUM_LOOKBACK:
+        momentum = closes[-1 - MOMENTUM_SKIP] / closes[-1 - MOMENTUM_LOOKBACK] - 1
+    else:
+        # Short panel: fall back to the longest window available
+        momentum = closes[-1 - min(MOMENTUM_SKIP, len(closes) - 1)] / closes[0] - 1
+
+    returns = {name: _trailing_return(closes, days) for name, days in HORIZONS.items()}
+    metrics = {
+        "last_price": last,
+        **{f"return_{name}": r for name, r in returns.items()},
+        "volatility": volatility,
+        "momentum": momentum,
+        "momentum_rank": _rank_desc(momentum),
+        "high_52w": high,
+        "low_52w": low,
+        "from_high": last / high - 1,
+        "from_low": last / low - 1,
+    }
+
+    correlation = pd.DataFrame(daily).corr(min_periods=20).to_numpy()
+    return {
+        "rows": [
+            {"symbol": symbol, **{k: _clean(v[i]) for k, v in metrics.items()}}
+            for i, symbol in enumerate(symbols)
+        ],
+        "correlation": [[_clean(v) for v in row] for row in correlation],
+    }
+
+
+def _clean(value):
+    # JSON has no NaN
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def run_screen(symbols, period="1y", store=store):
+    dates, symbols, closes = load_panel(symbols, period, store)
+    result = screen(closes, symbols)
+    result["symbols"] = symbols
+    result["as_of"] = dates[-1].date().isoformat() if len(dates) else None
+    return result
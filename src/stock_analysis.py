@@ -1,25 +1,14 @@
 # src/stock_analysis.py
 
-import yfinance as yf
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import io
 
+from src.history_store import store
+from src.quote_cache import QuoteCache, history_cache
+from src.symbols import normalize
 
-def normalize_symbol(symbol):
-    """
-    Normalize stock symbol.
-    Example:
-    - reliance -> RELIANCE.NS
-    - AAPL -> AAPL
-    """
-    symbol = symbol.upper().strip()
-
-    # If user enters Indian stock without .NS, add it
-    if "." not in symbol and symbol not in ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA"]:
-        symbol = symbol + ".NS"
-
-    return symbol
+# Built charts, keyed by symbol, range and last bar
+chart_cache = QuoteCache(ttl=600, maxsize=32)
 
 
 def get_stock_data(symbol, period="5y", interval="1d"):
@@ -31,42 +20,83 @@ def get_stock_data(symbol, period="5y", interval="1d"):
     interval: '1d', '1wk', '1mo'
 
     Returns: pandas DataFrame
+
+    Bars are kept in the on-disk history store, so only the newest bars
+    are downloaded; results are also cached in memory for a few minutes.
     """
-    try:
-        symbol = normalize_symbol(symbol)
-        ticker = yf.Ticker(symbol)
-        data = ticker.history(period=period, interval=interval)
+    symbol = normalize(symbol)
+    key = f"{symbol}:{period}:{interval}"
+    data = history_cache.get_many(
+        [key], lambda keys: _download(symbol, period, interval, key)
+    ).get(key)
 
-        if data.empty:
-            return pd.DataFrame()
+    return data if data is not None else pd.DataFrame()
 
-        return data
 
+def _download(symbol, period, interval, key):
+    try:
+        data = store.get(symbol, period=period, interval=interval)
     except Exception as e:
         print(f"Error fetching data for {symbol}: {e}")
-        return pd.DataFrame()
+        return {}
+
+    # Empty results are not cached
+    return {} if data.empty else {key: data}
+
 
+def downsample_minmax(values, buckets):
+    """
+    Positions of the points to draw for a line ``buckets`` pixels wide.
 
-def plot_stock_chart(data, symbol):
+    The series is cut into equal buckets and each keeps its min and max,
+    so spikes survive while the point count drops to ~2 x buckets.
     """
-    Plot closing price chart and return image buffer for Streamlit.
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= 2 * buckets:
+        return np.arange(n)
+
+    size = -(-n // buckets)  # ceil
+    padded = np.full(size * buckets, np.nan)
+    padded[:n] = values
+    rows = padded.reshape(buckets, size)
+
+    valid = ~np.isnan(rows).all(axis=1)
+    offsets = np.arange(buckets)[valid] * size
+    lows = offsets + np.nanargmin(rows[valid], axis=1)
+    highs = offsets + np.nanargmax(rows[valid], axis=1)
+
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+
+def plot_stock_chart(data, symbol, width=900, height=360):
+    """
+    Closing price line chart (Altair) for Streamlit.
+
+    Long series are downsampled to about two points per pixel column,
+    and charts are memoized by symbol, date range and last bar.
     """
     if data.empty:
         return None
 
-    plt.figure(figsize=(12, 5))
-    plt.plot(data.index, data["Close"], label="Close Price", linewidth=2)
+    key = f"{symbol}:{data.index[0]}:{data.index[-1]}:{data['Close'].iloc[-1]}:{width}"
+    return chart_cache.get(key, lambda _: _build_chart(data, symbol, width, height))
+
 
-    plt.title(f"{symbol} – Price Trend")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.grid(True)
-    plt.legend()
+def _build_chart(data, symbol, width, height):
+    import altair as alt  # only needed once a chart is drawn
 
-    # Save plot to memory buffer (Streamlit friendly)
-    buf = io.BytesIO()
-    plt.savefig(buf, format="png", bbox_inches="tight")
-    buf.seek(0)
-    plt.close()
+    close = data["Close"]
+    keep = downsample_minmax(close.to_numpy(), width)
+    points = pd.DataFrame({"Date": close.index[keep], "Close": close.to_numpy()[keep]})
 
-    return buf
+    return (
+        alt.Chart(points, title=f"{symbol} – Price Trend")
+        .mark_line(strokeWidth=2)
+        .encode(
+            x=alt.X("Date:T", title="Date"),
+            y=alt.Y("Close:Q", title="Price", scale=alt.Scale(zero=False)),
+            tooltip=[alt.Tooltip("Date:T"), alt.Tooltip("Close:Q", format=",.2f")],
+        )
+        .properties(width=width, height=height)
+    )
@@ -0,0 +1,135 @@
+# src/symbols.py
+
+"""
+Symbol master: one canonical spelling per listed stock.
+
+Listings are read from a CSV (symbol,name,exchange) into a SymbolIndex:
+a dict for exact lookups and a sorted key list searched with bisect for
+prefix matches, which is all a trie would give us at a fraction of the
+memory. Every place a symbol enters the system (Streamlit inputs, API
+requests, imports) goes through ``normalize``, so "reliance",
+"Reliance.ns" and "RELIANCE.NS" all become one cache and database key.
+
+The bundled src/symbols.csv covers common NSE and US names; point
+SYMBOLS_FILE at a full exchange listing to extend it.
+"""
+
+import bisect
+import csv
+import functools
+import os
+import re
+
+# ---------- SETTINGS ----------
+LISTING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "symbols.csv")
+
+# Characters tickers use ("BRK-B", "^NSEI", "USDINR=X", "M&M.NS")
+SYMBOL_PATTERN = re.compile(r"[A-Z0-9.=^&-]{1,20}")
+
+
+class SymbolIndex:
+    """
+    Exact and prefix lookup over listings.
+
+    A stock can be found by its full symbol, its ticker without the
+    exchange suffix, or a prefix of either or of any word of its name.
+    A bare ticker listed on several exchanges resolves to its first
+    listing in the file.
+    """
+
+    def __init__(self, listings=()):
+        self.names = {}
+        self._exact = {}
+        keys = set()
+
+        for symbol, name in listings:
+            symbol = symbol.strip().upper()
+            if not symbol or symbol in self.names:
+                continue
+            self.names[symbol] = name.strip()
+            self._exact[symbol] = symbol
+            ticker = symbol.split(".", 1)[0]
+            self._exact.setdefault(ticker, symbol)
+
+            keys.add((symbol, symbol))
+            keys.add((ticker, symbol))
+            for word in name.upper().split():
+                keys.add((word, symbol))
+
+        # Parallel sorted arrays: bisect on _keys, read matches from _targets
+        pairs = sorted(keys)
+        self._keys = [k for k, _ in pairs]
+        self._targets = [s for _, s in pairs]
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls((row["symbol"], row.get("name") or "") for row in csv.DictReader(f))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, symbol):
+        return symbol in self.names
+
+    def resolve(self, text):
+        """Canonical symbol for ``text``, or None if it isn't listed."""
+        return self._exact.get(text.strip().upper())
+
+    def search(self, prefix, limit=10):
+        """
+        Listed symbols with a key starting with ``prefix``, exact matches
+        first, then ticker order.
+        """
+        prefix = prefix.strip().upper()
+        if not prefix:
+            return []
+
+        exact = self.resolve(prefix)
+        found = set()
+        for i in range(bisect.bisect_left(self._keys, prefix), len(self._keys)):
+            if not self._keys[i].startswith(prefix):
+                break
+            found.add(self._targets[i])
+        found.discard(exact)
+
+        return ([exact] if exact else []) + sorted(found)[:limit - bool(exact)]
+
+
+@functools.lru_cache(maxsize=1)
+def default_index():
+    """Index over SYMBOLS_FILE (default: the bundled listing), loaded once."""
+    path = os.environ.get("SYMBOLS_FILE") or LISTING_FILE
+    if not os.path.exists(path):
+        return SymbolIndex()
+    return SymbolIndex.from_csv(path)
+
+
+@functools.lru_cache(maxsize=4096)
+def normalize(symbol):
+    """
+    Canonical form of a user-entered symbol.
+
+    - listed symbols resolve through the index: "reliance" -> "RELIANCE.NS",
+      "aapl" -> "AAPL"
+    - anything else is upper-cased and kept as is ("pltr" -> "PLTR",
+      "usdinr=x" -> "USDINR=X"): an unlisted bare ticker may be a US
+      stock, and stored rows use it verbatim
+    """
+    text = symbol.strip().upper()
+    return default_index().resolve(text) or text
+
+
+def is_valid(symbol):
+    """
+    Whether a canonical symbol only uses ticker characters. Symbols end
+    up in cache keys and file names (src.history_store), so anything
+    else, a path separator above all, is rejected where it enters.
+    """
+    return SYMBOL_PATTERN.fullmatch(symbol) is not None
+
+
+def search(prefix, limit=10):
+    """[(symbol, name)] for autocomplete."""
+    index = default_index()
+    return [(s, index.names[s]) for s in index.search(prefix, limit)]
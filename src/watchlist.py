@@ -1,41 +1,64 @@
-import json
 import os
 
-DATA_FILE = "data/watchlist.json"
+from src.jsonl_store import JsonlLog, KeyedStore
+from src.symbols import normalize
 
-# Load watchlist from JSON if exists, else default
-if os.path.exists(DATA_FILE):
-    with open(DATA_FILE, "r") as f:
-        watchlist = [stock.upper() for stock in json.load(f)]  # normalize
-else:
-    watchlist = ["AAPL", "GOOGL", "TSLA"]
+DATA_FILE = "data/watchlist.jsonl"
+LEGACY_DATA_FILE = "data/watchlist.json"  # older whole-file JSON list
+DEFAULT_WATCHLIST = ["AAPL", "GOOGL", "TSLA"]
 
-# Save normalized watchlist back
-def save_watchlist():
-    os.makedirs("data", exist_ok=True)
-    with open(DATA_FILE, "w") as f:
-        json.dump(list(set(watchlist)), f)  # remove duplicates
+store = KeyedStore(
+    JsonlLog(
+        DATA_FILE,
+        legacy=LEGACY_DATA_FILE,
+        upgrade=lambda stocks: [{"Stock": normalize(s)} for s in stocks],
+    ),
+    key="Stock",
+)
+
+_watchlist = None
+
+
+# Load watchlist on first use: saved one if any, else default
+def _load():
+    global _watchlist
+    if _watchlist is None:
+        if os.path.exists(DATA_FILE) or os.path.exists(LEGACY_DATA_FILE):
+            _watchlist = list(store.load())
+        else:
+            _watchlist = list(DEFAULT_WATCHLIST)
+    return _watchlist
+
+
+def _ensure_saved():
+    # The defaults only exist in memory until the first change
+    if not os.path.exists(DATA_FILE):
+        store.log.rewrite({"Stock": s} for s in _load())
 
 
 # Get current watchlist
 def get_watchlist():
-    return watchlist
+    return _load()
 
 # Add a stock to watchlist
 def add_stock(stock):
-    stock = stock.upper()
+    stock = normalize(stock)
+    watchlist = _load()
     if stock not in watchlist:
+        _ensure_saved()
         watchlist.append(stock)
-        save_watchlist()
+        store.put({"Stock": stock})
         return f"{stock} added to watchlist."
     else:
         return f"{stock} is already in watchlist."
 
 def remove_stock(stock):
-    stock = stock.upper()
+    stock = normalize(stock)
+    watchlist = _load()
     if stock in watchlist:
+        _ensure_saved()
         watchlist.remove(stock)
-        save_watchlist()
+        store.delete(stock)
         return f"{stock} removed from watchlist."
     else:
         return f"{stock} not found in watchlist."